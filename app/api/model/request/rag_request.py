@@ -1,22 +1,92 @@
-from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List, Literal, Union
 
 class RAGRequest(BaseModel):
     collection_name: str
     system_id: Optional[str] = None  # 시스템 구분자 (예: "system01")
+    directory_path: Optional[str] = None  # 수집할 스크린샷 디렉토리 (미지정 시 ./test_images)
+    full_rescan: bool = False  # True: 수집 이력을 무시하고 전체 파일 재분석
 
 class RAGSearchRequest(BaseModel):
     collection_name: str
     query: str
     k: int = 5
     filters: Optional[Dict[str, Any]] = None  # 예: {"service_name": "my_service", "access_level": "user"}
-    search_mode: str = "vector"  # "vector" | "hybrid" (벡터+BM25 RRF)
+    search_mode: str = "vector"  # "vector" | "hybrid" (벡터+BM25 RRF) | "visual" | "quantized" | "matryoshka" (축소 임베딩 후보)
     rerank: bool = False  # True: 크로스인코더 재랭킹 적용 (k*3 오버패치 후 재정렬)
+    accuracy: Optional[Literal["fast", "balanced", "exact"]] = None  # 미지정 시 컬렉션별 기본 프로파일
+    oversample: Optional[int] = Field(None, ge=1, le=50)  # quantized / matryoshka 모드 후보 배수 (k × oversample)
     system_id: Optional[str] = None  # 시스템 구분자 (예: "system01")
 
+class RAGBatchSearchRequest(BaseModel):
+    collection_name: str
+    queries: List[str] = Field(min_length=1, max_length=100)  # 같은 조건으로 검색할 쿼리 목록
+    k: int = 5
+    filters: Optional[Dict[str, Any]] = None
+    # 배치 처리 경로가 있는 모드만 허용 (vector: LATERAL 조인 SQL 1회, visual: 단건 경로 동시 실행)
+    search_mode: Literal["vector", "visual"] = "vector"
+    rerank: bool = False
+    accuracy: Optional[Literal["fast", "balanced", "exact"]] = None
+    system_id: Optional[str] = None
+
 class RAGCodeAnalyzeRequest(BaseModel):
     collection_name: str
     code: str               # 분석할 소스코드
     k: int = 5              # 관련 화면 검색 수
     filters: Optional[Dict[str, Any]] = None  # 메타데이터 필터
-    system_id: Optional[str] = None  # 시스템 구분자 (예: "system01")
\ No newline at end of file
+    system_id: Optional[str] = None  # 시스템 구분자 (예: "system01")
+
+
+# --- 사전 분석 결과 직접 수집 (LLM 생략) — app_analysis_prompt 응답 JSON과 동일한 구조 ---
+class AnalysisInputMetadata(BaseModel):
+    service_name: str
+    screen_name: str
+    version: str = "1.0.0"
+    access_level: str = ""
+
+class AnalysisScreenSection(BaseModel):
+    visible_title: Optional[str] = None
+    screen_type: str
+    layout_description: str = ""
+    primary_purpose: str
+
+class AnalysisExtractedElements(BaseModel):
+    all_visible_text: List[str] = []
+    button_texts: List[str] = []
+    field_labels: List[str] = []
+    menu_items: List[str] = []
+    table_headers: List[str] = []
+    other_text: List[str] = []
+
+class AnalysisUIComponents(BaseModel):
+    has_form: bool = False
+    has_table: bool = False
+    has_search: bool = False
+    has_pagination: bool = False
+    has_file_upload: bool = False
+    has_charts: bool = False
+    interactive_elements: List[str] = []
+
+class AnalysisCrudOperations(BaseModel):
+    create: Union[bool, str] = False  # LLM 응답은 여부 설명 문자열, 자체 도구는 bool
+    read: Union[bool, str] = False
+    update: Union[bool, str] = False
+    delete: Union[bool, str] = False
+
+class AnalysisFunctionalIndicators(BaseModel):
+    crud_operations: AnalysisCrudOperations = AnalysisCrudOperations()
+    user_actions: List[str] = []
+    data_flow: str = ""
+
+class ScreenAnalysisDocument(BaseModel):
+    input_metadata: AnalysisInputMetadata
+    screen_analysis: AnalysisScreenSection
+    extracted_elements: AnalysisExtractedElements = AnalysisExtractedElements()
+    ui_components: AnalysisUIComponents = AnalysisUIComponents()
+    functional_indicators: AnalysisFunctionalIndicators = AnalysisFunctionalIndicators()
+    search_keywords: List[str] = []
+
+class RAGAnalysisIngestRequest(BaseModel):
+    collection_name: str
+    analyses: List[ScreenAnalysisDocument] = Field(min_length=1, max_length=1000)
+    system_id: Optional[str] = None  # 시스템 구분자 (예: "system01")
@@ -12,6 +12,13 @@ class SearchResultItem(BaseModel):
 class RAGSearchResponse(BaseModel):
     results: List[SearchResultItem]
 
+class BatchSearchResultItem(BaseModel):
+    query: str
+    results: List[SearchResultItem]
+
+class RAGBatchSearchResponse(BaseModel):
+    results: List[BatchSearchResultItem]
+
 class RAGCodeAnalyzeResponse(BaseModel):
     related_screens: List[SearchResultItem]  # 관련 화면 목록
     analysis: str                            # LLM 영향도 분석 리포트
@@ -1,16 +1,29 @@
 import asyncio
 import base64
+import json
+import os
+from pathlib import Path
+import anyio
+import structlog
 from fastapi import APIRouter, Request, Depends
-from fastapi.responses import JSONResponse
-from typing import Optional
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.requests import ClientDisconnect
+from typing import AsyncIterator, Callable, Optional
 
 from app.core.service.rag_generation_service import RagGenerationService
+from app.core.service.ingestion_job_service import IngestionJobService
 from app.di_container import DIContainer
 from app.api.model.response import RAGResponse, RAGSearchResponse
-from app.api.model.response.rag_response import RAGCodeAnalyzeResponse, GraphScreensResponse
-from app.api.model.request.rag_request import RAGRequest, RAGSearchRequest, RAGCodeAnalyzeRequest
+from app.api.model.response.rag_response import (
+    RAGCodeAnalyzeResponse, GraphScreensResponse, RAGBatchSearchResponse,
+)
+from app.api.model.request.rag_request import (
+    RAGRequest, RAGSearchRequest, RAGBatchSearchRequest, RAGCodeAnalyzeRequest, RAGAnalysisIngestRequest,
+)
 from app.core.middleware.security import verify_api_key, rate_limit
 
+logger = structlog.get_logger()
+
 router = APIRouter()
 
 # 인증 + Rate Limit을 묶은 공통 dependency
@@ -28,35 +41,163 @@ def _prefixed_collection(collection_name: str, system_id: str = None) -> str:
     return collection_name
 
 
+def _within_ingest_root(directory_path: str) -> bool:
+    """디렉토리 수집 경로는 DIRECTORY_INGEST_ROOT(기본: 작업 디렉토리) 하위로 제한합니다."""
+    root = Path(os.getenv("DIRECTORY_INGEST_ROOT", ".")).resolve()
+    target = Path(directory_path).resolve()
+    return target == root or root in target.parents
+
+
 @router.post("/generation/vector", response_model=RAGResponse, dependencies=_secured)
 async def generate_rag(request: Request, body: RAGRequest) -> JSONResponse:
+    if body.directory_path and not _within_ingest_root(body.directory_path):
+        return JSONResponse(content={"detail": "허용되지 않은 디렉토리입니다."}, status_code=400)
     ragGenService = DIContainer.get(RagGenerationService)
-    await ragGenService.generation_rag(
-        collection_name=_prefixed_collection(body.collection_name, body.system_id)
+    summary = await ragGenService.generation_rag(
+        collection_name=_prefixed_collection(body.collection_name, body.system_id),
+        directory_path=body.directory_path,
+        full_rescan=body.full_rescan,
     )
-    return JSONResponse(content={"result": "ok"})
+    return JSONResponse(content={"result": "ok", "summary": summary})
+
+
+def _wait_requested(formData) -> bool:
+    """wait=true면 기존처럼 수집 완료까지 요청을 유지합니다 (하위 호환)."""
+    return str(formData.get("wait", "false")).lower() == "true"
 
 
 @router.post("/add/vector", dependencies=_secured)
 async def add_rag(request: Request) -> JSONResponse:
+    """이미지 수집 잡을 등록하고 즉시 job_id를 반환합니다. 진행 상황은 GET /jobs/{job_id}로 조회."""
     ragGenService = DIContainer.get(RagGenerationService)
     formData = await request.form()
-    await ragGenService.add_rag_data(
-        collection_name=_prefixed_collection(formData.get("collection_name"), formData.get("system_id")),
-        formData=formData
-    )
-    return JSONResponse(content={"result": "ok"})
+    collection_name = _prefixed_collection(formData.get("collection_name"), formData.get("system_id"))
+    if _wait_requested(formData):
+        await ragGenService.add_rag_data(collection_name=collection_name, formData=formData)
+        return JSONResponse(content={"result": "ok"})
+
+    jobService = DIContainer.get(IngestionJobService)
+    job_id = await jobService.submit("image", collection_name, ragGenService.build_image_items(formData))
+    return JSONResponse(content={"result": "accepted", "job_id": job_id}, status_code=202)
 
 
 @router.post("/add/text", dependencies=_secured)
 async def add_rag_text(request: Request) -> JSONResponse:
+    """텍스트 수집 잡을 등록하고 즉시 job_id를 반환합니다. 진행 상황은 GET /jobs/{job_id}로 조회."""
     ragGenService = DIContainer.get(RagGenerationService)
     formData = await request.form()
-    await ragGenService.add_rag_text_data(
-        collection_name=_prefixed_collection(formData.get("collection_name"), formData.get("system_id")),
-        formData=formData
+    collection_name = _prefixed_collection(formData.get("collection_name"), formData.get("system_id"))
+    if _wait_requested(formData):
+        await ragGenService.add_rag_text_data(collection_name=collection_name, formData=formData)
+        return JSONResponse(content={"result": "ok"})
+
+    jobService = DIContainer.get(IngestionJobService)
+    job_id = await jobService.submit("text", collection_name, ragGenService.build_text_items(formData))
+    return JSONResponse(content={"result": "accepted", "job_id": job_id}, status_code=202)
+
+
+@router.post("/add/analysis", dependencies=_secured)
+async def add_rag_analysis(request: Request, body: RAGAnalysisIngestRequest) -> JSONResponse:
+    """사전 분석된 화면 JSON을 LLM 분석 없이 바로 임베딩·저장합니다 (화면당 수 ms, 동기 처리).
+    스키마가 맞지 않으면 422와 함께 오류 위치(analyses.N.필드)를 반환합니다."""
+    ragGenService = DIContainer.get(RagGenerationService)
+    errors = await ragGenService.ingest_analysis_items(
+        collection_name=_prefixed_collection(body.collection_name, body.system_id),
+        analyses=[analysis.model_dump() for analysis in body.analyses],
     )
-    return JSONResponse(content={"result": "ok"})
+    failed = [{"index": i, "error": error} for i, error in enumerate(errors) if error]
+    return JSONResponse(content={"result": "ok" if not failed else "partial",
+                                 "stored": len(errors) - len(failed), "failed": failed})
+
+
+class _BodyStreamingResponse(StreamingResponse):
+    """요청 본문을 읽는 동안 응답을 함께 스트리밍하는 응답.
+    기본 StreamingResponse는 연결 종료 감지를 위해 receive()를 병행 호출하여 요청 본문 메시지를 가로채므로,
+    본문은 이 응답이 receive()로 직접 읽어 make_content(body_stream)에 넘기고, 연결 종료는 두 구간으로 나누어 감지합니다.
+    - 본문 수신 중: 본문 스트림이 http.disconnect를 받으면 ClientDisconnect를 발생시켜 처리 중단
+    - 본문 수신 후: 기본 StreamingResponse처럼 종료 감시 태스크가 http.disconnect 시 스트리밍(처리)을 취소
+    """
+
+    def __init__(self, make_content: Callable[[AsyncIterator[bytes]], AsyncIterator[str]], **kwargs):
+        super().__init__((), **kwargs)
+        self._make_content = make_content
+
+    async def __call__(self, scope, receive, send) -> None:
+        body_consumed = anyio.Event()
+        path = scope.get("path")
+
+        async def _body():
+            try:
+                while True:
+                    message = await receive()
+                    if message["type"] == "http.disconnect":
+                        raise ClientDisconnect()
+                    yield message.get("body", b"")
+                    if not message.get("more_body", False):
+                        break
+            finally:
+                body_consumed.set()
+
+        async def _stream():
+            try:
+                await self.stream_response(send)
+            except ClientDisconnect:
+                logger.warning("stream_client_disconnected", path=path, phase="request_body")
+
+        async def _watch_disconnect():
+            await body_consumed.wait()
+            await self.listen_for_disconnect(receive)
+            logger.warning("stream_client_disconnected", path=path, phase="response")
+
+        self.body_iterator = self._make_content(_body())
+        async with anyio.create_task_group() as task_group:
+
+            async def wrap(func):
+                await func()
+                task_group.cancel_scope.cancel()
+
+            task_group.start_soon(wrap, _stream)
+            await wrap(_watch_disconnect)
+
+        if self.background is not None:
+            await self.background()
+
+
+@router.post("/add/text/stream", dependencies=_secured)
+async def add_rag_text_stream(collection_name: str, system_id: Optional[str] = None) -> StreamingResponse:
+    """NDJSON(한 줄에 JSON 1건) 텍스트 대량 수집. 본문을 스트리밍으로 읽어 청크 단위로 처리하고,
+    레코드별 결과를 NDJSON으로 스트리밍 응답합니다 (서버 메모리는 카탈로그 크기와 무관).
+    클라이언트가 연결을 끊으면 진행 중인 청크 처리를 취소합니다 (이미 저장된 청크는 유지)."""
+    ragGenService = DIContainer.get(RagGenerationService)
+    collection = _prefixed_collection(collection_name, system_id)
+
+    async def _lines(body: AsyncIterator[bytes]):
+        async for result in ragGenService.ingest_text_stream(collection, body):
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+
+    return _BodyStreamingResponse(_lines, media_type="application/x-ndjson")
+
+
+@router.get("/jobs/{job_id}", dependencies=_secured)
+async def get_job_status(job_id: str) -> JSONResponse:
+    """수집 잡 상태 조회 — 전체 상태(queued/running/succeeded/partial/failed)와 항목별 진행/오류."""
+    jobService = DIContainer.get(IngestionJobService)
+    job = await jobService.get_status(job_id)
+    if job is None:
+        return JSONResponse(content={"detail": "잡을 찾을 수 없습니다."}, status_code=404)
+    return JSONResponse(content=job)
+
+
+@router.post("/jobs/{job_id}/resume", dependencies=_secured)
+async def resume_job(job_id: str) -> JSONResponse:
+    """failed/partial 잡의 미완료 항목만 다시 처리합니다. 체크포인트에 남은 분석 결과·임베딩은 재사용됩니다."""
+    jobService = DIContainer.get(IngestionJobService)
+    job = await jobService.resume(job_id)
+    if job is None:
+        return JSONResponse(content={"detail": "잡을 찾을 수 없습니다."}, status_code=404)
+    if job["status"] != "queued":
+        return JSONResponse(content={"detail": f"재개할 수 없는 상태입니다: {job['status']}"}, status_code=409)
+    return JSONResponse(content={"result": "accepted", "job_id": job_id}, status_code=202)
 
 
 @router.post("/search", response_model=RAGSearchResponse, dependencies=_secured)
@@ -68,7 +209,9 @@ async def search_rag(request: Request, body: RAGSearchRequest) -> JSONResponse:
         k=body.k,
         filters=body.filters,
         search_mode=body.search_mode,
-        rerank=body.rerank
+        rerank=body.rerank,
+        accuracy=body.accuracy,
+        oversample=body.oversample
     )
     return JSONResponse(content={
         "results": [
@@ -82,6 +225,39 @@ async def search_rag(request: Request, body: RAGSearchRequest) -> JSONResponse:
     })
 
 
+@router.post("/search/batch", response_model=RAGBatchSearchResponse, dependencies=_secured)
+async def search_rag_batch(request: Request, body: RAGBatchSearchRequest) -> JSONResponse:
+    """여러 쿼리를 한 요청으로 검색합니다 (캐시 MGET·임베딩·벡터 검색을 각각 1회로 묶음).
+    search_mode는 "vector"(SQL 1회) | "visual"(단건 경로 동시 실행)만 지원하며, 그 외 모드는 422를 반환합니다.
+    hybrid / quantized / matryoshka 검색은 단건 /search를 사용하세요."""
+    ragGenService = DIContainer.get(RagGenerationService)
+    batch = await ragGenService.search_rag_batch(
+        collection_name=_prefixed_collection(body.collection_name, body.system_id),
+        queries=body.queries,
+        k=body.k,
+        filters=body.filters,
+        search_mode=body.search_mode,
+        rerank=body.rerank,
+        accuracy=body.accuracy
+    )
+    return JSONResponse(content={
+        "results": [
+            {
+                "query": query,
+                "results": [
+                    {
+                        "content": doc["page_content"],
+                        "metadata": doc["metadata"],
+                        "score": round(score, 4)
+                    }
+                    for doc, score in results
+                ]
+            }
+            for query, results in zip(body.queries, batch)
+        ]
+    })
+
+
 @router.post("/search/image", dependencies=_secured)
 async def search_by_image(request: Request) -> JSONResponse:
     """이미지 파일을 업로드하면 CLIP 임베딩으로 시각적으로 유사한 문서를 검색합니다."""
@@ -167,6 +343,24 @@ async def get_related_screens(collection_name: str, screen_name: str, system_id:
     })
 
 
+@router.delete("/admin/analysis-cache/{prompt_version}", dependencies=_secured)
+async def purge_analysis_cache(prompt_version: str) -> JSONResponse:
+    """이미지 분석 결과 캐시에서 특정 프롬프트 버전의 항목을 모두 삭제합니다 (Postgres + Redis)."""
+    from app.core.interface.analysis_cache import AnalysisCache
+
+    deleted = await DIContainer.get(AnalysisCache).purge_prompt_version(prompt_version)
+    return JSONResponse(content={"prompt_version": prompt_version, "deleted": deleted})
+
+
+@router.delete("/admin/collections/{collection_name}", dependencies=_secured)
+async def delete_collection(collection_name: str, system_id: Optional[str] = None) -> JSONResponse:
+    """컬렉션의 그래프 노드와 벡터 데이터를 모두 삭제합니다 (파티션 모드에서는 파티션 DROP)."""
+    ragGenService = DIContainer.get(RagGenerationService)
+    prefixed = _prefixed_collection(collection_name, system_id)
+    await ragGenService.delete_collection(prefixed)
+    return JSONResponse(content={"collection_name": prefixed, "result": "deleted"})
+
+
 @router.get("/health")
 async def health_check():
     """서비스 상태 확인 - DB 및 Redis 실제 연결 상태 반환 (인증 불필요)"""
@@ -1,3 +1,6 @@
+import hashlib
+import os
+
 app_analysis_prompt_system = """
                 당신은 소프트웨어 테스트 자동화 전문가입니다.
                 소프트웨어중에서도 앱 서비스를 테스트하는데 전문화된 QA입니다.
@@ -70,6 +73,21 @@ app_analysis_prompt_user = """
 
             """
 
+# 다중 화면 묶음 분석 — 시스템/형식 프롬프트를 한 번만 보내고 화면 N개의 결과를 JSON 배열로 받음
+# 단일 화면 형식의 {service_name} 등은 "[화면 i] 블록 값"을 가리키는 안내 문구로 채워 사용
+app_analysis_prompt_pack_user = """
+                [묶음 분석]
+                아래에 화면 {count}개가 순서대로 첨부됩니다. 각 이미지 바로 앞의 [화면 i] 블록에 그 화면의 input_metadata가 JSON으로 주어집니다.
+                각 화면을 서로 독립적으로 분석하여, 화면 순서와 같은 순서의 JSON 배열(원소 {count}개)로만 응답하세요.
+                배열의 각 원소는 아래 단일 화면 형식을 따르고, 해당 화면 번호를 "screen_index": i 필드로 함께 출력하세요.
+                """ + app_analysis_prompt_user
+
+# 이미지 분석 프롬프트 버전 — 분석 결과 캐시 키에 포함되어 프롬프트 변경 시 자동으로 캐시 미스 처리
+# APP_ANALYSIS_PROMPT_VERSION 미설정 시 프롬프트 본문 해시 앞 12자리 사용
+app_analysis_prompt_version = os.getenv("APP_ANALYSIS_PROMPT_VERSION") or hashlib.sha256(
+    (app_analysis_prompt_system + app_analysis_prompt_user).encode("utf-8")
+).hexdigest()[:12]
+
 web_analysis_prompt = """
 
             """
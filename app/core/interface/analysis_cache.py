@@ -0,0 +1,23 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+
+class AnalysisCache(ABC):
+    """이미지 분석(LLM Vision) 결과 캐시.
+    키는 이미지 바이트 SHA-256 + 프롬프트 버전 + 입력 메타데이터로 구성되어,
+    동일 스크린샷은 컬렉션/system_id가 달라도 LLM 호출 없이 재사용됩니다."""
+
+    @abstractmethod
+    async def get(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """캐시된 분석 결과를 반환합니다. 없으면 None."""
+        pass
+
+    @abstractmethod
+    async def set(self, cache_key: str, image_sha256: str, prompt_version: str, analysis: Dict[str, Any]):
+        """분석 결과를 저장합니다."""
+        pass
+
+    @abstractmethod
+    async def purge_prompt_version(self, prompt_version: str) -> int:
+        """특정 프롬프트 버전의 캐시 항목을 모두 삭제하고 삭제 건수를 반환합니다."""
+        pass
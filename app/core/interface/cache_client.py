@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import List, Optional
 
 
 class CacheClient(ABC):
@@ -9,6 +9,11 @@ class CacheClient(ABC):
         """키에 해당하는 캐시 값을 반환합니다. 없으면 None."""
         pass
 
+    async def mget(self, keys: List[str]) -> List[Optional[str]]:
+        """여러 키를 한 번에 조회합니다 (keys와 같은 순서, 없는 키는 None).
+        기본 구현은 get을 순차 호출합니다."""
+        return [await self.get(key) for key in keys]
+
     @abstractmethod
     async def set(self, key: str, value: str, ttl: int = 3600):
         """키-값을 캐시에 저장합니다. ttl은 초 단위."""
@@ -19,7 +24,21 @@ class CacheClient(ABC):
         """패턴에 매칭되는 모든 키를 삭제합니다."""
         pass
 
+    @abstractmethod
+    async def incr(self, key: str) -> int:
+        """정수 카운터를 1 올리고 새 값을 반환합니다 (만료 없음). 캐시 세대 번호에 사용."""
+        pass
+
     @abstractmethod
     async def ping(self) -> bool:
         """캐시 연결 상태를 확인합니다. 정상이면 True."""
         pass
+
+    async def acquire_lock(self, key: str, ttl: int) -> Optional[str]:
+        """워커 간 공유 락을 획득하고 해제용 토큰을 반환합니다. 다른 워커가 보유 중이면 None.
+        기본 구현은 공유 저장소가 없으므로 항상 획득한 것으로 간주합니다."""
+        return "local"
+
+    async def release_lock(self, key: str, token: str):
+        """acquire_lock으로 얻은 락을 해제합니다 (토큰이 일치할 때만)."""
+        pass
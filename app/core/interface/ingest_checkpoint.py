@@ -0,0 +1,33 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List
+
+
+class IngestCheckpoint(ABC):
+    """수집 잡 항목별 단계 체크포인트 (analyzed → embedded → stored).
+    저장 단계에서 실패한 잡을 재개할 때 완료된 LLM 분석과 임베딩을 다시 계산하지 않기 위해 사용합니다.
+    item_index는 잡 입력 항목의 인덱스입니다."""
+
+    @abstractmethod
+    async def load(self, job_id: str) -> Dict[int, Dict[str, Any]]:
+        """잡의 체크포인트를 {item_index: {stage, analysis, embedding, image_embedding}}로 반환합니다."""
+        pass
+
+    @abstractmethod
+    async def save_analyses(self, job_id: str, analyses: Dict[int, Dict[str, Any]]):
+        """LLM 분석 결과를 저장하고 단계를 analyzed로 기록합니다."""
+        pass
+
+    @abstractmethod
+    async def save_embeddings(self, job_id: str, embeddings: Dict[int, Dict[str, Any]]):
+        """항목별 {embedding, image_embedding}을 저장하고 단계를 embedded로 기록합니다."""
+        pass
+
+    @abstractmethod
+    async def mark_stored(self, job_id: str, item_indices: List[int]):
+        """저장 완료 항목을 stored로 기록합니다 (임베딩은 더 필요 없으므로 비움)."""
+        pass
+
+    @abstractmethod
+    async def clear(self, job_id: str):
+        """잡의 체크포인트를 모두 삭제합니다 (잡 성공 시)."""
+        pass
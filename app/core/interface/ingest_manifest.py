@@ -0,0 +1,17 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List
+
+
+class IngestManifest(ABC):
+    """컬렉션별 디렉토리 수집 이력 (파일 경로 → SHA-256, mtime, 크기, 메타데이터 해시).
+    재실행 시 신규/변경 파일만 다시 분석하기 위해 사용합니다."""
+
+    @abstractmethod
+    async def load(self, collection_name: str) -> Dict[str, Dict[str, Any]]:
+        """컬렉션의 수집 완료 파일 목록을 {file_path: {sha256, mtime, size, meta_digest}}로 반환합니다."""
+        pass
+
+    @abstractmethod
+    async def record(self, collection_name: str, entries: List[Dict[str, Any]]):
+        """수집 완료 파일을 기록(upsert)합니다. entry: {file_path, sha256, mtime, size, meta_digest}"""
+        pass
@@ -0,0 +1,38 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+
+class JobStore(ABC):
+    """비동기 수집 잡의 상태와 입력 payload를 영속화하는 저장소.
+    워커 재시작 후에도 잡 상태 조회 및 미완료 잡 재개가 가능해야 합니다."""
+
+    @abstractmethod
+    async def create(self, job: Dict[str, Any], payload: List[Dict[str, Any]]):
+        """새 잡과 입력 항목(payload)을 저장합니다."""
+        pass
+
+    @abstractmethod
+    async def save(self, job: Dict[str, Any]):
+        """잡 상태를 갱신합니다. updated_at(하트비트)도 함께 갱신됩니다."""
+        pass
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """잡 상태를 반환합니다. 없으면 None."""
+        pass
+
+    @abstractmethod
+    async def load_payload(self, job_id: str) -> List[Dict[str, Any]]:
+        """잡 생성 시 저장한 입력 항목 목록을 반환합니다."""
+        pass
+
+    @abstractmethod
+    async def claim(self, job_id: str, worker_id: str, stale_seconds: int) -> bool:
+        """잡 실행권을 원자적으로 획득합니다.
+        queued 상태이거나, running이지만 stale_seconds 동안 하트비트가 없는 잡만 획득 가능."""
+        pass
+
+    @abstractmethod
+    async def list_recoverable(self, stale_seconds: int) -> List[str]:
+        """재개 대상 잡 ID 목록 (queued 또는 하트비트가 끊긴 running)."""
+        pass
@@ -13,3 +13,8 @@ class MultimodalEmbeddingClient(ABC):
     def embed_image_base64(self, base64_str: str) -> List[float]:
         """base64 인코딩된 이미지를 CLIP 이미지 인코더로 임베딩합니다."""
         ...
+
+    def embed_images_base64(self, base64_list: List[str]) -> List[List[float]]:
+        """여러 이미지를 한 번에 임베딩합니다. 입력 순서대로 벡터를 반환합니다.
+        기본 구현은 단건 호출 반복이며, 구현체는 배치 인코딩으로 재정의합니다."""
+        return [self.embed_image_base64(b64) for b64 in base64_list]
@@ -8,24 +8,55 @@ class RagRepository(ABC):
         """문서와 메타데이터를 그래프에 저장합니다."""
         pass
 
+    @abstractmethod
+    def find_changed_documents(self, collection_name: str, documents: List[Dict[str, Any]]) -> List[int]:
+        """저장 전 문서 중 신규이거나 내용이 바뀐 문서의 인덱스를 반환합니다.
+        화면 식별 키(service_name, screen_name, version)별 저장된 content_hash와 비교하며,
+        변경 없는 문서는 임베딩·저장을 생략할 수 있습니다."""
+        pass
+
     @abstractmethod
     def similarity_search(self, collection_name: str, query_embedding: Optional[List[float]], k: int = 5,
                           filters: Optional[Dict[str, Any]] = None,
                           search_mode: str = "vector", query_text: Optional[str] = None,
-                          image_embedding: Optional[List[float]] = None) -> List[Tuple[Dict[str, Any], float]]:
+                          image_embedding: Optional[List[float]] = None,
+                          accuracy: Optional[str] = None,
+                          oversample: Optional[int] = None) -> List[Tuple[Dict[str, Any], float]]:
         """임베딩과 유사한 문서를 검색합니다.
         filters: 메타데이터 필드 조건
         search_mode: 'vector'(기본) | 'hybrid'(벡터+BM25 RRF) | 'visual'(CLIP 이미지 임베딩)
+                     | 'quantized'(이진 양자화 후보 + halfvec 재정렬) | 'matryoshka'(768차원 축소 임베딩 후보 + 재정렬)
         query_text: hybrid 모드에서 BM25 키워드 검색에 사용할 원본 쿼리
         image_embedding: visual 모드에서 사용할 CLIP 임베딩 벡터(512차원)
+        accuracy: 정확도 프로파일 'fast' | 'balanced' | 'exact' (None이면 저장소 기본값)
+        oversample: quantized / matryoshka 모드의 후보 배수 (k × oversample, None이면 저장소 기본값)
         """
         pass
 
+    def similarity_search_batch(self, collection_name: str, query_embeddings: List[List[float]], k: int = 5,
+                                filters: Optional[Dict[str, Any]] = None, search_mode: str = "vector",
+                                query_texts: Optional[List[str]] = None,
+                                accuracy: Optional[str] = None,
+                                oversample: Optional[int] = None) -> List[List[Tuple[Dict[str, Any], float]]]:
+        """여러 쿼리를 같은 조건으로 검색하고 쿼리 순서대로 결과 목록을 반환합니다.
+        기본 구현은 similarity_search를 순차 호출합니다."""
+        texts = query_texts or [None] * len(query_embeddings)
+        return [
+            self.similarity_search(collection_name, embedding, k, filters, search_mode, text,
+                                   accuracy=accuracy, oversample=oversample)
+            for embedding, text in zip(query_embeddings, texts)
+        ]
+
     @abstractmethod
     def collection_exists(self, collection_name: str) -> bool:
         """컬렉션(그래프)의 존재 여부를 확인합니다."""
         pass
 
+    @abstractmethod
+    def delete_collection(self, collection_name: str) -> List[str]:
+        """컬렉션의 그래프 노드와 벡터 행을 모두 삭제하고, 삭제된 화면이 속했던 서비스명 목록을 반환합니다."""
+        pass
+
     @abstractmethod
     def get_screens_by_service(self, service_name: str, version: Optional[str] = None) -> List[Dict[str, Any]]:
         """서비스에 속한 화면 노드 전체를 AGE 그래프에서 조회합니다."""
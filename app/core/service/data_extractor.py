@@ -1,6 +1,7 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional
 from langchain_core.documents import Document
 import os
+import json
 import base64
 from pathlib import Path
 from typing import List, Dict
@@ -31,6 +32,22 @@ class ImageExtractor:
                     )        
         return result
             
+    def iter_image_files(self, directory_path) -> Iterator[Path]:
+        """디렉토리의 이미지 파일 경로를 이름순으로 반환합니다 (파일 내용은 읽지 않음)."""
+        image_extensions = {'.jpg', '.jpeg', '.png', '.webp'}
+        for file_path in sorted(Path(directory_path).iterdir()):
+            if file_path.is_file() and file_path.suffix.lower() in image_extensions:
+                yield file_path
+
+    def load_manifest(self, directory_path) -> Optional[Dict[str, Any]]:
+        """디렉토리의 manifest.json을 읽습니다. 없으면 None.
+        형식: {"defaults": {공통 메타데이터}, "files": {"파일명 또는 확장자 제외 이름": {메타데이터}}}"""
+        manifest_path = Path(directory_path) / "manifest.json"
+        if not manifest_path.is_file():
+            return None
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
     def create_column_document(self, analysis_results: list) -> List[Document]:
         
         
@@ -0,0 +1,119 @@
+import base64
+import io
+import os
+import time
+from typing import Dict
+
+import structlog
+
+from app.infra.monitoring.metrics import image_preprocess_bytes_saved, image_preprocess_latency
+
+logger = structlog.get_logger()
+
+_MIME_TYPES = {"WEBP": "image/webp", "JPEG": "image/jpeg", "PNG": "image/png"}
+
+_CLIP_INPUT_SIZE = 224  # clip-ViT-B-32 입력 해상도 (짧은 변 기준)
+_STATUS_BAR_MAX_RATIO = 0.08  # 위/아래 각각 최대 8%까지만 크롭
+_UNIFORM_TOLERANCE = 6  # 채널별 (최대-최소) 허용 편차
+
+
+class ImagePreprocessor:
+    """업로드 스크린샷을 Vision 분석 전에 축소·재인코딩합니다.
+    - 긴 변 IMAGE_MAX_LONG_EDGE로 축소, IMAGE_FORMAT(webp|jpeg) / IMAGE_QUALITY로 재인코딩
+    - EXIF 회전 반영 후 메타데이터(EXIF/ICC) 제거
+    - 위/아래 단색 상태바·내비게이션 바 크롭
+    - CLIP용 224px 변형 별도 생성
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("IMAGE_PREPROCESS_ENABLED", "true").lower() == "true"
+        self.max_long_edge = int(os.getenv("IMAGE_MAX_LONG_EDGE", "1600"))
+        self.format = os.getenv("IMAGE_FORMAT", "webp").upper()
+        if self.format == "JPG":
+            self.format = "JPEG"
+        self.quality = int(os.getenv("IMAGE_QUALITY", "80"))
+        self.crop_status_bar = os.getenv("IMAGE_CROP_STATUS_BAR", "true").lower() == "true"
+
+    def process_item(self, data_item: Dict[str, str]) -> Dict[str, str]:
+        """수집 항목의 image(base64)를 전처리한 새 항목을 반환합니다.
+        추가 필드: mime_type (LLM data URL용), clip_image (CLIP용 224px base64).
+        비활성화 또는 디코딩 실패 시 원본 항목을 그대로 반환합니다."""
+        if not self.enabled:
+            return data_item
+        started = time.perf_counter()
+        raw = base64.b64decode(data_item["image"])
+        try:
+            analysis_bytes, clip_bytes = self.process_bytes(raw)
+        except Exception as e:
+            logger.warning("image_preprocess_failed", filename=data_item.get("filename"), error=str(e)[:100])
+            return data_item
+
+        image_preprocess_latency.observe(time.perf_counter() - started)
+        image_preprocess_bytes_saved.inc(max(0, len(raw) - len(analysis_bytes)))
+        return {
+            **data_item,
+            "image": base64.b64encode(analysis_bytes).decode("utf-8"),
+            "mime_type": _MIME_TYPES[self.format],
+            "clip_image": base64.b64encode(clip_bytes).decode("utf-8"),
+        }
+
+    def process_bytes(self, raw: bytes) -> tuple:
+        """원본 바이트 → (분석용 인코딩 바이트, CLIP용 224px JPEG 바이트)"""
+        from PIL import Image, ImageOps
+
+        img = Image.open(io.BytesIO(raw))
+        img = ImageOps.exif_transpose(img)
+        img = self._to_rgb(img)
+        if self.crop_status_bar:
+            img = self._crop_uniform_bars(img)
+
+        width, height = img.size
+        long_edge = max(width, height)
+        if long_edge > self.max_long_edge:
+            scale = self.max_long_edge / long_edge
+            img = img.resize((max(1, round(width * scale)), max(1, round(height * scale))), Image.LANCZOS)
+
+        # save 시 exif/icc_profile을 넘기지 않으므로 메타데이터가 제거됨
+        analysis = io.BytesIO()
+        img.save(analysis, format=self.format, quality=self.quality)
+
+        width, height = img.size
+        scale = _CLIP_INPUT_SIZE / min(width, height)
+        clip_img = img.resize((max(1, round(width * scale)), max(1, round(height * scale))), Image.BICUBIC) \
+            if scale < 1 else img
+        clip = io.BytesIO()
+        clip_img.save(clip, format="JPEG", quality=90)
+        return analysis.getvalue(), clip.getvalue()
+
+    @staticmethod
+    def _to_rgb(img):
+        from PIL import Image
+        if img.mode in ("RGBA", "LA", "P"):
+            img = img.convert("RGBA")
+            background = Image.new("RGB", img.size, (255, 255, 255))
+            background.paste(img, mask=img.getchannel("A"))
+            return background
+        return img.convert("RGB")
+
+    @staticmethod
+    def _is_bar_row(img, y: int, color: tuple) -> bool:
+        """행 전체가 가장자리 색(color)과 같은 단색인지 검사합니다."""
+        extrema = img.crop((0, y, img.width, y + 1)).getextrema()
+        return all(abs(low - c) <= _UNIFORM_TOLERANCE and abs(high - c) <= _UNIFORM_TOLERANCE
+                   for (low, high), c in zip(extrema, color))
+
+    def _crop_uniform_bars(self, img):
+        """위/아래 가장자리의 단색 행(상태바·내비게이션 바 배경)을 잘라냅니다.
+        가장자리 첫 행과 같은 색이 이어지는 구간만 잘라 본문 단색 영역은 보존합니다."""
+        limit = int(img.height * _STATUS_BAR_MAX_RATIO)
+        top_color = img.getpixel((0, 0))
+        top = 0
+        while top < limit and self._is_bar_row(img, top, top_color):
+            top += 1
+        bottom_color = img.getpixel((0, img.height - 1))
+        bottom = img.height
+        while img.height - bottom < limit and self._is_bar_row(img, bottom - 1, bottom_color):
+            bottom -= 1
+        if top == 0 and bottom == img.height:
+            return img
+        return img.crop((0, top, img.width, bottom))
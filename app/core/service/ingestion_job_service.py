@@ -0,0 +1,218 @@
+import asyncio
+import os
+import socket
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import structlog
+
+from app.core.interface.ingest_checkpoint import IngestCheckpoint
+from app.core.interface.job_store import JobStore
+
+logger = structlog.get_logger()
+
+# 프로세스당 동시 실행 잡 수
+_INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "2"))
+# 하트비트가 이 시간(초) 이상 끊긴 running 잡은 다른 워커가 재개
+_JOB_STALE_SECONDS = int(os.getenv("INGEST_JOB_STALE_SECONDS", "300"))
+# 유휴 워커가 재개 대상 잡을 확인하는 주기(초)
+_RECOVER_INTERVAL = 60
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class _JobCheckpoint:
+    """IngestCheckpoint를 잡 하나에 바인딩하고, 수집 파이프라인의 항목 순번(pending 내 위치)을
+    잡 항목 인덱스로 변환합니다. RagGenerationService는 이 객체만 사용합니다."""
+
+    def __init__(self, checkpoint: IngestCheckpoint, job_id: str, pending: List[int]):
+        self._checkpoint = checkpoint
+        self._job_id = job_id
+        self._pending = pending
+
+    async def load(self) -> Dict[int, Dict[str, Any]]:
+        saved = await self._checkpoint.load(self._job_id)
+        return {local: saved[index] for local, index in enumerate(self._pending) if index in saved}
+
+    async def save_analyses(self, analyses: Dict[int, Dict[str, Any]]):
+        await self._checkpoint.save_analyses(self._job_id, {self._pending[i]: a for i, a in analyses.items()})
+
+    async def save_embeddings(self, embeddings: Dict[int, Dict[str, Any]]):
+        await self._checkpoint.save_embeddings(self._job_id, {self._pending[i]: e for i, e in embeddings.items()})
+
+    async def mark_stored(self, local_indices: List[int]):
+        await self._checkpoint.mark_stored(self._job_id, [self._pending[i] for i in local_indices])
+
+
+class IngestionJobService:
+    """/add/vector, /add/text 비동기 수집 잡 큐.
+    요청은 입력 항목을 JobStore에 저장한 뒤 즉시 job_id를 반환하고,
+    프로세스 내 워커 풀이 RagGenerationService 수집 파이프라인을 실행합니다.
+    잡 상태/입력은 JobStore(Postgres 또는 Redis)에 영속화되어 워커 재시작 후 재개됩니다.
+    IngestCheckpoint가 주입되면 항목별 분석 결과/임베딩을 단계마다 기록하여, 재개 시 미완료 단계만 다시 실행합니다."""
+
+    def __init__(self, rag_service, job_store: JobStore, checkpoint: Optional[IngestCheckpoint] = None):
+        self.rag_service = rag_service
+        self.job_store = job_store
+        self.checkpoint = checkpoint
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._workers: List[asyncio.Task] = []
+        self._worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+    async def start(self):
+        """워커 풀을 시작하고, 이전 프로세스에서 미완료된 잡을 큐에 다시 넣습니다."""
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(_INGEST_WORKERS)]
+        await self._recover()
+        logger.info("ingest_workers_started", workers=_INGEST_WORKERS, worker_id=self._worker_id)
+
+    async def stop(self):
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, kind: str, collection_name: str, items: List[Dict[str, Any]]) -> str:
+        """잡을 생성하고 큐에 넣은 뒤 job_id를 반환합니다. kind: 'image' | 'text'"""
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "kind": kind,
+            "collection_name": collection_name,
+            "status": "queued",
+            "total": len(items),
+            "analyzed": 0,
+            "stored": 0,
+            "failed": 0,
+            "items": [
+                {"index": i, "name": item.get("filename") or item.get("screen_name", ""),
+                 "status": "pending", "error": None}
+                for i, item in enumerate(items)
+            ],
+            "error": None,
+            "created_at": _now(),
+            "updated_at": _now(),
+        }
+        await self.job_store.create(job, items)
+        await self._queue.put(job_id)
+        logger.info("ingest_job_submitted", job_id=job_id, kind=kind,
+                    collection_name=collection_name, total=len(items))
+        return job_id
+
+    async def get_status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.job_store.get(job_id)
+
+    async def resume(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """failed/partial로 끝난 잡을 다시 큐에 넣습니다. 저장 완료 항목은 건너뛰고,
+        체크포인트가 있는 항목은 완료된 단계(분석/임베딩) 이후부터 이어서 처리합니다.
+        반환: 갱신된 잡 상태 (잡이 없으면 None, 재개 불가 상태면 변경 없이 그대로 반환)"""
+        job = await self.job_store.get(job_id)
+        if job is None or job["status"] not in ("failed", "partial"):
+            return job
+        for item in job["items"]:
+            if item["status"] == "failed":
+                item["status"] = "pending"
+                item["error"] = None
+        job["status"] = "queued"
+        job["error"] = None
+        job.pop("finished_at", None)
+        await self._save(job)
+        await self._queue.put(job_id)
+        logger.info("ingest_job_resumed", job_id=job_id, pending=job["total"] - job["stored"])
+        return job
+
+    async def _recover(self):
+        try:
+            job_ids = await self.job_store.list_recoverable(_JOB_STALE_SECONDS)
+        except Exception as e:
+            logger.warning("ingest_job_recover_failed", error=str(e)[:100])
+            return
+        for job_id in job_ids:
+            await self._queue.put(job_id)
+        if job_ids:
+            logger.info("ingest_jobs_recovered", count=len(job_ids))
+
+    async def _worker(self):
+        while True:
+            try:
+                job_id = await asyncio.wait_for(self._queue.get(), timeout=_RECOVER_INTERVAL)
+            except asyncio.TimeoutError:
+                await self._recover()
+                continue
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                logger.error("ingest_job_error", job_id=job_id, error=str(e)[:200])
+
+    async def _run(self, job_id: str):
+        # 다른 워커/프로세스가 이미 실행 중이면 건너뜀
+        if not await self.job_store.claim(job_id, self._worker_id, _JOB_STALE_SECONDS):
+            return
+        job = await self.job_store.get(job_id)
+        payload = await self.job_store.load_payload(job_id)
+
+        # 재개 시 이미 저장 완료된 항목은 제외
+        pending = [item["index"] for item in job["items"] if item["status"] != "stored"]
+        job["status"] = "running"
+        job["error"] = None
+        job.setdefault("started_at", _now())
+        await self._save(job)
+
+        async def on_progress(local_index: int, stage: str, error: Optional[str]):
+            item = job["items"][pending[local_index]]
+            item["status"] = stage
+            item["error"] = error
+            await self._save(job)
+
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            ingest = (self.rag_service.ingest_image_items if job["kind"] == "image"
+                      else self.rag_service.ingest_text_items)
+            kwargs = {"checkpoint": _JobCheckpoint(self.checkpoint, job_id, pending)} if self.checkpoint else {}
+            await ingest(job["collection_name"], [payload[i] for i in pending], on_progress, **kwargs)
+        except Exception as e:
+            job["error"] = f"{type(e).__name__}: {str(e)[:200]}"
+            for i in pending:
+                if job["items"][i]["status"] != "stored":
+                    job["items"][i]["status"] = "failed"
+                    job["items"][i]["error"] = job["items"][i]["error"] or job["error"]
+        finally:
+            heartbeat.cancel()
+
+        self._count(job)
+        if job["stored"] == job["total"]:
+            job["status"] = "succeeded"
+        elif job["stored"] == 0:
+            job["status"] = "failed"
+        else:
+            job["status"] = "partial"
+        job["finished_at"] = _now()
+        await self._save(job)
+        if self.checkpoint and job["status"] == "succeeded":
+            try:
+                await self.checkpoint.clear(job_id)
+            except Exception as e:
+                logger.warning("ingest_checkpoint_clear_failed", job_id=job_id, error=str(e)[:100])
+        logger.info("ingest_job_done", job_id=job_id, status=job["status"],
+                    stored=job["stored"], failed=job["failed"], total=job["total"])
+
+    async def _heartbeat(self, job: Dict[str, Any]):
+        """LLM 분석처럼 진행 이벤트가 없는 구간에도 실행권이 만료되지 않도록 주기적으로 저장."""
+        while True:
+            await asyncio.sleep(max(1, _JOB_STALE_SECONDS // 3))
+            await self._save(job)
+
+    async def _save(self, job: Dict[str, Any]):
+        self._count(job)
+        job["updated_at"] = _now()
+        await self.job_store.save(job)
+
+    @staticmethod
+    def _count(job: Dict[str, Any]):
+        """항목 상태로부터 집계 필드를 갱신합니다."""
+        statuses = [item["status"] for item in job["items"]]
+        job["stored"] = statuses.count("stored")
+        job["failed"] = statuses.count("failed")
+        job["analyzed"] = job["stored"] + statuses.count("analyzed") + statuses.count("embedded")
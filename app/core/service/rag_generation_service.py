@@ -1,8 +1,12 @@
 import asyncio
 import hashlib
+import inspect
 import json
 import base64
-from typing import List, Dict
+import os
+import random
+import time
+from typing import List, Dict, Optional, Callable, Awaitable, AsyncIterator
 
 import structlog
 from starlette.datastructures import FormData
@@ -13,77 +17,307 @@ from app.di_container import DIContainer
 from app.core.interface import RagRepository
 from app.core.interface.llm_client import LlmClient
 from app.core.interface.cache_client import CacheClient
+from app.core.interface.analysis_cache import AnalysisCache
+from app.core.interface.ingest_manifest import IngestManifest
 from app.core.interface.multimodal_embedding_client import MultimodalEmbeddingClient
 from app.core.service.data_extractor import ImageExtractor
-from app.config.prompt import app_analysis_prompt_user, app_analysis_prompt_system
+from app.core.service.image_preprocessor import ImagePreprocessor
+from app.core.service.single_flight import SingleFlight
+from app.config.prompt import (
+    app_analysis_prompt_user, app_analysis_prompt_system, app_analysis_prompt_version,
+    app_analysis_prompt_pack_user,
+)
 from app.infra.monitoring.metrics import (
     cache_hits, cache_misses,
     llm_requests, embedding_requests,
-    search_latency,
+    search_latency, image_analysis_latency, analysis_direct_items, vision_pack_fallbacks,
+    cache_fill_lock, semantic_cache_requests, semantic_cache_hit_samples, search_batch_size,
+    search_accuracy_requests,
 )
 
 logger = structlog.get_logger()
 
 _CACHE_TTL = 3600  # 1시간
-_EMBED_BATCH_SIZE = 20  # Google AI API 배치 크기
+
+# 캐시 미스 시 워커 간 채우기 락: 한 워커만 계산하고 나머지는 최대 _CACHE_FILL_WAIT_SECONDS 동안 캐시를 기다림
+_CACHE_FILL_LOCK = os.getenv("CACHE_FILL_LOCK", "false").lower() == "true"
+_CACHE_FILL_LOCK_TTL = 30  # 락 보유 워커가 죽어도 이 시간(초) 후 자동 해제
+_CACHE_FILL_WAIT_SECONDS = float(os.getenv("CACHE_FILL_WAIT_SECONDS", "2.0"))
+_CACHE_FILL_POLL_SECONDS = 0.05
+
+# 프로세스 내 동일 검색/그래프 조회 합치기 (캐시 키 단위)
+_search_flight = SingleFlight("search")
+_graph_flight = SingleFlight("graph")
+
+# 의미 기반 검색 결과 캐시: 정확한 키 미스 시 쿼리 임베딩이 임계값 이상 유사한 이전 결과 재사용 (numpy 필요)
+_SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+_SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+_SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "256"))  # 검색 조건별 보관 쿼리 수
+_SEMANTIC_CACHE_SAMPLE_RATE = float(os.getenv("SEMANTIC_CACHE_SAMPLE_RATE", "0.05"))  # 오탐 검증 샘플 비율
+_background_tasks: set = set()
+
+# 검색 정확도 프로파일 (fast | balanced | exact) — 요청 미지정 시 컬렉션별 설정 → 전체 기본값 순으로 적용
+_SEARCH_ACCURACY_PROFILES = ("fast", "balanced", "exact")  # PGVectorManager.SEARCH_PROFILES 키
+
+
+def _load_accuracy_settings():
+    """환경변수 정확도 설정을 검증합니다. 잘못된 값은 검색마다 KeyError(500)가 나므로 로드 시 걸러냅니다.
+    기본값 오류는 balanced로 대체하고, 컬렉션별 설정 오류는 무시(기본값 적용)합니다."""
+    default = os.getenv("SEARCH_ACCURACY_DEFAULT", "balanced")
+    if default not in _SEARCH_ACCURACY_PROFILES:
+        logger.error("search_accuracy_invalid", setting="SEARCH_ACCURACY_DEFAULT", value=default, fallback="balanced")
+        default = "balanced"
+    overrides = {}
+    for collection_name, profile in json.loads(os.getenv("SEARCH_ACCURACY_OVERRIDES", "{}")).items():
+        if profile in _SEARCH_ACCURACY_PROFILES:
+            overrides[collection_name] = profile
+        else:
+            logger.error("search_accuracy_invalid", setting="SEARCH_ACCURACY_OVERRIDES", value=profile,
+                         collection_name=collection_name, fallback=default)
+    return default, overrides
+
+
+# SEARCH_ACCURACY_OVERRIDES 예: {"system01:screens": "exact"}
+_SEARCH_ACCURACY_DEFAULT, _SEARCH_ACCURACY_OVERRIDES = _load_accuracy_settings()
+
+# 임베딩 배치: 항목 수와 추정 토큰 수 중 먼저 도달하는 기준으로 분할 (Google AI API 요청 한도 회피)
+_EMBED_BATCH_MAX_ITEMS = int(os.getenv("EMBED_BATCH_MAX_ITEMS", "100"))
+_EMBED_BATCH_MAX_TOKENS = int(os.getenv("EMBED_BATCH_MAX_TOKENS", "16000"))
+_EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "4"))  # 동시 실행 배치 수
+_EMBED_MAX_RETRIES = 3  # 배치 단위 재시도 횟수
+
+# 디렉토리 수집: 한 번에 메모리에 올리는 파일 수
+_DIRECTORY_CHUNK_SIZE = int(os.getenv("DIRECTORY_INGEST_CHUNK_SIZE", "16"))
+_DEFAULT_IMAGE_DIRECTORY = "./test_images"
+
+# NDJSON 스트리밍 수집: 청크당 레코드 수 / 한 줄 최대 크기 (메모리 상한)
+_NDJSON_CHUNK_SIZE = int(os.getenv("NDJSON_INGEST_CHUNK_SIZE", "50"))
+_NDJSON_MAX_LINE_BYTES = 1024 * 1024
+
+# 분석 캐시 키에 포함되는 입력 메타데이터 필드 (프롬프트에 주입되어 분석 결과에 영향)
+_ANALYSIS_META_FIELDS = ("service_name", "screen_name", "version", "access_level")
+
+# Vision 요청 1회에 묶어 보낼 화면 수 (1이면 화면당 개별 호출)
+_VISION_PACK_SIZE = max(1, int(os.getenv("VISION_PACK_SIZE", "1")))
+
+# 항목별 진행 콜백: (항목 인덱스, 단계, 오류 메시지) → 수집 잡 상태 갱신에 사용
+ItemProgress = Optional[Callable[[int, str, Optional[str]], Awaitable[None]]]
+
+
+def _estimate_tokens(text: str) -> int:
+    """토크나이저 없이 쓰는 보수적 토큰 추정치. 한글은 글자당 토큰 수가 많아 UTF-8 바이트 기준으로 계산."""
+    return len(text.encode("utf-8")) // 3 + 1
+
+
+def _plan_embed_batches(texts: list) -> List[List[int]]:
+    """텍스트 인덱스를 배치로 분할합니다. 각 배치는 _EMBED_BATCH_MAX_ITEMS개,
+    _EMBED_BATCH_MAX_TOKENS 추정 토큰을 넘지 않습니다 (단일 텍스트가 한도 초과 시 단독 배치)."""
+    batches, current, current_tokens = [], [], 0
+    for i, text in enumerate(texts):
+        tokens = _estimate_tokens(text)
+        if current and (len(current) >= _EMBED_BATCH_MAX_ITEMS
+                        or current_tokens + tokens > _EMBED_BATCH_MAX_TOKENS):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _manifest_metadata(manifest: dict, filename: str) -> Optional[Dict[str, str]]:
+    """manifest.json에서 파일 메타데이터를 찾습니다 (파일명 → 확장자 제외 이름 순, defaults 병합).
+    파일 항목과 defaults가 모두 없으면 None."""
+    files = manifest.get("files", {})
+    meta = files.get(filename) or files.get(os.path.splitext(filename)[0])
+    defaults = manifest.get("defaults")
+    if meta is None and defaults is None:
+        return None
+    merged = {**(defaults or {}), **(meta or {})}
+    return {
+        "service_name": merged.get("service_name", ""),
+        "screen_name": merged.get("screen_name", ""),  # 빈 값이면 프롬프트에서 AI가 자동 추론
+        "version": merged.get("version", "1.0.0"),
+        "access_level": merged.get("access_level", ""),
+    }
+
+
+def _file_fingerprint(file_path, meta: Dict[str, str], previous: Optional[Dict]) -> Optional[Dict]:
+    """파일 수집 이력 항목을 만듭니다. mtime·크기·메타데이터가 이전 기록과 같으면 해시 계산 없이 None.
+    반환 항목의 changed=False는 mtime만 바뀌고 내용은 동일한 경우입니다."""
+    stat = file_path.stat()
+    meta_digest = hashlib.sha256(json.dumps(meta, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+    if (previous and previous["mtime"] == stat.st_mtime and previous["size"] == stat.st_size
+            and previous["meta_digest"] == meta_digest):
+        return None
+
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    sha256 = digest.hexdigest()
+    return {
+        "file_path": str(file_path.resolve()),
+        "sha256": sha256,
+        "mtime": stat.st_mtime,
+        "size": stat.st_size,
+        "meta_digest": meta_digest,
+        "metadata": meta,
+        "changed": not (previous and previous["sha256"] == sha256 and previous["meta_digest"] == meta_digest),
+    }
+
+
+async def _iter_ndjson(byte_stream: AsyncIterator[bytes]) -> AsyncIterator[tuple]:
+    """바이트 청크 스트림을 줄 단위로 잘라 (줄 번호, 레코드 dict, 오류 메시지)를 순서대로 반환합니다.
+    빈 줄은 건너뛰며, 버퍼는 한 줄 분량(_NDJSON_MAX_LINE_BYTES)을 넘지 않습니다."""
+    buffer = b""
+    line_no = 0
+    oversized = False
+
+    def _parse(raw: bytes):
+        try:
+            record = json.loads(raw)
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            return None, f"JSON 파싱 실패: {str(e)[:100]}"
+        if not isinstance(record, dict):
+            return None, "JSON 객체가 아닙니다."
+        return record, None
+
+    async for chunk in byte_stream:
+        buffer += chunk
+        if b"\n" in chunk:
+            *lines, buffer = buffer.split(b"\n")
+            for raw in lines:
+                line_no += 1
+                if oversized:
+                    oversized = False
+                    yield line_no, None, "줄 길이 초과"
+                elif raw.strip():
+                    yield (line_no, *_parse(raw))
+        if len(buffer) > _NDJSON_MAX_LINE_BYTES:
+            # 줄바꿈이 나올 때까지 버리고 해당 줄은 invalid 처리
+            buffer = b""
+            oversized = True
+    if oversized:
+        yield line_no + 1, None, "줄 길이 초과"
+    elif buffer.strip():
+        yield (line_no + 1, *_parse(buffer))
 
 
 def _make_search_key(collection_name: str, query: str, k: int,
-                     search_mode: str, rerank: bool, filters: dict) -> str:
-    raw = f"{query}|{k}|{search_mode}|{rerank}|{json.dumps(filters, sort_keys=True)}"
+                     search_mode: str, rerank: bool, filters: dict, generation: int = 0,
+                     accuracy: str = None, oversample: int = None) -> str:
+    raw = f"{query}|{k}|{search_mode}|{rerank}|{json.dumps(filters, sort_keys=True)}|{accuracy}|{oversample}"
     digest = hashlib.md5(raw.encode()).hexdigest()
-    return f"rag:search:{collection_name}:{digest}"
+    return f"rag:search:{collection_name}:g{generation}:{digest}"
+
+
+def _resolve_accuracy(collection_name: str, accuracy: Optional[str] = None) -> str:
+    return accuracy or _SEARCH_ACCURACY_OVERRIDES.get(collection_name, _SEARCH_ACCURACY_DEFAULT)
+
+
+def _generation_key(scope: str, name: str) -> str:
+    """캐시 세대 카운터 키. scope: collection (검색·연관 화면) | service (서비스별 화면 목록)"""
+    return f"rag:gen:{scope}:{name}"
 
 
 class RagGenerationService:
 
+    semantic_cache = None  # SEMANTIC_CACHE_ENABLED=true일 때만 생성
+
     def __init__(self):
         from app.infra.external.embedding.google_embedding_client import GoogleEmbeddingClient
         from app.core.interface.rerank_client import RerankClient
 
         self.imageExtractor = ImageExtractor()
+        self.image_preprocessor = ImagePreprocessor()
         self.vector_repository = DIContainer.get(RagRepository)
         self.llm_client = DIContainer.get(LlmClient)
         self.rerank_client = DIContainer.get(RerankClient)
         self.cache_client: CacheClient = DIContainer.get(CacheClient)
+        self.analysis_cache: AnalysisCache = DIContainer.get(AnalysisCache)
+        self.ingest_manifest: IngestManifest = DIContainer.get(IngestManifest)
         self.embedding_client = GoogleEmbeddingClient()
         self.clip_client: MultimodalEmbeddingClient = DIContainer.get(MultimodalEmbeddingClient)
+        if _SEMANTIC_CACHE_ENABLED:
+            from app.core.service.semantic_cache import SemanticQueryCache
+            self.semantic_cache = SemanticQueryCache(_SEMANTIC_CACHE_THRESHOLD, _SEMANTIC_CACHE_MAX_ENTRIES,
+                                                     ttl=_CACHE_TTL)
 
     # 대량의 데이터를 업로드 하는 방식 - 특정 디렉토리에 파일을 일괄로 저장 및 파일별 입력 데이터를 일괄로 업로드
-    async def generation_rag(self, collection_name: str):
-        directory_path = "./test_images"
-        test_data = self._test_input_data()
-        image_list = self.imageExtractor.image_to_base64(directory_path)
+    async def generation_rag(self, collection_name: str, directory_path: str = None,
+                             full_rescan: bool = False) -> Dict[str, int]:
+        """디렉토리의 스크린샷을 스트리밍 방식으로 수집합니다.
+        - 메타데이터: 디렉토리의 manifest.json (없으면 내장 테스트 메타데이터)
+        - 파일을 _DIRECTORY_CHUNK_SIZE개씩 읽어 분석·저장 → 메모리 사용량이 디렉토리 크기와 무관
+        - 컬렉션별 수집 이력(경로/SHA-256/mtime)과 비교해 신규·변경 파일만 처리 (full_rescan=True면 전체)
+        """
+        directory_path = directory_path or _DEFAULT_IMAGE_DIRECTORY
+        manifest = self.imageExtractor.load_manifest(directory_path)
+        if manifest is None:
+            manifest = {"files": self._test_input_data()}
+        previous = {} if full_rescan else await self.ingest_manifest.load(collection_name)
+
+        summary = {"scanned": 0, "skipped": 0, "processed": 0, "failed": 0}
+        chunk, touched = [], []
+        for file_path in self.imageExtractor.iter_image_files(directory_path):
+            summary["scanned"] += 1
+            meta = _manifest_metadata(manifest, file_path.name)
+            if meta is None:
+                logger.warning("generation_rag_no_metadata", filename=file_path.name)
+                summary["failed"] += 1
+                continue
+            entry = await asyncio.to_thread(_file_fingerprint, file_path, meta,
+                                            previous.get(str(file_path.resolve())))
+            if entry is None:
+                summary["skipped"] += 1
+            elif not entry["changed"]:
+                # 내용·메타데이터 동일 (mtime만 변경) → 재분석 없이 이력만 갱신
+                summary["skipped"] += 1
+                touched.append(entry)
+            else:
+                chunk.append(entry)
+            if len(chunk) >= _DIRECTORY_CHUNK_SIZE:
+                await self._ingest_directory_chunk(collection_name, chunk, summary)
+                chunk = []
+        if chunk:
+            await self._ingest_directory_chunk(collection_name, chunk, summary)
+        await self.ingest_manifest.record(collection_name, touched)
+
+        logger.info("generation_rag", collection_name=collection_name, directory=directory_path, **summary)
+        return summary
+
+    async def _ingest_directory_chunk(self, collection_name: str, entries: List[Dict], summary: Dict[str, int]):
+        """청크 단위로 파일을 읽어 수집하고, 저장 성공 파일만 수집 이력에 기록합니다."""
+        def _read(entry):
+            with open(entry["file_path"], "rb") as f:
+                return base64.b64encode(f.read()).decode("utf-8")
 
         data_items = []
-        for temp in image_list:
-            key = temp['filename'].split(".")[0]
-            meta = test_data[key]
+        for entry in entries:
             data_items.append({
-                "service_name": meta['service_name'],
-                "screen_name": meta['screen_name'],
-                "version": meta['version'],
-                "access_level": meta['access_level'],
-                "filename": temp['filename'],
-                "image": temp['base64'],
+                **entry["metadata"],
+                "filename": os.path.basename(entry["file_path"]),
+                "image": await asyncio.to_thread(_read, entry),
             })
+        errors = await self.ingest_image_items(collection_name, data_items)
 
-        tasks = [self._call_llm_with_image(item) for item in data_items]
-        results_raw = await asyncio.gather(*tasks, return_exceptions=True)
-        result = []
-        for r in results_raw:
-            if isinstance(r, Exception):
-                logger.error("llm_image_failed", error=str(r))
-            else:
-                result.append(r)
-
-        application_docuement_list = self.imageExtractor.create_column_document(result)
-        logger.info("generation_rag", collection_name=collection_name, doc_count=len(application_docuement_list))
-
-        await asyncio.to_thread(self._insert_to_collection, collection_name, application_docuement_list)
+        succeeded = [entry for entry, error in zip(entries, errors) if error is None]
+        summary["processed"] += len(succeeded)
+        summary["failed"] += len(entries) - len(succeeded)
+        await self.ingest_manifest.record(collection_name, succeeded)
 
     # 기존에 있는 컬렉션에 데이터 임베딩 (멀티파트 이미지)
     async def add_rag_data(self, collection_name: str, formData: FormData):
+        await self.ingest_image_items(collection_name, self.build_image_items(formData))
+
+    # 기존에 있는 컬렉션에 텍스트 데이터 임베딩 (멀티파트 텍스트)
+    async def add_rag_text_data(self, collection_name: str, formData: FormData):
+        await self.ingest_text_items(collection_name, self.build_text_items(formData))
+
+    def build_image_items(self, formData: FormData) -> List[Dict[str, str]]:
+        """멀티파트 이미지 폼을 수집 항목 목록으로 변환합니다. 업로드 파일은 이 시점에 모두 읽습니다."""
         images = formData.getlist("images")
 
         # 공통 메타데이터: 단일 값이면 전체 이미지에 적용, 복수이면 인덱스 매핑
@@ -112,33 +346,10 @@ class RagGenerationService:
                 "image": base64.b64encode(images[i].file.read()).decode("utf-8"),
                 "filename": images[i].filename
             })
+        return data_items
 
-        tasks = [self._call_llm_with_image(item) for item in data_items]
-        results_raw = await asyncio.gather(*tasks, return_exceptions=True)
-        result = []
-        base64_images_filtered = []
-        for i, r in enumerate(results_raw):
-            if isinstance(r, Exception):
-                error_type = type(r).__name__
-                if "OpenAI" in error_type or "API" in str(r):
-                    logger.error("add_rag_data_api_error", error=str(r)[:150])
-                elif "JSON" in str(r):
-                    logger.error("add_rag_data_json_error", error=str(r)[:100])
-                elif "timeout" in str(r).lower():
-                    logger.error("add_rag_data_timeout")
-                else:
-                    logger.error("add_rag_data_error", error_type=error_type, error=str(r)[:100])
-            else:
-                result.append(r)
-                base64_images_filtered.append(data_items[i]["image"])
-
-        application_docuement_list = self.imageExtractor.create_column_document(result)
-        await asyncio.to_thread(self._insert_to_collection, collection_name,
-                                application_docuement_list, base64_images_filtered)
-        await self.cache_client.delete_pattern(f"rag:search:{collection_name}:*")
-
-    # 기존에 있는 컬렉션에 텍스트 데이터 임베딩 (멀티파트 텍스트)
-    async def add_rag_text_data(self, collection_name: str, formData: FormData):
+    def build_text_items(self, formData: FormData) -> List[Dict[str, str]]:
+        """멀티파트 텍스트 폼을 수집 항목 목록으로 변환합니다."""
         service_names = formData.getlist("service_name")
         screen_names = formData.getlist("screen_name")
         versions = formData.getlist("version")
@@ -154,32 +365,216 @@ class RagGenerationService:
                 "access_level": access_levels[i],
                 "text_content": text_contents[i]
             })
+        return data_items
+
+    async def ingest_text_stream(self, collection_name: str,
+                                 byte_stream: AsyncIterator[bytes]) -> AsyncIterator[Dict]:
+        """NDJSON 텍스트 레코드를 스트림에서 점진적으로 읽어 _NDJSON_CHUNK_SIZE개씩 LLM 분석 → 임베딩 → 저장합니다.
+        레코드: {"service_name", "screen_name", "version", "access_level", "text_content"(필수)}
+        결과: 레코드별 {"line", "status": stored | failed | invalid, "error"} 후 마지막에 {"summary": {...}}
+        """
+        summary = {"records": 0, "stored": 0, "failed": 0, "invalid": 0}
+        chunk = []
+
+        async def _flush():
+            lines = [line_no for line_no, _ in chunk]
+            items = [item for _, item in chunk]
+            try:
+                errors = await self.ingest_text_items(collection_name, items)
+            except Exception as e:
+                logger.error("ingest_text_stream_chunk_failed", collection_name=collection_name,
+                             error=str(e)[:150])
+                errors = [f"{type(e).__name__}: {str(e)[:200]}"] * len(items)
+            results = []
+            for line_no, error in zip(lines, errors):
+                summary["failed" if error else "stored"] += 1
+                results.append({"line": line_no, "status": "failed" if error else "stored", "error": error})
+            chunk.clear()
+            return results
+
+        async for line_no, record, error in _iter_ndjson(byte_stream):
+            summary["records"] += 1
+            if error is None and not str(record.get("text_content") or "").strip():
+                error = "text_content가 없습니다."
+            if error:
+                summary["invalid"] += 1
+                yield {"line": line_no, "status": "invalid", "error": error}
+                continue
+            chunk.append((line_no, {
+                "service_name": str(record.get("service_name") or ""),
+                "screen_name": str(record.get("screen_name") or ""),
+                "version": str(record.get("version") or "1.0.0"),
+                "access_level": str(record.get("access_level") or ""),
+                "text_content": str(record["text_content"]),
+            }))
+            if len(chunk) >= _NDJSON_CHUNK_SIZE:
+                for result in await _flush():
+                    yield result
+        if chunk:
+            for result in await _flush():
+                yield result
+
+        logger.info("ingest_text_stream_done", collection_name=collection_name, **summary)
+        yield {"summary": summary}
+
+    async def ingest_image_items(self, collection_name: str, data_items: List[Dict[str, str]],
+                                 on_progress: ItemProgress = None, checkpoint=None) -> List[Optional[str]]:
+        """이미지 항목을 LLM 분석 → 임베딩 → 저장합니다.
+        on_progress(index, stage, error): 항목별 진행 콜백 (stage: analyzed | embedded | stored | failed)
+        checkpoint: 항목별 단계 체크포인트 (IngestionJobService가 잡 단위로 바인딩). 주어지면 이전 실행에서
+                    완료된 분석/임베딩을 재사용하고, 새로 완료된 단계를 기록합니다.
+        반환: 항목별 오류 메시지 목록 (성공 항목은 None)
+        """
+        data_items = await self._preprocess_items(data_items)
+
+        async def _analyze(items):
+            if _VISION_PACK_SIZE > 1 and len(items) > 1:
+                return await self._analyze_packed(items)
+            return await asyncio.gather(*[self._call_llm_with_image(item) for item in items],
+                                        return_exceptions=True)
+
+        results_raw, saved = await self._analyze_with_checkpoint(data_items, _analyze, checkpoint)
+        return await self._store_analyses(collection_name, data_items, results_raw,
+                                          "add_rag_data", on_progress, with_images=True,
+                                          checkpoint=checkpoint, saved=saved)
+
+    async def _preprocess_items(self, data_items: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """이미지 축소·재인코딩(CPU 작업)을 항목별 스레드로 병렬 실행합니다. 항목 순서/개수는 유지됩니다."""
+        return list(await asyncio.gather(*[
+            asyncio.to_thread(self.image_preprocessor.process_item, item) for item in data_items
+        ]))
+
+    async def ingest_text_items(self, collection_name: str, data_items: List[Dict[str, str]],
+                                on_progress: ItemProgress = None, checkpoint=None) -> List[Optional[str]]:
+        """텍스트 항목을 LLM 분석 → 임베딩 → 저장합니다. 인자/반환은 ingest_image_items와 동일."""
+        async def _analyze(items):
+            return await asyncio.gather(*[self._response_llm_text_data(item) for item in items],
+                                        return_exceptions=True)
+
+        results_raw, saved = await self._analyze_with_checkpoint(data_items, _analyze, checkpoint)
+        return await self._store_analyses(collection_name, data_items, results_raw,
+                                          "add_rag_text", on_progress, with_images=False,
+                                          checkpoint=checkpoint, saved=saved)
+
+    async def _analyze_with_checkpoint(self, data_items: list, analyze, checkpoint) -> tuple:
+        """체크포인트에 분석 결과가 있는 항목은 LLM 호출 없이 재사용하고, 나머지만 analyze(items)로 분석합니다.
+        새로 성공한 분석은 체크포인트에 기록합니다. 반환: (항목별 분석 결과 또는 예외, 체크포인트 {index: ...})"""
+        saved = await checkpoint.load() if checkpoint else {}
+        todo = [i for i in range(len(data_items)) if not (saved.get(i) or {}).get("analysis")]
+        results_raw = [(saved.get(i) or {}).get("analysis") for i in range(len(data_items))]
+        if saved:
+            logger.info("ingest_checkpoint_resumed", restored=len(data_items) - len(todo), pending=len(todo))
+        if todo:
+            for i, r in zip(todo, await analyze([data_items[i] for i in todo])):
+                results_raw[i] = r
+        if checkpoint:
+            await checkpoint.save_analyses({i: results_raw[i] for i in todo
+                                            if not isinstance(results_raw[i], Exception)})
+        return results_raw, saved
+
+    async def ingest_analysis_items(self, collection_name: str, analyses: List[Dict],
+                                    on_progress: ItemProgress = None) -> List[Optional[str]]:
+        """사전 분석된 화면 JSON(app_analysis_prompt 응답과 동일 구조)을 LLM 호출 없이 바로 임베딩 → 저장합니다.
+        스키마 검증은 API 계층(ScreenAnalysisDocument)에서 수행됩니다. 인자/반환은 ingest_text_items와 동일."""
+        analysis_direct_items.inc(len(analyses))
+        return await self._store_analyses(collection_name, analyses, list(analyses),
+                                          "add_rag_analysis", on_progress, with_images=False)
 
-        tasks = [self._response_llm_text_data(item) for item in data_items]
-        results_raw = await asyncio.gather(*tasks, return_exceptions=True)
+    async def _store_analyses(self, collection_name: str, data_items: list, results_raw: list,
+                              log_prefix: str, on_progress: ItemProgress, with_images: bool,
+                              checkpoint=None, saved: Dict[int, Dict] = None) -> List[Optional[str]]:
+        """LLM 분석 결과 중 성공 항목만 Document로 변환하여 저장하고 캐시를 무효화합니다.
+        checkpoint가 주어지면 임베딩/저장 단계를 항목별로 기록합니다 (_insert_with_checkpoint)."""
+        errors: List[Optional[str]] = [None] * len(data_items)
         result = []
-        for r in results_raw:
+        base64_images_filtered = []
+        stored_indices = []
+        for i, r in enumerate(results_raw):
             if isinstance(r, Exception):
                 error_type = type(r).__name__
                 if "OpenAI" in error_type or "API" in str(r):
-                    logger.error("add_rag_text_api_error", error=str(r)[:150])
+                    logger.error(f"{log_prefix}_api_error", error=str(r)[:150])
                 elif "JSON" in str(r):
-                    logger.error("add_rag_text_json_error", error=str(r)[:100])
+                    logger.error(f"{log_prefix}_json_error", error=str(r)[:100])
                 elif "timeout" in str(r).lower():
-                    logger.error("add_rag_text_timeout")
+                    logger.error(f"{log_prefix}_timeout")
                 else:
-                    logger.error("add_rag_text_error", error_type=error_type, error=str(r)[:100])
+                    logger.error(f"{log_prefix}_error", error_type=error_type, error=str(r)[:100])
+                errors[i] = f"{error_type}: {str(r)[:200]}"
+                if on_progress:
+                    await on_progress(i, "failed", errors[i])
             else:
                 result.append(r)
+                stored_indices.append(i)
+                if with_images:
+                    # 전처리된 항목은 CLIP 전용 224px 변형 사용
+                    base64_images_filtered.append(data_items[i].get("clip_image", data_items[i]["image"]))
+                if on_progress:
+                    await on_progress(i, "analyzed", None)
+
+        if not result:
+            return errors
 
         application_docuement_list = self.imageExtractor.create_column_document(result)
-        await asyncio.to_thread(self._insert_to_collection, collection_name, application_docuement_list)
-        await self.cache_client.delete_pattern(f"rag:search:{collection_name}:*")
+        images = base64_images_filtered if with_images else None
+        if checkpoint is None:
+            await asyncio.to_thread(self._insert_to_collection, collection_name,
+                                    application_docuement_list, images)
+        else:
+            await self._insert_with_checkpoint(collection_name, application_docuement_list, images,
+                                               stored_indices, on_progress, checkpoint, saved or {})
+        await self._bump_generations(collection_name, [r.get("input_metadata", {}).get("service_name") for r in result])
+
+        if on_progress:
+            for i in stored_indices:
+                await on_progress(i, "stored", None)
+        return errors
+
+    async def _insert_with_checkpoint(self, collection_name: str, documents: List[Document], images: Optional[list],
+                                      item_indices: List[int], on_progress: ItemProgress, checkpoint,
+                                      saved: Dict[int, Dict]):
+        """_insert_to_collection과 같지만 임베딩 완료 후 저장 전에 체크포인트를 남깁니다.
+        저장이 실패해도 임베딩은 보존되어, 재개 시 saved에 임베딩이 있는 문서는 다시 임베딩하지 않습니다.
+        item_indices: documents 위치별 항목 인덱스"""
+        precomputed = {pos: saved[i] for pos, i in enumerate(item_indices)
+                       if (saved.get(i) or {}).get("embedding") is not None}
+        embedded = await asyncio.to_thread(self._embed_for_insert, collection_name, documents, images, precomputed)
+        await checkpoint.save_embeddings({
+            item_indices[pos]: {"embedding": doc["embedding"], "image_embedding": doc["image_embedding"]}
+            for pos, doc in embedded if pos not in precomputed
+        })
+        if on_progress:
+            for pos, _ in embedded:
+                await on_progress(item_indices[pos], "embedded", None)
+
+        await asyncio.to_thread(self._save_embedded, collection_name, [doc for _, doc in embedded])
+        await checkpoint.mark_stored(item_indices)
+
+    async def _generation(self, scope: str, name: str) -> int:
+        value = await self.cache_client.get(_generation_key(scope, name))
+        return int(value) if value else 0
+
+    async def _bump_generations(self, collection_name: str, service_names: List[Optional[str]]):
+        """저장 후 캐시 무효화: 컬렉션/서비스 세대 번호만 올립니다 (O(1)).
+        이전 세대 키는 더 이상 조회되지 않고 TTL로 만료됩니다."""
+        await self.cache_client.incr(_generation_key("collection", collection_name))
+        for service_name in sorted({name for name in service_names if name}):
+            await self.cache_client.incr(_generation_key("service", service_name))
+
+    async def delete_collection(self, collection_name: str):
+        """컬렉션 전체 삭제 후 검색·그래프 캐시를 세대 번호로 무효화합니다."""
+        service_names = await asyncio.to_thread(self.vector_repository.delete_collection, collection_name)
+        await self._bump_generations(collection_name, service_names)
+        logger.info("delete_collection", collection_name=collection_name, services=len(service_names))
 
     async def search_rag(self, collection_name: str, query: str, k: int = 5,
                          filters: dict = None, search_mode: str = "vector",
-                         rerank: bool = False):
-        cache_key = _make_search_key(collection_name, query, k, search_mode, rerank, filters or {})
+                         rerank: bool = False, accuracy: str = None, oversample: int = None):
+        accuracy = _resolve_accuracy(collection_name, accuracy)
+        search_accuracy_requests.labels(profile=accuracy).inc()
+        generation = await self._generation("collection", collection_name)
+        cache_key = _make_search_key(collection_name, query, k, search_mode, rerank, filters or {}, generation,
+                                     accuracy, oversample)
 
         cached = await self.cache_client.get(cache_key)
         if cached is not None:
@@ -188,41 +583,184 @@ class RagGenerationService:
             return json.loads(cached)
         cache_misses.labels(collection=collection_name).inc()
 
-        # 재랭킹 사용 시 충분한 후보를 오버패치
-        fetch_k = k * 3 if rerank else k
+        # 같은 캐시 키의 동시 미스는 한 번만 임베딩/검색/재랭킹
+        return await _search_flight.do(cache_key, lambda: self._fill_cache(
+            cache_key, lambda: self._search_uncached(collection_name, query, k, filters, search_mode, rerank,
+                                                     generation, accuracy, oversample)))
 
+    async def search_rag_batch(self, collection_name: str, queries: List[str], k: int = 5,
+                               filters: dict = None, search_mode: str = "vector",
+                               rerank: bool = False, accuracy: str = None,
+                               oversample: int = None) -> List[list]:
+        """여러 쿼리를 같은 조건으로 검색하고 쿼리 순서대로 결과 목록을 반환합니다.
+        캐시는 MGET 1회로 조회하고, 미스 쿼리는 임베딩 API 1회 + 벡터 검색 SQL 1회로 처리합니다."""
+        search_batch_size.observe(len(queries))
         if search_mode == "visual":
-            clip_emb = await asyncio.to_thread(self.clip_client.embed_text, query)
+            # CLIP 텍스트 임베딩은 로컬 모델이라 배치 이점이 작으므로 단건 경로를 동시 실행
+            return list(await asyncio.gather(*(
+                self.search_rag(collection_name, query, k, filters, search_mode, rerank, accuracy, oversample)
+                for query in queries
+            )))
+
+        accuracy = _resolve_accuracy(collection_name, accuracy)
+        search_accuracy_requests.labels(profile=accuracy).inc()
+        generation = await self._generation("collection", collection_name)
+        keys = {query: _make_search_key(collection_name, query, k, search_mode, rerank, filters or {}, generation,
+                                        accuracy, oversample)
+                for query in queries}
+        unique_queries = list(keys)
+        cached = await self.cache_client.mget([keys[query] for query in unique_queries])
+
+        results = {query: json.loads(value) for query, value in zip(unique_queries, cached) if value is not None}
+        misses = [query for query in unique_queries if query not in results]
+        cache_hits.labels(collection=collection_name).inc(len(unique_queries) - len(misses))
+        cache_misses.labels(collection=collection_name).inc(len(misses))
+
+        if misses:
+            embedding_requests.inc()
+            embeddings = await asyncio.to_thread(self.embedding_client.embed_queries, misses)
+            fetch_k = k * 3 if rerank else k
             with search_latency.labels(search_mode=search_mode).time():
-                results = await asyncio.to_thread(
-                    self.vector_repository.similarity_search,
-                    collection_name, None, fetch_k, filters, "visual", None, clip_emb
+                grouped = await asyncio.to_thread(
+                    self.vector_repository.similarity_search_batch,
+                    collection_name, embeddings, fetch_k, filters,
+                    search_mode, misses if search_mode == "hybrid" else None, accuracy, oversample
                 )
-        else:
-            embedding_requests.inc()
-            query_embedding = await asyncio.to_thread(
-                self.embedding_client.embeddings.embed_query, query
-            )
+            reranked = await asyncio.gather(*(
+                self._rerank_results(query, rows, k, rerank) for query, rows in zip(misses, grouped)
+            ))
+            results.update(zip(misses, reranked))
+            await asyncio.gather(*(
+                self.cache_client.set(keys[query], json.dumps(results[query]), _CACHE_TTL) for query in misses
+            ))
+
+        logger.info("search_rag_batch", collection_name=collection_name, query_count=len(queries),
+                    cache_hits=len(unique_queries) - len(misses), search_mode=search_mode, rerank=rerank)
+        return [results[query] for query in queries]
+
+    async def _search_uncached(self, collection_name: str, query: str, k: int,
+                               filters: dict, search_mode: str, rerank: bool, generation: int = 0,
+                               accuracy: str = None, oversample: int = None):
+        if search_mode == "visual":
+            clip_emb = await asyncio.to_thread(self.clip_client.embed_text, query)
             with search_latency.labels(search_mode=search_mode).time():
                 results = await asyncio.to_thread(
                     self.vector_repository.similarity_search,
-                    collection_name, query_embedding, fetch_k, filters,
-                    search_mode, query if search_mode == "hybrid" else None
+                    collection_name, None, k * 3 if rerank else k, filters, "visual", None, clip_emb,
+                    accuracy=accuracy
                 )
+            logger.info("search_rag", collection_name=collection_name, query=query,
+                        k=k, search_mode=search_mode, rerank=rerank, result_count=len(results))
+            return await self._rerank_results(query, results, k, rerank)
+
+        embedding_requests.inc()
+        query_embedding = await asyncio.to_thread(
+            self.embedding_client.embeddings.embed_query, query
+        )
+
+        # 의미 캐시 버킷: 세대 번호를 포함하므로 저장 후에는 이전 결과가 자연히 제외됨
+        bucket_key = None
+        if self.semantic_cache is not None:
+            bucket_key = (f"{collection_name}|g{generation}|{k}|{search_mode}|{rerank}|{accuracy}|{oversample}|"
+                          f"{json.dumps(filters or {}, sort_keys=True)}")
+            hit = self.semantic_cache.lookup(bucket_key, query_embedding)
+            semantic_cache_requests.labels(result="hit" if hit else "miss").inc()
+            if hit is not None:
+                results, similarity, cached_query = hit
+                logger.info("semantic_cache_hit", collection_name=collection_name, query=query,
+                            cached_query=cached_query, similarity=round(similarity, 4))
+                if random.random() < _SEMANTIC_CACHE_SAMPLE_RATE:
+                    task = asyncio.create_task(self._verify_semantic_hit(
+                        collection_name, query, query_embedding, k, filters, search_mode, rerank,
+                        cached_query, results, accuracy, oversample))
+                    _background_tasks.add(task)
+                    task.add_done_callback(_background_tasks.discard)
+                return results
+
+        results = await self._search_with_embedding(collection_name, query, query_embedding,
+                                                    k, filters, search_mode, rerank, accuracy, oversample)
+        if bucket_key is not None:
+            self.semantic_cache.store(bucket_key, query, query_embedding, results)
+        return results
+
+    async def _search_with_embedding(self, collection_name: str, query: str, query_embedding: list,
+                                     k: int, filters: dict, search_mode: str, rerank: bool, accuracy: str = None,
+                                     oversample: int = None):
+        # 재랭킹 사용 시 충분한 후보를 오버패치
+        fetch_k = k * 3 if rerank else k
+        with search_latency.labels(search_mode=search_mode).time():
+            results = await asyncio.to_thread(
+                self.vector_repository.similarity_search,
+                collection_name, query_embedding, fetch_k, filters,
+                search_mode, query if search_mode == "hybrid" else None, accuracy=accuracy, oversample=oversample
+            )
 
         logger.info("search_rag", collection_name=collection_name, query=query,
                     k=k, search_mode=search_mode, rerank=rerank, result_count=len(results))
+        return await self._rerank_results(query, results, k, rerank)
 
+    async def _rerank_results(self, query: str, results: list, k: int, rerank: bool):
         if rerank and results and self.rerank_client:
             docs = [r[0]["page_content"] for r in results]
             reranked_indices = await asyncio.to_thread(
                 self.rerank_client.rerank, query, docs, k
             )
             results = [(results[idx][0], score) for idx, score in reranked_indices]
-
-        await self.cache_client.set(cache_key, json.dumps(results), _CACHE_TTL)
         return results
 
+    async def _verify_semantic_hit(self, collection_name: str, query: str, query_embedding: list, k: int,
+                                   filters: dict, search_mode: str, rerank: bool, cached_query: str, cached: list,
+                                   accuracy: str = None, oversample: int = None):
+        """의미 캐시 히트 일부를 실제 검색과 비교해 오탐 여부를 기록합니다 (응답 지연 없이 백그라운드 실행).
+        1위 문서가 다르거나 결과 겹침이 절반 미만이면 mismatch."""
+        try:
+            fresh = await self._search_with_embedding(collection_name, query, query_embedding,
+                                                      k, filters, search_mode, rerank, accuracy, oversample)
+        except Exception as e:
+            logger.warning("semantic_cache_verify_failed", error=str(e)[:100])
+            return
+        fresh_docs = [doc["page_content"] for doc, _ in fresh]
+        cached_docs = [doc["page_content"] for doc, _ in cached]
+        overlap = len(set(fresh_docs) & set(cached_docs)) / max(len(fresh_docs), 1)
+        matched = fresh_docs[:1] == cached_docs[:1] and overlap >= 0.5
+        semantic_cache_hit_samples.labels(outcome="match" if matched else "mismatch").inc()
+        if not matched:
+            logger.warning("semantic_cache_false_hit", collection_name=collection_name, query=query,
+                           cached_query=cached_query, overlap=round(overlap, 2))
+
+    async def _fill_cache(self, cache_key: str, compute):
+        """캐시 미스 시 compute() 결과를 계산해 캐시에 저장합니다.
+        CACHE_FILL_LOCK=true면 Redis 락으로 워커 간에도 한 곳만 계산하고, 락을 얻지 못한 워커는
+        캐시가 채워지길 기다렸다가 사용합니다 (대기 시간 초과 시 직접 계산)."""
+        lock_key = f"rag:lock:{cache_key}"
+        token = None
+        if _CACHE_FILL_LOCK:
+            token = await self.cache_client.acquire_lock(lock_key, _CACHE_FILL_LOCK_TTL)
+            if token is None:
+                cached = await self._wait_for_cache(cache_key)
+                if cached is not None:
+                    cache_fill_lock.labels(outcome="waited_hit").inc()
+                    return json.loads(cached)
+                cache_fill_lock.labels(outcome="wait_timeout").inc()
+            else:
+                cache_fill_lock.labels(outcome="acquired").inc()
+        try:
+            result = await compute()
+            await self.cache_client.set(cache_key, json.dumps(result), _CACHE_TTL)
+            return result
+        finally:
+            if token is not None:
+                await self.cache_client.release_lock(lock_key, token)
+
+    async def _wait_for_cache(self, cache_key: str) -> Optional[str]:
+        deadline = time.monotonic() + _CACHE_FILL_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            await asyncio.sleep(_CACHE_FILL_POLL_SECONDS)
+            cached = await self.cache_client.get(cache_key)
+            if cached is not None:
+                return cached
+        return None
+
     async def analyze_code_impact(self, collection_name: str, code: str,
                                    k: int = 5, filters: dict = None) -> dict:
         """
@@ -242,7 +780,8 @@ class RagGenerationService:
             self.embedding_client.embeddings.embed_query, code_summary
         )
         related = await asyncio.to_thread(
-            self.vector_repository.similarity_search, collection_name, query_embedding, k, filters
+            self.vector_repository.similarity_search, collection_name, query_embedding, k, filters,
+            accuracy=_resolve_accuracy(collection_name)
         )
 
         screens_text = "\n\n".join([
@@ -266,81 +805,145 @@ class RagGenerationService:
     async def get_screens_by_service(self, service_name: str, version: str = None) -> list:
         """AGE 그래프에서 서비스에 속한 화면 목록을 조회합니다."""
         v_key = version or "all"
-        cache_key = f"rag:graph:service:{service_name}:{v_key}"
+        generation = await self._generation("service", service_name)
+        cache_key = f"rag:graph:service:{service_name}:g{generation}:{v_key}"
 
         cached = await self.cache_client.get(cache_key)
         if cached is not None:
             return json.loads(cached)
 
-        result = await asyncio.to_thread(
+        return await _graph_flight.do(cache_key, lambda: self._fill_cache(cache_key, lambda: asyncio.to_thread(
             self.vector_repository.get_screens_by_service, service_name, version
-        )
-        await self.cache_client.set(cache_key, json.dumps(result), _CACHE_TTL)
-        return result
+        )))
 
     async def get_related_screens(self, collection_name: str, screen_name: str) -> list:
         """AGE 그래프에서 같은 서비스의 연관 화면을 조회합니다."""
-        cache_key = f"rag:graph:screen:{collection_name}:{screen_name}"
+        generation = await self._generation("collection", collection_name)
+        cache_key = f"rag:graph:screen:{collection_name}:g{generation}:{screen_name}"
 
         cached = await self.cache_client.get(cache_key)
         if cached is not None:
             return json.loads(cached)
 
-        result = await asyncio.to_thread(
+        return await _graph_flight.do(cache_key, lambda: self._fill_cache(cache_key, lambda: asyncio.to_thread(
             self.vector_repository.get_related_screens, collection_name, screen_name
-        )
-        await self.cache_client.set(cache_key, json.dumps(result), _CACHE_TTL)
-        return result
+        )))
 
     async def search_by_image(self, collection_name: str, base64_image: str,
                                k: int = 5, filters: dict = None) -> list:
         """이미지 파일을 CLIP 인코더로 임베딩하여 시각적으로 유사한 문서를 검색합니다."""
-        clip_emb = await asyncio.to_thread(
-            self.clip_client.embed_image_base64, base64_image
-        )
+        clip_emb = (await asyncio.to_thread(
+            self.clip_client.embed_images_base64, [base64_image]
+        ))[0]
         results = await asyncio.to_thread(
             self.vector_repository.similarity_search,
-            collection_name, None, k, filters, "visual", None, clip_emb
+            collection_name, None, k, filters, "visual", None, clip_emb,
+            accuracy=_resolve_accuracy(collection_name)
         )
         logger.info("search_by_image", collection_name=collection_name, k=k,
                     result_count=len(results))
         return results
 
     def _embed_in_batches(self, texts: list) -> list:
-        """대량 텍스트를 배치로 나누어 임베딩 처리.
-        Google AI API 호출당 _EMBED_BATCH_SIZE개씩 분할하여 API 제한 회피."""
-        all_embeddings = []
-        for i in range(0, len(texts), _EMBED_BATCH_SIZE):
-            batch = texts[i:i + _EMBED_BATCH_SIZE]
-            embedding_requests.inc()
-            all_embeddings.extend(
-                self.embedding_client.embeddings.embed_documents(batch)
-            )
-        logger.info("embed_batches_done",
-                    total=len(texts),
-                    batches=max(1, (len(texts) + _EMBED_BATCH_SIZE - 1) // _EMBED_BATCH_SIZE))
+        """대량 텍스트를 토큰 추정치 기반 배치로 나누어 동시 임베딩 처리.
+        워커 스레드(asyncio.to_thread)에서 호출되므로 자체 이벤트 루프로 비동기 배치를 실행합니다."""
+        if not texts:
+            return []
+        return asyncio.run(self._embed_in_batches_async(texts))
+
+    async def _embed_in_batches_async(self, texts: list) -> list:
+        """배치를 _EMBED_CONCURRENCY개까지 동시에 임베딩하고 원래 순서로 재조립합니다.
+        실패한 배치만 지수 백오프로 재시도하며, 재시도 소진 시에만 전체 삽입이 실패합니다."""
+        batches = _plan_embed_batches(texts)
+        semaphore = asyncio.Semaphore(_EMBED_CONCURRENCY)
+        embeddings = self.embedding_client.embeddings
+        use_async_api = inspect.iscoroutinefunction(getattr(embeddings, "aembed_documents", None))
+
+        async def _embed_batch(batch_no: int, indices: list) -> list:
+            batch = [texts[i] for i in indices]
+            for attempt in range(_EMBED_MAX_RETRIES + 1):
+                try:
+                    async with semaphore:
+                        embedding_requests.inc()
+                        if use_async_api:
+                            return await embeddings.aembed_documents(batch)
+                        return await asyncio.to_thread(embeddings.embed_documents, batch)
+                except Exception as e:
+                    if attempt >= _EMBED_MAX_RETRIES:
+                        raise
+                    logger.warning("embed_batch_retry", batch=batch_no, size=len(batch),
+                                   attempt=attempt + 1, error=str(e)[:100])
+                    await asyncio.sleep(min(8.0, 0.5 * 2 ** attempt) * random.uniform(0.5, 1.0))
+
+        results = await asyncio.gather(*[_embed_batch(n, idx) for n, idx in enumerate(batches)])
+
+        all_embeddings = [None] * len(texts)
+        for indices, vectors in zip(batches, results):
+            for i, vector in zip(indices, vectors):
+                all_embeddings[i] = vector
+        logger.info("embed_batches_done", total=len(texts), batches=len(batches),
+                    concurrency=_EMBED_CONCURRENCY)
         return all_embeddings
 
     def _insert_to_collection(self, collection_name: str, documents: List[Document],
                               base64_images: list = None):
+        self._save_embedded(collection_name,
+                            [doc for _, doc in self._embed_for_insert(collection_name, documents, base64_images)])
+
+    def _embed_for_insert(self, collection_name: str, documents: List[Document],
+                          base64_images: list = None, precomputed: Dict[int, Dict] = None) -> List[tuple]:
+        """저장 대상 문서를 임베딩합니다. 반환: [(documents 내 위치, 저장용 문서 dict)] — 변경 없는 화면은 제외.
+        precomputed {위치: {embedding, image_embedding}}에 있는 문서는 임베딩/CLIP 호출을 생략합니다 (체크포인트 재개)."""
+        precomputed = precomputed or {}
         logger.info("insert_to_collection_start", collection_name=collection_name,
                     doc_count=len(documents))
 
-        texts = [doc.page_content for doc in documents]
-        embeddings = self._embed_in_batches(texts)
-
-        docs_with_embeddings = []
-        for i, (doc, emb) in enumerate(zip(documents, embeddings)):
-            image_emb = None
-            if base64_images and i < len(base64_images) and base64_images[i] and self.clip_client:
-                image_emb = self.clip_client.embed_image_base64(base64_images[i])
-            docs_with_embeddings.append({
+        candidates = []
+        for i, doc in enumerate(documents):
+            image = base64_images[i] if base64_images and i < len(base64_images) else None
+            candidates.append({
                 "page_content": doc.page_content,
-                "embedding": emb,
                 "metadata": doc.metadata,
-                "image_embedding": image_emb,
+                "image": image,
+                "image_sha256": hashlib.sha256(image.encode("ascii")).hexdigest() if image else None,
             })
 
+        # 화면별 저장된 content_hash와 비교 → 변경 없는 화면은 임베딩/저장 생략
+        changed = self.vector_repository.find_changed_documents(collection_name, candidates)
+        if len(changed) < len(candidates):
+            logger.info("insert_to_collection_unchanged_skipped", collection_name=collection_name,
+                        skipped=len(candidates) - len(changed))
+        if not changed:
+            return []
+
+        to_embed = [pos for pos in changed if pos not in precomputed]
+        embeddings = dict(zip(to_embed, self._embed_in_batches([candidates[pos]["page_content"] for pos in to_embed])
+                              if to_embed else []))
+
+        # 이미지가 있는 문서만 모아 CLIP 배치 인코딩 1회 호출
+        image_embeddings = {}
+        if self.clip_client:
+            image_positions = [pos for pos in to_embed if candidates[pos]["image"]]
+            if image_positions:
+                vectors = self.clip_client.embed_images_base64([candidates[pos]["image"] for pos in image_positions])
+                image_embeddings = dict(zip(image_positions, vectors))
+
+        docs_with_embeddings = []
+        for pos in changed:
+            doc = candidates[pos]
+            restored = precomputed.get(pos)
+            docs_with_embeddings.append((pos, {
+                "page_content": doc["page_content"],
+                "embedding": restored["embedding"] if restored else embeddings[pos],
+                "metadata": doc["metadata"],
+                "image_embedding": restored.get("image_embedding") if restored else image_embeddings.get(pos),
+                "image_sha256": doc["image_sha256"],
+            }))
+        return docs_with_embeddings
+
+    def _save_embedded(self, collection_name: str, docs_with_embeddings: List[Dict]):
+        if not docs_with_embeddings:
+            return
         exists = self.vector_repository.collection_exists(collection_name)
         logger.info("insert_to_collection", collection_name=collection_name,
                     collection_exists=exists)
@@ -360,7 +963,9 @@ class RagGenerationService:
         }
         return test_dict
 
-    def _create_image_url(self, filename: str, base64_image: str) -> str:
+    def _create_image_url(self, filename: str, base64_image: str, mime_type: str = None) -> str:
+        if mime_type:
+            return f"data:{mime_type};base64,{base64_image}"
         if filename.lower().endswith('.png'):
             return f"data:image/png;base64,{base64_image}"
         elif filename.lower().endswith('.webp'):
@@ -375,8 +980,122 @@ class RagGenerationService:
             sql_response = sql_response[:-3]
         return sql_response.strip()
 
+    def _analysis_cache_key(self, data_item: Dict[str, str]) -> tuple:
+        """분석 캐시 키: {프롬프트 버전}:{이미지 SHA-256}:{입력 메타데이터 해시}.
+        컬렉션/system_id는 키에 포함하지 않아 동일 스크린샷은 어디서 업로드해도 재사용됩니다.
+        이미지 해시는 전처리 후 바이트 기준이므로 전처리 설정이 바뀌면 자연히 다른 키가 됩니다."""
+        image_sha256 = hashlib.sha256(base64.b64decode(data_item['image'])).hexdigest()
+        meta = json.dumps({f: data_item.get(f, "") for f in _ANALYSIS_META_FIELDS},
+                          sort_keys=True, ensure_ascii=False)
+        meta_digest = hashlib.sha256(meta.encode("utf-8")).hexdigest()[:16]
+        return f"{app_analysis_prompt_version}:{image_sha256}:{meta_digest}", image_sha256
+
     async def _call_llm_with_image(self, data_item: Dict[str, str]) -> Dict[str, str]:
-        """이미지 기반 LLM 호출 (generation_rag, add_rag_data 공통 사용)"""
+        """이미지 기반 LLM 호출 (generation_rag, add_rag_data 공통 사용).
+        동일 이미지+프롬프트 버전+메타데이터의 분석 결과가 캐시에 있으면 LLM을 호출하지 않습니다."""
+        cache_key, image_sha256 = self._analysis_cache_key(data_item)
+        cached = await self.analysis_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        started = time.perf_counter()
+        analysis = await self._analyze_image(data_item)
+        image_analysis_latency.labels(preprocessed=str("mime_type" in data_item).lower()).observe(
+            time.perf_counter() - started)
+        await self.analysis_cache.set(cache_key, image_sha256, app_analysis_prompt_version, analysis)
+        return analysis
+
+    async def _analyze_packed(self, data_items: List[Dict[str, str]]) -> list:
+        """캐시 미스 화면을 _VISION_PACK_SIZE개씩 묶어 Vision 요청 1회로 분석합니다.
+        묶음 응답에서 결과를 얻지 못한 화면만 단일 이미지 호출(_call_llm_with_image)로 재분석합니다.
+        반환: 항목 순서대로 분석 결과 또는 예외 (asyncio.gather(return_exceptions=True)와 동일 형태)"""
+        keys = [self._analysis_cache_key(item) for item in data_items]
+        results: list = list(await asyncio.gather(*[self.analysis_cache.get(key) for key, _ in keys]))
+        misses = [i for i, r in enumerate(results) if r is None]
+        packs = [misses[n:n + _VISION_PACK_SIZE] for n in range(0, len(misses), _VISION_PACK_SIZE)]
+
+        async def _run_pack(indices: List[int]):
+            try:
+                analyses = await self._analyze_image_pack([data_items[i] for i in indices])
+            except Exception as e:
+                logger.warning("vision_pack_failed", size=len(indices), error=str(e)[:150])
+                analyses = [None] * len(indices)
+            for i, analysis in zip(indices, analyses):
+                if analysis is not None:
+                    cache_key, image_sha256 = keys[i]
+                    await self.analysis_cache.set(cache_key, image_sha256, app_analysis_prompt_version, analysis)
+                    results[i] = analysis
+
+        await asyncio.gather(*[_run_pack(indices) for indices in packs])
+
+        fallback = [i for i in misses if results[i] is None]
+        if fallback:
+            vision_pack_fallbacks.inc(len(fallback))
+            retried = await asyncio.gather(*[self._call_llm_with_image(data_items[i]) for i in fallback],
+                                           return_exceptions=True)
+            for i, r in zip(fallback, retried):
+                results[i] = r
+        return results
+
+    async def _analyze_image_pack(self, data_items: List[Dict[str, str]]) -> List[Optional[Dict]]:
+        """화면 N개를 메타데이터와 함께 한 요청으로 보내 JSON 배열을 받고, 항목별 결과로 매핑합니다.
+        screen_index(1부터) 기준으로 매핑하며, 형식이 맞지 않거나 누락된 화면은 None을 반환합니다."""
+        llm_requests.inc()
+        started = time.perf_counter()
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", app_analysis_prompt_system),
+            ("user", app_analysis_prompt_pack_user)
+        ])
+        formatted_messages = prompt.format_messages(
+            count=len(data_items),
+            **{field: f"[화면 i] 블록의 {field} 값" for field in _ANALYSIS_META_FIELDS},
+        )
+        user_message = formatted_messages[-1]
+        content = [{"type": "text", "text": user_message.content}]
+        for n, item in enumerate(data_items, start=1):
+            meta = json.dumps({f: item.get(f, "") for f in _ANALYSIS_META_FIELDS}, ensure_ascii=False)
+            image_url = self._create_image_url(item['filename'], item['image'], item.get('mime_type'))
+            content.append({"type": "text", "text": f"[화면 {n}] {meta}"})
+            content.append({"type": "image_url", "image_url": {"url": image_url}})
+        user_message.content = content
+
+        response = self._delete_code_block(await self.llm_client.async_llm_request(formatted_messages))
+        try:
+            parsed = json.loads(response)
+        except json.JSONDecodeError as e:
+            logger.warning("vision_pack_parse_failed", size=len(data_items), error=str(e)[:100])
+            return [None] * len(data_items)
+        if not isinstance(parsed, list):
+            return [None] * len(data_items)
+
+        analyses: List[Optional[Dict]] = [None] * len(data_items)
+        positional = len(parsed) == len(data_items)
+        for position, analysis in enumerate(parsed):
+            if not isinstance(analysis, dict) or not isinstance(analysis.get("input_metadata"), dict) \
+                    or not isinstance(analysis.get("screen_analysis"), dict):
+                continue
+            index = analysis.pop("screen_index", None)
+            if isinstance(index, int) and 1 <= index <= len(data_items):
+                slot = index - 1
+            elif positional:
+                slot = position
+            else:
+                continue
+            if analyses[slot] is not None:
+                continue
+            # 묶음 응답의 화면 뒤섞임 방지: 입력으로 준 메타데이터는 요청 값으로 고정
+            item = data_items[slot]
+            for field in ("service_name", "version", "access_level"):
+                analysis["input_metadata"][field] = item.get(field, "")
+            if item.get("screen_name") and item["screen_name"] != "auto":
+                analysis["input_metadata"]["screen_name"] = item["screen_name"]
+            analyses[slot] = analysis
+
+        image_analysis_latency.labels(preprocessed=str("mime_type" in data_items[0]).lower()).observe(
+            (time.perf_counter() - started) / len(data_items))
+        return analyses
+
+    async def _analyze_image(self, data_item: Dict[str, str]) -> Dict[str, str]:
         llm_requests.inc()
         prompt = ChatPromptTemplate.from_messages([
             ("system", app_analysis_prompt_system),
@@ -389,9 +1108,10 @@ class RagGenerationService:
             access_level=data_item['access_level'],
         )
         user_message = formatted_messages[-1]
+        image_url = self._create_image_url(data_item['filename'], data_item['image'], data_item.get('mime_type'))
         user_message.content = [
             {"type": "text", "text": user_message.content},
-            {"type": "image_url", "image_url": {"url": self._create_image_url(data_item['filename'], data_item['image'])}}
+            {"type": "image_url", "image_url": {"url": image_url}}
         ]
         response = self._delete_code_block(
             await self.llm_client.async_llm_request(formatted_messages)
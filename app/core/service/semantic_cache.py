@@ -0,0 +1,66 @@
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+
+class _Bucket:
+    """한 검색 조건(컬렉션·세대·필터 등)의 최근 쿼리 임베딩 행렬. 용량을 넘으면 가장 오래된 슬롯부터 덮어씁니다."""
+
+    def __init__(self, dim: int, capacity: int):
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.expires = np.zeros(capacity, dtype=np.float64)  # 0 = 빈 슬롯
+        self.entries: List[Optional[Tuple[str, Any]]] = [None] * capacity
+        self.next = 0
+
+
+class SemanticQueryCache:
+    """임베딩 코사인 유사도 기반 검색 결과 캐시 (프로세스 내).
+    정확히 같은 문자열이 아니어도 임베딩이 threshold 이상 가까운 이전 쿼리가 있으면 그 결과를 반환합니다.
+    조회는 정규화된 임베딩 행렬과의 행렬-벡터 곱 1회로 수행합니다."""
+
+    def __init__(self, threshold: float = 0.95, max_entries: int = 256, max_buckets: int = 64, ttl: int = 3600):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.max_buckets = max_buckets
+        self.ttl = ttl
+        self._buckets: "OrderedDict[str, _Bucket]" = OrderedDict()
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def lookup(self, bucket_key: str, embedding) -> Optional[Tuple[Any, float, str]]:
+        """가장 가까운 유효 항목이 threshold 이상이면 (결과, 유사도, 원래 쿼리)를 반환합니다."""
+        bucket = self._buckets.get(bucket_key)
+        if bucket is None:
+            return None
+        self._buckets.move_to_end(bucket_key)
+        query = self._normalize(embedding)
+        if query.shape[0] != bucket.vectors.shape[1]:
+            return None
+        scores = bucket.vectors @ query
+        scores[bucket.expires <= time.monotonic()] = -1.0
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+        cached_query, results = bucket.entries[best]
+        return results, float(scores[best]), cached_query
+
+    def store(self, bucket_key: str, query: str, embedding, results: Any):
+        vector = self._normalize(embedding)
+        bucket = self._buckets.get(bucket_key)
+        if bucket is None or bucket.vectors.shape[1] != vector.shape[0]:
+            bucket = _Bucket(vector.shape[0], self.max_entries)
+            self._buckets[bucket_key] = bucket
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        self._buckets.move_to_end(bucket_key)
+        slot = bucket.next
+        bucket.vectors[slot] = vector
+        bucket.expires[slot] = time.monotonic() + self.ttl
+        bucket.entries[slot] = (query, results)
+        bucket.next = (slot + 1) % self.max_entries
@@ -0,0 +1,27 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+from app.infra.monitoring.metrics import single_flight_coalesced
+
+
+class SingleFlight:
+    """같은 키의 동시 비동기 호출을 하나의 실행으로 합칩니다 (프로세스 내).
+    첫 호출(리더)이 작업을 Task로 실행하고, 완료 전까지 들어온 같은 키 호출은 그 결과(또는 예외)를 함께 받습니다.
+    작업은 별도 Task로 실행되므로 리더 요청이 취소돼도 대기 중인 다른 요청에는 영향이 없습니다."""
+
+    def __init__(self, operation: str):
+        self._operation = operation
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            single_flight_coalesced.labels(operation=self._operation).inc()
+        return await asyncio.shield(task)
+
+    def inflight(self) -> int:
+        return len(self._inflight)
@@ -0,0 +1,105 @@
+"""rag_embeddings 인덱스 무중단 생성 배치 — CREATE INDEX CONCURRENTLY
+
+이미 행이 많은 테이블에 새 HNSW·GIN 인덱스를 앱 기동(ensure_vector_table)의 CREATE INDEX로 만들면
+빌드 동안 테이블 쓰기가 막히고 기동이 그만큼 지연됩니다. 이 배치는 트랜잭션 밖(autocommit)에서
+CONCURRENTLY로 생성하므로 수집·검색을 멈추지 않습니다. 생성 후 해당 플래그(BQ_INDEX=true 등)를 켜면
+기동 시에는 CREATE INDEX IF NOT EXISTS가 바로 건너뜁니다.
+- 이전 실행이 중단되어 INVALID로 남은 인덱스는 DROP 후 다시 생성 (같은 명령으로 재실행)
+- 파티션 테이블은 CONCURRENTLY를 지원하지 않으므로 부모에 ON ONLY 인덱스(무효)를 만든 뒤
+  파티션마다 CONCURRENTLY로 생성해 ATTACH PARTITION 합니다 (모든 파티션이 붙으면 부모 인덱스가 유효해짐)
+
+테이블·컬럼은 앱 기동 시 생성되므로 최소 1회 기동한 뒤 실행합니다.
+
+사용 예) python -m app.infra.batch.concurrent_index --index bq
+"""
+import json
+import time
+from typing import Any, Dict
+
+import structlog
+
+from app.infra.database import PGVectorManager
+
+logger = structlog.get_logger()
+
+# --index 값 → (인덱스명 속성, DDL 속성). DDL은 PGVectorManager와 공용 (ON rag_embeddings 이후를 재사용)
+_INDEXES = {
+    "bq": ("BQ_HNSW_INDEX", "BQ_HNSW_INDEX_SQL"),
+    "short": ("SHORT_HNSW_INDEX", "SHORT_HNSW_INDEX_SQL"),
+    "lexical": ("LEXICAL_INDEX", "LEXICAL_INDEX_SQL"),
+}
+_PARENT = "public.rag_embeddings"
+
+
+class ConcurrentIndexBuilder:
+
+    def __init__(self, connection_manager: PGVectorManager = None):
+        self.connection_manager = connection_manager or PGVectorManager()
+
+    def _definition(self, index: str):
+        """(인덱스명, USING 절) — 기동 시 DDL과 같은 정의를 사용합니다."""
+        name_attr, sql_attr = _INDEXES[index]
+        mgr = self.connection_manager
+        using = getattr(mgr, sql_attr).split("ON rag_embeddings", 1)[1].strip().rstrip(";")
+        return getattr(mgr, name_attr), using
+
+    def _drop_invalid(self, cursor, name: str):
+        """중단된 CONCURRENTLY 빌드가 남긴 INVALID 인덱스를 제거합니다 (IF NOT EXISTS가 건너뛰지 않도록)."""
+        cursor.execute("SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)",
+                       (f"public.{name}",))
+        row = cursor.fetchone()
+        if row and row[0]:
+            cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS public.{name}")
+            logger.warning("concurrent_index_invalid_dropped", index=name)
+
+    def _build_partitioned(self, cursor, index: str, name: str, using: str) -> int:
+        """부모 ON ONLY 인덱스 + 파티션별 CONCURRENTLY 생성 후 ATTACH. 반환: 새로 붙인 파티션 수"""
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY {_PARENT} {using}")
+        # 부모 인덱스에 아직 붙지 않은 파티션만 (이후 생성된 파티션은 자동으로 인덱스가 붙어 있음)
+        cursor.execute("""
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = %s::regclass
+            AND NOT EXISTS (
+                SELECT 1 FROM pg_inherits ii
+                JOIN pg_index x ON x.indexrelid = ii.inhrelid
+                WHERE ii.inhparent = to_regclass(%s) AND x.indrelid = c.oid
+            )
+            ORDER BY c.relname
+        """, (_PARENT, f"public.{name}"))
+        partitions = [row[0] for row in cursor.fetchall()]
+        for partition in partitions:
+            child = f"{partition}_{index}_idx"
+            self._drop_invalid(cursor, child)
+            cursor.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {child} ON public.{partition} {using}")
+            cursor.execute(f"ALTER INDEX public.{name} ATTACH PARTITION public.{child}")
+            logger.info("concurrent_index_partition", index=name, partition=partition)
+        return len(partitions)
+
+    def run(self, index: str) -> Dict[str, Any]:
+        """반환: {"index", "partitions", "seconds"}"""
+        mgr = self.connection_manager
+        name, using = self._definition(index)
+        started = time.perf_counter()
+        with mgr.autocommit_cursor() as cursor:
+            if mgr.is_partitioned(cursor):
+                partitions = self._build_partitioned(cursor, index, name, using)
+            else:
+                self._drop_invalid(cursor, name)
+                cursor.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {_PARENT} {using}")
+                partitions = 0
+
+        stats = {"index": name, "partitions": partitions, "seconds": round(time.perf_counter() - started, 3)}
+        logger.info("concurrent_index_done", **stats)
+        return stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="rag_embeddings 인덱스 무중단(CONCURRENTLY) 생성")
+    parser.add_argument("--index", required=True, choices=sorted(_INDEXES), help="생성할 인덱스")
+    args = parser.parse_args()
+
+    print(json.dumps(ConcurrentIndexBuilder().run(args.index)))
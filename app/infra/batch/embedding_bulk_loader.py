@@ -0,0 +1,200 @@
+"""rag_embeddings 대량 적재 배치 — COPY ... FROM STDIN (FORMAT BINARY)
+
+백필/마이그레이션처럼 수만 건 이상을 적재할 때 사용합니다.
+- halfvec / vector / JSONB를 PostgreSQL 바이너리 포맷으로 직접 인코딩하여 스트리밍
+  (파이썬 리스트 → 텍스트 렌더링 → 서버 파싱 비용 제거)
+- 임시 스테이징 테이블에 COPY 후 INSERT ... SELECT ... ON CONFLICT 1회로 병합
+  (화면 식별 키 기준 upsert, content_hash가 같은 행은 갱신 생략, content_tsv·content_lex는 병합 시 계산)
+- rebuild_index=True면 HNSW 인덱스를 DROP 후 적재, 완료 후 일괄 재생성 (대량 적재용)
+
+AGE 그래프 노드는 생성하지 않습니다. 그래프까지 필요한 일반 수집은 save_documents를 사용합니다.
+
+사용 예) python -m app.infra.batch.embedding_bulk_loader --collection screens --input rows.jsonl
+입력 파일: 한 줄에 {"page_content", "metadata", "embedding", "image_embedding"} JSON 1건
+"""
+import json
+import struct
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import structlog
+
+from app.infra.database import PGVectorManager
+
+logger = structlog.get_logger()
+
+_COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+_COPY_HEADER = _COPY_SIGNATURE + struct.pack("!ii", 0, 0)  # flags, header extension 길이
+_COPY_TRAILER = struct.pack("!h", -1)
+_NULL_FIELD = struct.pack("!i", -1)
+_JSONB_VERSION = b"\x01"
+
+_COPY_COLUMNS = ["collection_name", "content", "metadata", "embedding", "screen_key", "content_hash",
+                 "lexical_text", "image_embedding"]
+_STAGE_TABLE = "rag_embeddings_stage"
+_FLUSH_BYTES = 8 * 1024 * 1024  # 8MB 단위로 서버에 전송하여 메모리 사용량 제한
+
+
+def _field(data: Optional[bytes]) -> bytes:
+    """바이너리 COPY 필드: int32 길이 + 데이터 (NULL은 길이 -1)."""
+    if data is None:
+        return _NULL_FIELD
+    return struct.pack("!i", len(data)) + data
+
+
+def encode_text(value: str) -> bytes:
+    return value.encode("utf-8")
+
+
+def encode_jsonb(value: Dict[str, Any]) -> bytes:
+    """jsonb 바이너리 포맷: 버전 바이트(1) + UTF-8 JSON 텍스트."""
+    return _JSONB_VERSION + json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+
+def encode_halfvec(values: List[float]) -> bytes:
+    """pgvector halfvec 바이너리 포맷: int16 차원 + int16 unused + float16(big-endian) × 차원."""
+    dim = len(values)
+    return struct.pack(f"!hh{dim}e", dim, 0, *values)
+
+
+def encode_vector(values: List[float]) -> bytes:
+    """pgvector vector 바이너리 포맷: int16 차원 + int16 unused + float32(big-endian) × 차원."""
+    dim = len(values)
+    return struct.pack(f"!hh{dim}f", dim, 0, *values)
+
+
+def encode_row(collection_name: str, doc: Dict[str, Any]) -> bytes:
+    """문서 1건을 바이너리 COPY 튜플로 인코딩합니다. 컬럼 순서는 _COPY_COLUMNS와 동일."""
+    image_embedding = doc.get("image_embedding")
+    lexical_text = PGVectorManager.lexical_text(doc.get("page_content", ""))
+    return b"".join([
+        struct.pack("!h", len(_COPY_COLUMNS)),
+        _field(encode_text(collection_name)),
+        _field(encode_text(doc.get("page_content", ""))),
+        _field(encode_jsonb(doc.get("metadata", {}))),
+        _field(encode_halfvec(doc["embedding"])),
+        _field(encode_text(PGVectorManager.screen_key(doc.get("metadata", {})))),
+        _field(encode_text(PGVectorManager.content_hash(doc))),
+        _field(encode_text(lexical_text) if lexical_text is not None else None),
+        _field(encode_vector(image_embedding) if image_embedding is not None else None),
+    ])
+
+
+class EmbeddingBulkLoader:
+    """바이너리 COPY 기반 rag_embeddings 대량 적재기."""
+
+    def __init__(self, connection_manager: PGVectorManager = None):
+        self.connection_manager = connection_manager or PGVectorManager()
+
+    def load(self, collection_name: str, documents: Iterable[Dict[str, Any]],
+             rebuild_index: bool = False) -> Dict[str, Any]:
+        """
+        documents를 스테이징 테이블로 스트리밍 COPY한 뒤 rag_embeddings에 upsert 병합합니다.
+        같은 화면이 입력에 여러 번 있으면 마지막 행이 반영됩니다.
+        전체가 단일 트랜잭션이므로 실패 시 적재분 전체가 롤백됩니다.
+        rebuild_index: True면 HNSW 인덱스를 적재 전에 DROP, 적재 후 재생성.
+                       적재 동안 테이블 쓰기 잠금이 유지되므로 대량 백필 전용.
+        반환: {"rows", "upserted", "seconds", "rows_per_sec"}
+        """
+        mgr = self.connection_manager
+        copy_sql = f"COPY {_STAGE_TABLE} ({', '.join(_COPY_COLUMNS)}) FROM STDIN (FORMAT BINARY)"
+        rows = 0
+        started = time.perf_counter()
+
+        if rebuild_index and mgr.is_partitioned():
+            # 파티션 모드의 부모 인덱스 DROP은 모든 컬렉션 파티션의 인덱스를 지우므로 생략
+            logger.warning("bulk_load_rebuild_index_skipped", collection_name=collection_name, reason="partitioned")
+            rebuild_index = False
+
+        with mgr.get_cursor() as cursor:
+            if rebuild_index:
+                cursor.execute(f"DROP INDEX IF EXISTS {mgr.EMBEDDING_HNSW_INDEX};")
+                if mgr.BQ_INDEX_ENABLED:
+                    cursor.execute(f"DROP INDEX IF EXISTS {mgr.BQ_HNSW_INDEX};")
+                cursor.execute(f"DROP INDEX IF EXISTS {mgr.SHORT_HNSW_INDEX};")
+                cursor.execute(f"DROP INDEX IF EXISTS {mgr.IMAGE_HNSW_INDEX};")
+
+            # ord: 입력 순서 (같은 화면 중복 시 마지막 행 선택)
+            cursor.execute(f"""
+                CREATE TEMP TABLE {_STAGE_TABLE} (
+                    ord BIGSERIAL,
+                    collection_name TEXT,
+                    content TEXT,
+                    metadata JSONB,
+                    embedding halfvec({mgr.EMBEDDING_DIM}),
+                    screen_key TEXT,
+                    content_hash TEXT,
+                    lexical_text TEXT,
+                    image_embedding vector({mgr.IMAGE_EMBEDDING_DIM})
+                ) ON COMMIT DROP;
+            """)
+
+            with cursor.copy(copy_sql) as copy:
+                buf = bytearray(_COPY_HEADER)
+                for doc in documents:
+                    buf += encode_row(collection_name, doc)
+                    rows += 1
+                    if len(buf) >= _FLUSH_BYTES:
+                        copy.write(bytes(buf))
+                        buf.clear()
+                buf += _COPY_TRAILER
+                copy.write(bytes(buf))
+
+            # 화면 식별 키 기준 upsert 병합 — 내용이 같은 행(content_hash 동일)은 갱신하지 않음
+            # embedding_short(Matryoshka 축소)는 서버에서 embedding으로부터 계산
+            short_sql = mgr.SHORT_EMBEDDING_SQL if mgr.SHORT_EMBEDDING_ENABLED else "NULL"
+            mgr.ensure_partition(collection_name, cursor)
+            cursor.execute(f"""
+                INSERT INTO rag_embeddings
+                (collection_name, content, metadata, embedding, content_tsv, image_embedding, screen_key, content_hash,
+                 embedding_short, content_lex)
+                SELECT DISTINCT ON (screen_key)
+                       collection_name, content, metadata, embedding, to_tsvector('simple', content),
+                       image_embedding, screen_key, content_hash, {short_sql}, to_tsvector('simple', lexical_text)
+                FROM {_STAGE_TABLE}
+                ORDER BY screen_key, ord DESC
+                ON CONFLICT (collection_name, screen_key) DO UPDATE SET {mgr.UPSERT_SET_SQL}
+                WHERE rag_embeddings.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+            """)
+            upserted = cursor.rowcount
+
+            if rebuild_index:
+                cursor.execute(mgr.EMBEDDING_HNSW_INDEX_SQL)
+                if mgr.BQ_INDEX_ENABLED:
+                    cursor.execute(mgr.BQ_HNSW_INDEX_SQL)
+                if mgr.SHORT_EMBEDDING_ENABLED:
+                    cursor.execute(mgr.SHORT_HNSW_INDEX_SQL)
+                cursor.execute(mgr.IMAGE_HNSW_INDEX_SQL)
+
+        elapsed = time.perf_counter() - started
+        stats = {
+            "rows": rows,
+            "upserted": upserted,
+            "seconds": round(elapsed, 3),
+            "rows_per_sec": round(rows / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+        logger.info("bulk_load_done", collection_name=collection_name,
+                    rebuild_index=rebuild_index, **stats)
+        return stats
+
+
+def _read_jsonl(path: str):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="rag_embeddings 바이너리 COPY 대량 적재")
+    parser.add_argument("--collection", required=True, help="적재 대상 collection_name")
+    parser.add_argument("--input", required=True, help="JSONL 입력 파일 경로")
+    parser.add_argument("--rebuild-index", action="store_true", help="HNSW 인덱스 DROP 후 재생성")
+    args = parser.parse_args()
+
+    print(json.dumps(
+        EmbeddingBulkLoader().load(args.collection, _read_jsonl(args.input), args.rebuild_index)
+    ))
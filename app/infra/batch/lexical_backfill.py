@@ -0,0 +1,95 @@
+"""content_lex 백필 배치 — 기존 행의 한국어 bigram 어휘 색인 채우기
+
+LEXICAL_INDEX=bigram 전환 전에 쌓인 행은 content_lex가 NULL이라 하이브리드 검색 키워드 레그에서 빠집니다.
+bigram 토큰화는 파이썬(korean_lexical)에서 수행하므로 id 순 키셋 페이지로 본문을 읽어 토큰화한 뒤
+unnest 배열 UPDATE 1회로 반영합니다. 배치마다 커밋하므로 중단되어도 같은 명령으로 이어서 실행할 수 있습니다.
+파티션 모드에서는 id 단독 인덱스가 없으므로 컬렉션(파티션)별로 (collection_name, id) PK 순서로 페이지합니다.
+기본 동작은 GIN 인덱스를 DROP 후 채우고 마지막에 일괄 생성합니다.
+
+사용 예) LEXICAL_INDEX=bigram python -m app.infra.batch.lexical_backfill --batch-size 2000
+"""
+import json
+import time
+from typing import Any, Dict
+
+import structlog
+
+from app.infra.database import PGVectorManager
+from app.infra.database.korean_lexical import lexical_document
+
+logger = structlog.get_logger()
+
+
+class LexicalBackfill:
+
+    def __init__(self, connection_manager: PGVectorManager = None):
+        self.connection_manager = connection_manager or PGVectorManager()
+
+    def _fill_batch(self, after_id: int, batch_size: int, collection_name: str = None):
+        """after_id 이후 content_lex가 NULL인 행을 최대 batch_size건 채웁니다. 반환: (채운 행 수, 마지막 id)
+        collection_name: 파티션 모드의 페이지 범위 (해당 파티션만 스캔)"""
+        batch_scope, update_scope, scope_params = "", "", ()
+        if collection_name is not None:
+            batch_scope, update_scope = "collection_name = %s AND ", "r.collection_name = %s AND "
+            scope_params = (collection_name,)
+        with self.connection_manager.get_cursor() as cursor:
+            cursor.execute(f"""
+                SELECT id, content FROM rag_embeddings
+                WHERE {batch_scope}id > %s AND content_lex IS NULL
+                ORDER BY id
+                LIMIT %s
+            """, scope_params + (after_id, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                return 0, after_id
+            cursor.execute(f"""
+                UPDATE rag_embeddings r
+                SET content_lex = to_tsvector('simple', b.doc)
+                FROM unnest(%s::bigint[], %s::text[]) AS b(id, doc)
+                WHERE {update_scope}r.id = b.id
+            """, ([row[0] for row in rows], [lexical_document(row[1]) for row in rows]) + scope_params)
+        return len(rows), rows[-1][0]
+
+    def run(self, batch_size: int = 2000, rebuild_index: bool = True) -> Dict[str, Any]:
+        """반환: {"rows", "batches", "seconds"}"""
+        mgr = self.connection_manager
+        if mgr.LEXICAL_MODE != "bigram":
+            # simple 모드의 수집은 content_lex를 NULL로 갱신하므로 전환 직전에 실행해야 함
+            logger.warning("lexical_backfill_disabled", hint="LEXICAL_INDEX=bigram")
+        started = time.perf_counter()
+        mgr.ensure_vector_table()
+
+        if rebuild_index:
+            with mgr.get_cursor() as cursor:
+                cursor.execute(f"DROP INDEX IF EXISTS {mgr.LEXICAL_INDEX};")
+
+        scopes = mgr.partition_collections() if mgr.is_partitioned() else [None]
+        rows, batches = 0, 0
+        for collection_name in scopes:
+            last_id = 0
+            while True:
+                filled, last_id = self._fill_batch(last_id, batch_size, collection_name)
+                if filled == 0:
+                    break
+                rows += filled
+                batches += 1
+                logger.info("lexical_backfill_batch", collection_name=collection_name, rows=rows, last_id=last_id)
+
+        if rebuild_index:
+            with mgr.get_cursor() as cursor:
+                cursor.execute(mgr.LEXICAL_INDEX_SQL)
+
+        stats = {"rows": rows, "batches": batches, "seconds": round(time.perf_counter() - started, 3)}
+        logger.info("lexical_backfill_done", rebuild_index=rebuild_index, **stats)
+        return stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="rag_embeddings.content_lex 한국어 bigram 색인 백필")
+    parser.add_argument("--batch-size", type=int, default=2000, help="트랜잭션당 갱신 행 수")
+    parser.add_argument("--keep-index", action="store_true", help="GIN 인덱스를 유지한 채 갱신 (소량 백필용)")
+    args = parser.parse_args()
+
+    print(json.dumps(LexicalBackfill().run(args.batch_size, not args.keep_index)))
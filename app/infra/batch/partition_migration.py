@@ -0,0 +1,119 @@
+"""rag_embeddings 파티션 전환 배치 — 단일 테이블 → 컬렉션별 LIST 파티션
+
+기존 테이블(인덱스·시퀀스 포함)을 *_legacy로 이름을 바꾸고 파티션 부모 테이블을 새로 만든 뒤,
+컬렉션마다 독립 테이블에 행을 복사하고 ATTACH PARTITION 합니다.
+ATTACH 시 부모의 HNSW·GIN·유니크 인덱스가 적재가 끝난 파티션에 일괄 생성되므로 행 단위 인덱스 갱신보다 빠릅니다.
+컬렉션 단위 트랜잭션이므로 중단되어도 같은 명령으로 이어서 실행할 수 있습니다 (이미 붙은 파티션은 건너뜀).
+전환 동안에는 수집(쓰기)을 멈춰야 합니다. 이후 파티션은 첫 삽입 시 ensure_partition이 자동 생성합니다.
+
+사용 예) python -m app.infra.batch.partition_migration --drop-legacy
+"""
+import json
+import time
+from typing import Any, Dict
+
+import structlog
+
+from app.infra.database import PGVectorManager
+
+logger = structlog.get_logger()
+
+_LEGACY_TABLE = "rag_embeddings_legacy"
+_COLUMNS = ("id, collection_name, content, metadata, embedding, content_tsv, image_embedding, "
+            "screen_key, content_hash, embedding_short, content_lex")
+
+
+class PartitionMigration:
+
+    def __init__(self, connection_manager: PGVectorManager = None):
+        self.connection_manager = connection_manager or PGVectorManager()
+
+    def _legacy_index_names(self):
+        mgr = self.connection_manager
+        return ["rag_embeddings_pkey", "rag_embeddings_collection_idx", "rag_embeddings_tsv_idx", mgr.LEXICAL_INDEX,
+                mgr.EMBEDDING_HNSW_INDEX, mgr.BQ_HNSW_INDEX, mgr.SHORT_HNSW_INDEX, mgr.IMAGE_HNSW_INDEX,
+                mgr.SCREEN_KEY_INDEX]
+
+    def _rename_legacy(self) -> bool:
+        """단일 테이블이면 legacy로 이름을 바꿉니다. 이미 파티션 테이블이면 False."""
+        with self.connection_manager.get_cursor() as cursor:
+            cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass('rag_embeddings')")
+            row = cursor.fetchone()
+            if row is None or row[0] == "p":
+                return False
+            cursor.execute(f"ALTER TABLE rag_embeddings RENAME TO {_LEGACY_TABLE}")
+            # 인덱스·시퀀스 이름은 스키마 전역 → 새 부모 테이블이 같은 이름으로 생성될 수 있도록 변경
+            for index_name in self._legacy_index_names():
+                cursor.execute(f"ALTER INDEX IF EXISTS {index_name} RENAME TO {index_name}_legacy")
+            cursor.execute(f"ALTER SEQUENCE IF EXISTS rag_embeddings_id_seq RENAME TO {_LEGACY_TABLE}_id_seq")
+        return True
+
+    def _copy_collection(self, collection_name: str) -> int:
+        mgr = self.connection_manager
+        name = mgr.partition_table(collection_name)
+        parent = f"{mgr.PARTITION_SCHEMA}.rag_embeddings"
+        with mgr.get_cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s), quote_literal(%s)", (name, collection_name))
+            exists, literal = cursor.fetchone()
+            if exists is not None:
+                return 0
+            cursor.execute(f"CREATE TABLE {name} (LIKE {parent} INCLUDING DEFAULTS)")
+            cursor.execute(
+                f"INSERT INTO {name} ({_COLUMNS}) SELECT {_COLUMNS} FROM {_LEGACY_TABLE} WHERE collection_name = %s",
+                (collection_name,)
+            )
+            rows = cursor.rowcount
+            cursor.execute(f"ALTER TABLE {parent} ATTACH PARTITION {name} FOR VALUES IN ({literal})")
+        return rows
+
+    def run(self, drop_legacy: bool = False) -> Dict[str, Any]:
+        """반환: {"migrated", "collections", "rows", "seconds"}"""
+        mgr = self.connection_manager
+        started = time.perf_counter()
+        self._rename_legacy()
+
+        with mgr.get_cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s)", (_LEGACY_TABLE,))
+            if cursor.fetchone()[0] is None:
+                logger.info("partition_migration_skipped", reason="already_partitioned")
+                return {"migrated": False, "collections": 0, "rows": 0, "seconds": 0.0}
+
+        mgr.PARTITIONING_ENABLED = True
+        mgr.ensure_vector_table()
+
+        with mgr.get_cursor() as cursor:
+            cursor.execute(f"SELECT DISTINCT collection_name FROM {_LEGACY_TABLE}")
+            collections = [row[0] for row in cursor.fetchall()]
+
+        rows = 0
+        for collection_name in collections:
+            copied = self._copy_collection(collection_name)
+            rows += copied
+            logger.info("partition_migrated", collection_name=collection_name, rows=copied)
+
+        with mgr.get_cursor() as cursor:
+            cursor.execute("""
+                SELECT setval(pg_get_serial_sequence('rag_embeddings', 'id'),
+                              COALESCE((SELECT max(id) FROM rag_embeddings), 1))
+            """)
+            if drop_legacy:
+                cursor.execute(f"DROP TABLE {_LEGACY_TABLE}")
+
+        stats = {
+            "migrated": True,
+            "collections": len(collections),
+            "rows": rows,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+        logger.info("partition_migration_done", drop_legacy=drop_legacy, **stats)
+        return stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="rag_embeddings 컬렉션별 파티션 전환")
+    parser.add_argument("--drop-legacy", action="store_true", help="전환 후 기존 단일 테이블 삭제")
+    args = parser.parse_args()
+
+    print(json.dumps(PartitionMigration().run(args.drop_legacy)))
@@ -0,0 +1,159 @@
+"""화면 중복 정리 배치 — 화면 단위 upsert(screen_key) 도입 이전 재수집으로 쌓인 행·노드 정리
+
+--table: rag_embeddings의 screen_key를 백필하고, 컬렉션·화면별 최신 행(id 최대)만 남긴 뒤 upsert용 유니크 인덱스를 생성합니다.
+         앱 기동(ensure_vector_table)은 인덱스 생성만 시도하며, 미백필 행이나 중복이 있으면 이 배치를 안내하며 기동을 중단합니다.
+         --dry-run이면 백필·삭제 대상 건수만 출력합니다.
+--collection: 컬렉션 레이블의 AGE Screen 노드를 화면 식별 키(service_name, screen_name, version)로 묶어
+         키당 1개만 남기고(screen_key 보유 노드 우선, 없으면 최신 id) 나머지는 DETACH DELETE 합니다.
+         남긴 노드에 screen_key가 없으면 채워 넣어 이후 수집의 MERGE 대상이 되도록 합니다.
+
+사용 예) python -m app.infra.batch.screen_dedupe --table --dry-run
+        python -m app.infra.batch.screen_dedupe --table
+        python -m app.infra.batch.screen_dedupe --collection system01:screens
+"""
+import json
+from typing import Dict
+
+import structlog
+
+from app.infra.database import PGVectorManager
+from app.infra.repository.age_repository_impl import AgeRepositoryImpl, _age_safe_label, _BULK_CHUNK_SIZE
+
+logger = structlog.get_logger()
+
+
+class EmbeddingScreenDedupe:
+    """rag_embeddings screen_key 백필 + 화면 중복 행 삭제 + 유니크 인덱스 생성 (운영자 명시 실행)."""
+
+    def __init__(self, connection_manager: PGVectorManager = None):
+        self.connection_manager = connection_manager or PGVectorManager()
+
+    def _backfill_batch(self, after_id: int, batch_size: int):
+        """after_id 이후 screen_key가 NULL인 행을 최대 batch_size건 채웁니다. 반환: (채운 행 수, 마지막 id)"""
+        mgr = self.connection_manager
+        with mgr.get_cursor() as cursor:
+            cursor.execute(f"""
+                WITH batch AS (
+                    SELECT id FROM rag_embeddings
+                    WHERE id > %s AND screen_key IS NULL
+                    ORDER BY id
+                    LIMIT %s
+                )
+                UPDATE rag_embeddings r
+                SET screen_key = {mgr.SCREEN_KEY_SQL}
+                FROM batch
+                WHERE r.id = batch.id
+                RETURNING r.id
+            """, (after_id, batch_size))
+            ids = [row[0] for row in cursor.fetchall()]
+        return len(ids), max(ids, default=after_id)
+
+    def run(self, dry_run: bool = False, batch_size: int = 5000) -> Dict[str, int]:
+        """반환: {"unkeyed", "keyed", "duplicates", "deleted"}"""
+        mgr = self.connection_manager
+        key_sql = f"coalesce(screen_key, {mgr.SCREEN_KEY_SQL})"
+        with mgr.get_cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM rag_embeddings WHERE screen_key IS NULL")
+            unkeyed = cursor.fetchone()[0]
+            # 백필 후 기준으로 삭제될 행 수 (컬렉션·화면별 최신 행 제외)
+            cursor.execute(f"""
+                SELECT count(*) - count(DISTINCT (collection_name, {key_sql}))
+                FROM rag_embeddings
+            """)
+            duplicates = cursor.fetchone()[0]
+
+        stats = {"unkeyed": unkeyed, "keyed": 0, "duplicates": duplicates, "deleted": 0}
+        if dry_run:
+            logger.info("embedding_screen_dedupe_dry_run", **stats)
+            return stats
+
+        last_id = 0
+        while True:
+            filled, last_id = self._backfill_batch(last_id, batch_size)
+            if filled == 0:
+                break
+            stats["keyed"] += filled
+
+        with mgr.get_cursor() as cursor:
+            # 인덱스 생성까지 같은 트랜잭션 → 정리와 생성 사이에 중복이 다시 들어오지 않음
+            cursor.execute("LOCK TABLE rag_embeddings IN SHARE ROW EXCLUSIVE MODE")
+            cursor.execute("""
+                DELETE FROM rag_embeddings old
+                USING rag_embeddings newer
+                WHERE old.collection_name = newer.collection_name
+                  AND old.screen_key = newer.screen_key
+                  AND old.id < newer.id
+            """)
+            stats["deleted"] = cursor.rowcount
+            cursor.execute(mgr.SCREEN_KEY_INDEX_SQL)
+
+        logger.info("embedding_screen_dedupe_done", **stats)
+        return stats
+
+
+class ScreenDedupe:
+
+    def __init__(self, repository: AgeRepositoryImpl = None):
+        self.repository = repository or AgeRepositoryImpl()
+
+    def run(self, collection_name: str) -> Dict[str, int]:
+        """반환: {"scanned", "deleted", "keyed"}"""
+        repo = self.repository
+        age_label = _age_safe_label(collection_name)
+
+        with repo.connection_manager.get_cursor() as cursor:
+            repo._prepare_age(cursor)
+            vertices = repo._run_cypher(cursor, f"MATCH (n:`{age_label}`) RETURN n")
+
+            groups = {}
+            for vertex in vertices:
+                props = vertex.get("properties", {})
+                screen_key = props.get("screen_key")
+                if not screen_key:
+                    metadata = props.get("metadata", "{}")
+                    if isinstance(metadata, str):
+                        metadata = json.loads(metadata or "{}")
+                    screen_key = PGVectorManager.screen_key(metadata)
+                groups.setdefault(screen_key, []).append((bool(props.get("screen_key")), vertex["id"]))
+
+            delete_ids, key_rows = [], []
+            for screen_key, members in groups.items():
+                members.sort()  # (screen_key 보유 여부, id) 오름차순 → 마지막이 유지 대상
+                has_key, keep_id = members[-1]
+                delete_ids.extend(vertex_id for _, vertex_id in members[:-1])
+                if not has_key:
+                    key_rows.append({"id": keep_id, "screen_key": screen_key})
+
+            for i in range(0, len(delete_ids), _BULK_CHUNK_SIZE):
+                repo._run_cypher(cursor, f"""
+                    MATCH (n:`{age_label}`) WHERE id(n) IN $ids
+                    DETACH DELETE n
+                """, {"ids": delete_ids[i:i + _BULK_CHUNK_SIZE]})
+            for i in range(0, len(key_rows), _BULK_CHUNK_SIZE):
+                repo._run_cypher(cursor, f"""
+                    UNWIND $rows AS row
+                    MATCH (n:`{age_label}`) WHERE id(n) = row.id
+                    SET n.screen_key = row.screen_key
+                    RETURN id(n)
+                """, {"rows": key_rows[i:i + _BULK_CHUNK_SIZE]})
+
+        stats = {"scanned": len(vertices), "deleted": len(delete_ids), "keyed": len(key_rows)}
+        logger.info("screen_dedupe_done", collection_name=collection_name, **stats)
+        return stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="rag_embeddings 행 / AGE Screen 노드 화면 중복 정리")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--table", action="store_true", help="rag_embeddings screen_key 백필·중복 삭제·유니크 인덱스 생성")
+    target.add_argument("--collection", help="AGE Screen 노드를 정리할 collection_name")
+    parser.add_argument("--dry-run", action="store_true", help="--table: 변경 없이 대상 건수만 출력")
+    parser.add_argument("--batch-size", type=int, default=5000, help="--table: 백필 트랜잭션당 행 수")
+    args = parser.parse_args()
+
+    if args.table:
+        print(json.dumps(EmbeddingScreenDedupe().run(args.dry_run, args.batch_size)))
+    else:
+        print(json.dumps(ScreenDedupe().run(args.collection)))
@@ -0,0 +1,95 @@
+"""embedding_short 백필 배치 — 기존 행의 Matryoshka 축소 임베딩(앞 768차원 + 재정규화) 채우기
+
+SHORT_EMBEDDING=true로 전환하기 전에 쌓인 행은 embedding_short가 NULL이라 matryoshka 검색 후보에서 빠집니다.
+id 순 키셋 페이지 단위로 서버에서 l2_normalize(subvector(embedding, 1, 768))를 계산해 채우며,
+배치마다 커밋하므로 중단되어도 같은 명령으로 이어서 실행할 수 있습니다 (이미 채운 행은 건너뜀).
+파티션 모드에서는 id 단독 인덱스가 없으므로 컬렉션(파티션)별로 (collection_name, id) PK 순서로 페이지합니다.
+기본 동작은 축소 HNSW 인덱스를 DROP 후 채우고 마지막에 일괄 생성합니다 (행 단위 인덱스 갱신보다 빠름).
+
+사용 예) SHORT_EMBEDDING=true python -m app.infra.batch.short_embedding_backfill --batch-size 5000
+"""
+import json
+import time
+from typing import Any, Dict
+
+import structlog
+
+from app.infra.database import PGVectorManager
+
+logger = structlog.get_logger()
+
+
+class ShortEmbeddingBackfill:
+
+    def __init__(self, connection_manager: PGVectorManager = None):
+        self.connection_manager = connection_manager or PGVectorManager()
+
+    def _fill_batch(self, after_id: int, batch_size: int, collection_name: str = None):
+        """after_id 이후 NULL 행을 최대 batch_size건 채웁니다. 반환: (채운 행 수, 마지막 id)
+        collection_name: 파티션 모드의 페이지 범위 (해당 파티션만 스캔)"""
+        mgr = self.connection_manager
+        batch_scope, update_scope, scope_params = "", "", ()
+        if collection_name is not None:
+            batch_scope, update_scope = "collection_name = %s AND ", "r.collection_name = %s AND "
+            scope_params = (collection_name,)
+        with mgr.get_cursor() as cursor:
+            cursor.execute(f"""
+                WITH batch AS (
+                    SELECT id FROM rag_embeddings
+                    WHERE {batch_scope}id > %s AND embedding_short IS NULL AND embedding IS NOT NULL
+                    ORDER BY id
+                    LIMIT %s
+                )
+                UPDATE rag_embeddings r
+                SET embedding_short = {mgr.SHORT_EMBEDDING_SQL}
+                FROM batch
+                WHERE {update_scope}r.id = batch.id
+                RETURNING r.id
+            """, scope_params + (after_id, batch_size) + scope_params)
+            ids = [row[0] for row in cursor.fetchall()]
+        return len(ids), max(ids, default=after_id)
+
+    def run(self, batch_size: int = 5000, rebuild_index: bool = True) -> Dict[str, Any]:
+        """반환: {"rows", "batches", "seconds"}"""
+        mgr = self.connection_manager
+        if not mgr.SHORT_EMBEDDING_ENABLED:
+            # 비활성 상태의 수집은 embedding_short를 NULL로 갱신하므로 전환 직전에 실행해야 함
+            logger.warning("short_embedding_backfill_disabled", hint="SHORT_EMBEDDING=true")
+        started = time.perf_counter()
+        mgr.ensure_vector_table()
+
+        if rebuild_index:
+            with mgr.get_cursor() as cursor:
+                cursor.execute(f"DROP INDEX IF EXISTS {mgr.SHORT_HNSW_INDEX};")
+
+        scopes = mgr.partition_collections() if mgr.is_partitioned() else [None]
+        rows, batches = 0, 0
+        for collection_name in scopes:
+            last_id = 0
+            while True:
+                filled, last_id = self._fill_batch(last_id, batch_size, collection_name)
+                if filled == 0:
+                    break
+                rows += filled
+                batches += 1
+                logger.info("short_embedding_backfill_batch", collection_name=collection_name, rows=rows,
+                            last_id=last_id)
+
+        if rebuild_index:
+            with mgr.get_cursor() as cursor:
+                cursor.execute(mgr.SHORT_HNSW_INDEX_SQL)
+
+        stats = {"rows": rows, "batches": batches, "seconds": round(time.perf_counter() - started, 3)}
+        logger.info("short_embedding_backfill_done", rebuild_index=rebuild_index, **stats)
+        return stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="rag_embeddings.embedding_short 백필")
+    parser.add_argument("--batch-size", type=int, default=5000, help="트랜잭션당 갱신 행 수")
+    parser.add_argument("--keep-index", action="store_true", help="축소 HNSW 인덱스를 유지한 채 갱신 (소량 백필용)")
+    args = parser.parse_args()
+
+    print(json.dumps(ShortEmbeddingBackfill().run(args.batch_size, not args.keep_index)))
@@ -0,0 +1,45 @@
+"""한국어 어휘 색인 — 한글 음절 bigram 토큰화 (하이브리드 검색 키워드 레그용)
+
+to_tsvector('simple', ...)는 공백 단위로만 분리하므로 조사("로그인을")·복합명사("비밀번호재설정")가 붙은
+한국어 어절은 쿼리("로그인", "비밀번호 재설정")와 어휘가 일치하지 않습니다.
+한글 연속 구간을 2음절 단위로 겹쳐 자르면 형태소 분석기 없이도 어간 부분이 같은 토큰으로 색인됩니다.
+  "비밀번호재설정을" → 비밀 밀번 번호 호재 재설 설정 정을
+영문·숫자 구간은 소문자 단어 그대로 유지합니다.
+"""
+import re
+from typing import List, Optional
+
+# 한글 음절 연속 구간 | 한글·밑줄을 제외한 단어 문자 연속 구간 (영문·숫자 등)
+_TOKEN_RE = re.compile(r"[가-힣]+|[^\W_가-힣]+")
+
+
+def _is_hangul(token: str) -> bool:
+    return "가" <= token[0] <= "힣"
+
+
+def tokenize(text: str) -> List[str]:
+    """텍스트를 한글 bigram + 영문/숫자 단어 토큰 목록으로 변환합니다 (등장 순서, 중복 유지)."""
+    tokens = []
+    for run in _TOKEN_RE.findall(text or ""):
+        if not _is_hangul(run):
+            tokens.append(run.lower())
+        elif len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def lexical_document(text: str) -> str:
+    """색인용 문서 문자열 — to_tsvector('simple', ...) 입력 (빈도가 ts_rank에 반영되도록 중복 유지)."""
+    return " ".join(tokenize(text))
+
+
+def lexical_query(text: str) -> Optional[str]:
+    """to_tsquery('simple', ...) 입력 — 쿼리 토큰의 OR 결합. 토큰이 없으면 None.
+    어절 경계를 넘는 bigram("로그인화면" → "인화")은 문서에 없을 수 있으므로 AND가 아닌 OR로 묶고
+    일치 토큰 수·빈도는 ts_rank 순위로 반영합니다. 토큰은 단어 문자뿐이라 따옴표로 감싸면 연산자와 충돌하지 않습니다."""
+    tokens = list(dict.fromkeys(tokenize(text)))
+    if not tokens:
+        return None
+    return " | ".join(f"'{token}'" for token in tokens)
@@ -1,13 +1,19 @@
+import hashlib
+import math
 import os
 from contextlib import contextmanager
+import structlog
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import QueuePool
 from dotenv import load_dotenv, find_dotenv
 from app.config import vector_db_config
+from app.infra.database import korean_lexical
 
 load_dotenv(find_dotenv())
 
+logger = structlog.get_logger()
+
 class PGVectorManager:
     _engine = None
     _session_factory = None
@@ -33,12 +39,144 @@ class PGVectorManager:
         PGVectorManager._session_factory = sessionmaker(bind=PGVectorManager._engine)
 
     EMBEDDING_DIM = 3072  # gemini-embedding-001
+    IMAGE_EMBEDDING_DIM = 512  # clip-ViT-B-32
+
+    # HNSW 인덱스 DDL — ensure_vector_table과 대량 적재(인덱스 재생성)에서 공용 사용
+    EMBEDDING_HNSW_INDEX = "rag_embeddings_embedding_hnsw_idx"
+    EMBEDDING_HNSW_INDEX_SQL = """
+        CREATE INDEX IF NOT EXISTS rag_embeddings_embedding_hnsw_idx
+        ON rag_embeddings USING hnsw (embedding halfvec_cosine_ops);
+    """
+    # 이진 양자화(1bit × 3072 = 384B) 표현식 HNSW 인덱스 — quantized 검색 1단계 후보 생성용 (Hamming 거리)
+    # 기존 대용량 테이블은 app.infra.batch.concurrent_index --index bq 로 먼저 생성한 뒤 BQ_INDEX=true로 전환
+    BQ_INDEX_ENABLED = os.getenv("BQ_INDEX", "false").lower() == "true"
+    BQ_HNSW_INDEX = "rag_embeddings_embedding_bq_hnsw_idx"
+    BQ_HNSW_INDEX_SQL = f"""
+        CREATE INDEX IF NOT EXISTS rag_embeddings_embedding_bq_hnsw_idx
+        ON rag_embeddings USING hnsw ((binary_quantize(embedding)::bit({EMBEDDING_DIM})) bit_hamming_ops);
+    """
+    # Matryoshka 축소 임베딩: gemini-embedding-001은 앞쪽 차원만 잘라 재정규화해도 의미가 유지되므로(MRL)
+    # 앞 768차원을 embedding_short 컬럼에 저장해 1단계 후보 검색에 사용 (거리 계산·인덱스 페이지 1/4)
+    SHORT_EMBEDDING_DIM = 768
+    SHORT_EMBEDDING_ENABLED = os.getenv("SHORT_EMBEDDING", "false").lower() == "true"
+    SHORT_DEFAULT_OVERSAMPLE = int(os.getenv("SHORT_EMBEDDING_OVERSAMPLE", "3"))  # matryoshka 검색 후보 배수
+    SHORT_EMBEDDING_SQL = f"l2_normalize(subvector(embedding, 1, {SHORT_EMBEDDING_DIM}))"  # 백필·대량 적재용
+    SHORT_HNSW_INDEX = "rag_embeddings_embedding_short_hnsw_idx"
+    SHORT_HNSW_INDEX_SQL = """
+        CREATE INDEX IF NOT EXISTS rag_embeddings_embedding_short_hnsw_idx
+        ON rag_embeddings USING hnsw (embedding_short halfvec_cosine_ops);
+    """
+    # 하이브리드 검색 키워드 레그 어휘 색인: simple(공백 분리 content_tsv) | bigram(한글 음절 bigram content_lex)
+    LEXICAL_MODE = os.getenv("LEXICAL_INDEX", "simple").lower()
+    LEXICAL_INDEX = "rag_embeddings_lex_idx"
+    LEXICAL_INDEX_SQL = """
+        CREATE INDEX IF NOT EXISTS rag_embeddings_lex_idx
+        ON rag_embeddings USING GIN (content_lex);
+    """
+    IMAGE_HNSW_INDEX = "rag_embeddings_image_emb_hnsw_idx"
+    IMAGE_HNSW_INDEX_SQL = """
+        CREATE INDEX IF NOT EXISTS rag_embeddings_image_emb_hnsw_idx
+        ON rag_embeddings USING hnsw (image_embedding vector_cosine_ops)
+        WHERE image_embedding IS NOT NULL;
+    """
+
+    # 검색 정확도 프로파일 → (hnsw.ef_search, hnsw.iterative_scan)
+    # iterative_scan(pgvector 0.8+)은 필터로 후보가 걸러져 k개 미만이 되면 인덱스 탐색을 이어갑니다.
+    # exact는 HNSW를 쓰지 않고 컬렉션 내 전수 비교 (작은 컬렉션·정답셋 검증용)
+    SEARCH_PROFILES = {
+        "fast": (40, "off"),
+        "balanced": (100, "strict_order"),
+        "exact": (None, None),
+    }
+    HNSW_EF_SEARCH_MAX = 1000
+    BQ_DEFAULT_OVERSAMPLE = int(os.getenv("BQ_OVERSAMPLE", "4"))  # quantized 검색 후보 배수
+    _iterative_scan_supported = None  # 최초 검색 시 pgvector 버전으로 판별
+
+    # 컬렉션별 LIST 파티셔닝: 신규 생성 시 VECTOR_PARTITIONING=true면 파티션 테이블로 생성.
+    # 기존 단일 테이블은 app.infra.batch.partition_migration으로 전환하며, 실제 모드는 카탈로그에서 판별합니다.
+    PARTITIONING_ENABLED = os.getenv("VECTOR_PARTITIONING", "false").lower() == "true"
+    PARTITION_PREFIX = "rag_embeddings_c_"
+    # 그래프 연산과 같은 커서에서는 AGE search_path(ag_catalog 우선)가 적용되므로 파티션 DDL은 스키마를 명시
+    PARTITION_SCHEMA = "public"
+    _partitioned = None  # 매니저별 캐시 (is_partitioned 최초 호출 시 카탈로그 조회)
+
+    # 화면 식별 키: 컬렉션 내 (service_name, screen_name, version) — 재수집 시 upsert 기준
+    # screen_key()와 동일한 규칙의 SQL 표현식 (기존 행 백필용)
+    SCREEN_KEY_INDEX = "rag_embeddings_screen_key_uidx"
+    SCREEN_KEY_INDEX_SQL = """
+        CREATE UNIQUE INDEX IF NOT EXISTS rag_embeddings_screen_key_uidx
+        ON rag_embeddings (collection_name, screen_key);
+    """
+    SCREEN_KEY_SQL = """md5(concat_ws(chr(31),
+        coalesce(nullif(metadata->>'service_name', ''), 'unknown'),
+        coalesce(nullif(metadata->>'screen_name', ''), 'unknown'),
+        coalesce(nullif(metadata->>'version', ''), '1.0.0')))"""
+    UPSERT_SET_SQL = """
+        content = EXCLUDED.content, metadata = EXCLUDED.metadata, embedding = EXCLUDED.embedding,
+        content_tsv = EXCLUDED.content_tsv, image_embedding = EXCLUDED.image_embedding,
+        content_hash = EXCLUDED.content_hash, embedding_short = EXCLUDED.embedding_short,
+        content_lex = EXCLUDED.content_lex
+    """
+
+    @staticmethod
+    def screen_key(metadata: dict) -> str:
+        parts = [
+            str(metadata.get("service_name") or "unknown"),
+            str(metadata.get("screen_name") or "unknown"),
+            str(metadata.get("version") or "1.0.0"),
+        ]
+        return hashlib.md5("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def content_hash(doc: dict) -> str:
+        """저장 내용 해시 (본문 + 메타데이터 + 원본 이미지 SHA-256). 같으면 재임베딩/갱신을 생략합니다."""
+        import json
+        raw = json.dumps({
+            "content": doc.get("page_content", ""),
+            "metadata": doc.get("metadata", {}),
+            "image_sha256": doc.get("image_sha256"),
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def truncate_embedding(embedding: list, dim: int) -> list:
+        """앞 dim차원만 남기고 L2 노름 1로 재정규화합니다 (Matryoshka 축소, 코사인 거리 보존용)."""
+        head = [float(v) for v in embedding[:dim]]
+        norm = math.sqrt(sum(v * v for v in head))
+        return [v / norm for v in head] if norm else head
+
+    def _short_embedding(self, embedding: list):
+        """수집 시 embedding_short 값. 비활성이면 None(NULL)."""
+        if not self.SHORT_EMBEDDING_ENABLED or not embedding:
+            return None
+        return self.truncate_embedding(embedding, self.SHORT_EMBEDDING_DIM)
+
+    @classmethod
+    def lexical_text(cls, content: str):
+        """수집 시 content_lex 입력 (bigram 문서 문자열). bigram 모드가 아니면 None(NULL)."""
+        if cls.LEXICAL_MODE != "bigram":
+            return None
+        return korean_lexical.lexical_document(content)
 
     def ensure_vector_table(self):
         """rag_embeddings 테이블과 인덱스가 없으면 생성합니다. 앱 시작 시 1회 호출.
         embedding 타입: halfvec(3072) — float16 저장으로 메모리 50% 절약, HNSW 인덱스 지원(pgvector 0.7.0+)
         """
         with self.get_cursor() as cursor:
+            cursor.execute("SELECT to_regclass('rag_embeddings')")
+            if cursor.fetchone()[0] is None and self.PARTITIONING_ENABLED:
+                # 파티션 키는 PK에 포함되어야 함 → (collection_name, id)
+                cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS rag_embeddings (
+                        id BIGSERIAL,
+                        collection_name TEXT NOT NULL,
+                        content TEXT NOT NULL,
+                        metadata JSONB,
+                        embedding halfvec({self.EMBEDDING_DIM}),
+                        content_tsv TSVECTOR,
+                        PRIMARY KEY (collection_name, id)
+                    ) PARTITION BY LIST (collection_name);
+                """)
             # halfvec 타입으로 테이블 생성 (신규)
             cursor.execute(f"""
                 CREATE TABLE IF NOT EXISTS rag_embeddings (
@@ -71,46 +209,247 @@ class PGVectorManager:
                 CREATE INDEX IF NOT EXISTS rag_embeddings_tsv_idx
                 ON rag_embeddings USING GIN (content_tsv);
             """)
-            # halfvec HNSW 인덱스 — 코사인 유사도 기준 ANN 검색 (O(log n))
-            # halfvec은 최대 16000차원까지 hnsw/ivfflat 인덱스 지원 (vector는 2000차원 제한)
+            # 한국어 bigram 어휘 색인 컬럼 (LEXICAL_INDEX=bigram, 기존 행은 lexical_backfill로 채움)
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS rag_embeddings_embedding_hnsw_idx
-                ON rag_embeddings USING hnsw (embedding halfvec_cosine_ops);
+                ALTER TABLE rag_embeddings
+                ADD COLUMN IF NOT EXISTS content_lex TSVECTOR;
             """)
+            if self.LEXICAL_MODE == "bigram":
+                cursor.execute(self.LEXICAL_INDEX_SQL)
+            # halfvec HNSW 인덱스 — 코사인 유사도 기준 ANN 검색 (O(log n))
+            # halfvec은 최대 16000차원까지 hnsw/ivfflat 인덱스 지원 (vector는 2000차원 제한)
+            cursor.execute(self.EMBEDDING_HNSW_INDEX_SQL)
+            if self.BQ_INDEX_ENABLED:
+                cursor.execute(self.BQ_HNSW_INDEX_SQL)
             # 19단계: CLIP 이미지 임베딩 컬럼 추가 (512차원, NULL 허용)
             cursor.execute("""
                 ALTER TABLE rag_embeddings
                 ADD COLUMN IF NOT EXISTS image_embedding vector(512);
             """)
             # 부분 인덱스: image_embedding이 있는 행만 인덱싱하여 공간 절약
+            cursor.execute(self.IMAGE_HNSW_INDEX_SQL)
+            # Matryoshka 축소 임베딩 컬럼 (NULL 허용, 기존 행은 short_embedding_backfill로 채움)
+            cursor.execute(f"""
+                ALTER TABLE rag_embeddings
+                ADD COLUMN IF NOT EXISTS embedding_short halfvec({self.SHORT_EMBEDDING_DIM});
+            """)
+            if self.SHORT_EMBEDDING_ENABLED:
+                cursor.execute(self.SHORT_HNSW_INDEX_SQL)
+            # 화면 단위 upsert: screen_key + content_hash 컬럼
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS rag_embeddings_image_emb_hnsw_idx
-                ON rag_embeddings USING hnsw (image_embedding vector_cosine_ops)
-                WHERE image_embedding IS NOT NULL;
+                ALTER TABLE rag_embeddings
+                ADD COLUMN IF NOT EXISTS screen_key TEXT,
+                ADD COLUMN IF NOT EXISTS content_hash TEXT;
             """)
+            blocked = self._ensure_screen_key_index(cursor)
+            # 부모 테이블에 만든 인덱스(HNSW·GIN·유니크)는 파티션마다 자동 생성됨
+            self._partitioned = None
+            self.is_partitioned(cursor)
+        if blocked:
+            # 유니크 인덱스가 없으면 모든 upsert(ON CONFLICT)가 실패하므로 기동을 중단 (컬럼 추가는 커밋된 상태)
+            raise RuntimeError(f"{self.SCREEN_KEY_INDEX} 생성 불가({blocked}): "
+                               "python -m app.infra.batch.screen_dedupe --table 실행 후 재시작하세요")
+
+    def is_partitioned(self, cursor=None) -> bool:
+        """rag_embeddings가 파티션 테이블인지 카탈로그(pg_class.relkind)로 판별합니다.
+        ensure_vector_table을 거치지 않는 배치(대량 적재 CLI 등)도 실제 모드를 따르도록 최초 호출 시 조회 후 캐시합니다."""
+        if self._partitioned is None:
+            with self.cursor_scope(cursor) as cur:
+                cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass('public.rag_embeddings')")
+                row = cur.fetchone()
+            if row is None:
+                return False  # 테이블 생성 전 — 캐시하지 않음
+            self._partitioned = row[0] == "p"
+        return self._partitioned
+
+    def partition_collections(self) -> list:
+        """파티션 모드에서 행이 있는 파티션의 컬렉션 목록 (파티션마다 1행 조회, DISTINCT 전체 스캔 없음).
+        키셋 배치는 컬렉션별로 collection_name = %s AND id > %s 를 사용해야 PK (collection_name, id)를 탑니다."""
+        with self.get_cursor() as cursor:
+            cursor.execute("""
+                SELECT c.relname FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = to_regclass('public.rag_embeddings')
+                ORDER BY c.relname
+            """)
+            partitions = [row[0] for row in cursor.fetchall()]
+            collections = []
+            for partition in partitions:
+                cursor.execute(f"SELECT collection_name FROM {self.PARTITION_SCHEMA}.{partition} LIMIT 1")
+                row = cursor.fetchone()
+                if row is not None:
+                    collections.append(row[0])
+        return collections
+
+    def _ensure_screen_key_index(self, cursor):
+        """upsert 기준 유니크 인덱스가 없으면 생성합니다. 기존 행 백필·중복 삭제는 하지 않습니다.
+        screen_key 미백필 행이나 중복이 있으면 인덱스를 만들지 않고 사유를 반환합니다 (생성·존재 시 None).
+        호출자(ensure_vector_table)는 트랜잭션 커밋 후 기동을 중단하고, 운영자가
+        python -m app.infra.batch.screen_dedupe --table 로 정리 후 재시작합니다."""
+        cursor.execute("SELECT to_regclass(%s)", (self.SCREEN_KEY_INDEX,))
+        if cursor.fetchone()[0] is not None:
+            return None
+        # 여러 워커가 동시에 기동해도 인덱스 생성은 1회만
+        cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (self.SCREEN_KEY_INDEX,))
+        cursor.execute("SELECT EXISTS(SELECT 1 FROM rag_embeddings WHERE screen_key IS NULL)")
+        if cursor.fetchone()[0]:
+            logger.error("screen_key_index_blocked", reason="screen_key_backfill_required",
+                         hint="python -m app.infra.batch.screen_dedupe --table")
+            return "screen_key_backfill_required"
+        cursor.execute("SAVEPOINT screen_key_index")
+        try:
+            cursor.execute(self.SCREEN_KEY_INDEX_SQL)
+        except Exception as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT screen_key_index")
+            logger.error("screen_key_index_blocked", reason="duplicate_screens", error=str(e)[:200],
+                         hint="python -m app.infra.batch.screen_dedupe --table")
+            return "duplicate_screens"
+        cursor.execute("RELEASE SAVEPOINT screen_key_index")
+        return None
+
+    @classmethod
+    def partition_name(cls, collection_name: str) -> str:
+        """컬렉션 파티션 테이블명 (system_id:collection 등 임의 문자열 → 식별자 안전한 해시)."""
+        return cls.PARTITION_PREFIX + hashlib.md5(collection_name.encode("utf-8")).hexdigest()[:16]
+
+    @classmethod
+    def partition_table(cls, collection_name: str) -> str:
+        """스키마를 포함한 파티션 테이블명 (to_regclass·DDL용)."""
+        return f"{cls.PARTITION_SCHEMA}.{cls.partition_name(collection_name)}"
+
+    def ensure_partition(self, collection_name: str, cursor):
+        """파티션 모드에서 컬렉션 파티션이 없으면 생성합니다 (삽입 직전, 같은 트랜잭션).
+        동시 최초 삽입은 advisory 락으로 직렬화하며, 이미 있으면 카탈로그 조회 1회로 끝납니다."""
+        if not self.is_partitioned(cursor):
+            return
+        name = self.partition_table(collection_name)
+        cursor.execute("SELECT to_regclass(%s)", (name,))
+        if cursor.fetchone()[0] is not None:
+            return
+        cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (name,))
+        cursor.execute("SELECT to_regclass(%s), quote_literal(%s)", (name, collection_name))
+        exists, literal = cursor.fetchone()
+        if exists is None:
+            # FOR VALUES IN은 바인딩 파라미터 불가 → 서버 quote_literal로 이스케이프한 리터럴 사용
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {self.PARTITION_SCHEMA}.rag_embeddings "
+                           f"FOR VALUES IN ({literal})")
+
+    def drop_collection(self, collection_name: str, cursor=None):
+        """컬렉션의 벡터 행을 모두 삭제합니다. 파티션 모드에서는 파티션 DROP (인덱스 포함, 행 수와 무관하게 즉시)."""
+        with self.cursor_scope(cursor) as cur:
+            if self.is_partitioned(cur):
+                cur.execute(f"DROP TABLE IF EXISTS {self.partition_table(collection_name)}")
+            else:
+                cur.execute("DELETE FROM rag_embeddings WHERE collection_name = %s", (collection_name,))
 
     def insert_embedding(self, collection_name: str, content: str, metadata: dict, embedding: list,
-                         image_embedding: list = None):
-        """pgvector 테이블에 임베딩과 콘텐츠를 삽입합니다. content_tsv도 자동 생성합니다.
+                         image_embedding: list = None, content_hash: str = None):
+        """pgvector 테이블에 임베딩과 콘텐츠를 upsert합니다. content_tsv도 자동 생성합니다.
+        같은 컬렉션·화면(screen_key)의 행이 있으면 제자리 갱신합니다.
         image_embedding: CLIP 이미지 임베딩(512차원). None이면 NULL 저장.
         """
         import json
+        screen_key = self.screen_key(metadata)
+        if content_hash is None:
+            content_hash = self.content_hash({"page_content": content, "metadata": metadata})
+        short_embedding = self._short_embedding(embedding)
+        lexical_text = self.lexical_text(content)
         with self.get_cursor() as cursor:
+            self.ensure_partition(collection_name, cursor)
             if image_embedding is not None:
                 cursor.execute(
-                    """INSERT INTO rag_embeddings
-                       (collection_name, content, metadata, embedding, content_tsv, image_embedding)
-                       VALUES (%s, %s, %s, %s::halfvec, to_tsvector('simple', %s), %s::vector)""",
-                    (collection_name, content, json.dumps(metadata), embedding, content, image_embedding)
+                    f"""INSERT INTO rag_embeddings
+                       (collection_name, content, metadata, embedding, content_tsv, image_embedding,
+                        screen_key, content_hash, embedding_short, content_lex)
+                       VALUES (%s, %s, %s, %s::halfvec, to_tsvector('simple', %s), %s::vector, %s, %s, %s::halfvec,
+                               to_tsvector('simple', %s))
+                       ON CONFLICT (collection_name, screen_key) DO UPDATE SET {self.UPSERT_SET_SQL}""",
+                    (collection_name, content, json.dumps(metadata), embedding, content, image_embedding,
+                     screen_key, content_hash, short_embedding, lexical_text)
                 )
             else:
                 cursor.execute(
-                    """INSERT INTO rag_embeddings
-                       (collection_name, content, metadata, embedding, content_tsv, image_embedding)
-                       VALUES (%s, %s, %s, %s::halfvec, to_tsvector('simple', %s), NULL)""",
-                    (collection_name, content, json.dumps(metadata), embedding, content)
+                    f"""INSERT INTO rag_embeddings
+                       (collection_name, content, metadata, embedding, content_tsv, image_embedding,
+                        screen_key, content_hash, embedding_short, content_lex)
+                       VALUES (%s, %s, %s, %s::halfvec, to_tsvector('simple', %s), NULL, %s, %s, %s::halfvec,
+                               to_tsvector('simple', %s))
+                       ON CONFLICT (collection_name, screen_key) DO UPDATE SET {self.UPSERT_SET_SQL}""",
+                    (collection_name, content, json.dumps(metadata), embedding, content,
+                     screen_key, content_hash, short_embedding, lexical_text)
                 )
 
+    def insert_embeddings(self, collection_name: str, documents: list, cursor=None):
+        """여러 문서를 multi-row INSERT 한 번으로 rag_embeddings에 upsert합니다.
+        documents: page_content / metadata / embedding / image_embedding (선택: image_sha256) 키를 가진 dict 목록.
+        같은 화면(screen_key)이 배치 안에 여러 번 있으면 마지막 문서만 저장합니다 (ON CONFLICT 제약).
+        cursor: 전달 시 해당 커서의 트랜잭션에 참여(커밋은 호출자 책임), 미전달 시 자체 트랜잭션.
+        """
+        import json
+        if not documents:
+            return
+        latest = {}
+        for doc in documents:
+            latest[self.screen_key(doc.get("metadata", {}))] = doc
+        values_sql = []
+        params = []
+        for screen_key, doc in latest.items():
+            content = doc.get("page_content", "")
+            values_sql.append(
+                "(%s, %s, %s, %s::halfvec, to_tsvector('simple', %s), %s::vector, %s, %s, %s::halfvec, "
+                "to_tsvector('simple', %s))"
+            )
+            params.extend([
+                collection_name, content, json.dumps(doc.get("metadata", {})),
+                doc.get("embedding", []), content, doc.get("image_embedding"),
+                screen_key, self.content_hash(doc), self._short_embedding(doc.get("embedding")),
+                self.lexical_text(content),
+            ])
+        sql = f"""
+            INSERT INTO rag_embeddings
+            (collection_name, content, metadata, embedding, content_tsv, image_embedding, screen_key, content_hash,
+             embedding_short, content_lex)
+            VALUES {", ".join(values_sql)}
+            ON CONFLICT (collection_name, screen_key) DO UPDATE SET {self.UPSERT_SET_SQL}
+        """
+        with self.cursor_scope(cursor) as cur:
+            self.ensure_partition(collection_name, cur)
+            cur.execute(sql, params)
+
+    def get_content_hashes(self, collection_name: str, screen_keys: list) -> dict:
+        """컬렉션 내 화면들의 저장된 content_hash를 {screen_key: content_hash}로 반환합니다."""
+        if not screen_keys:
+            return {}
+        with self.get_cursor() as cursor:
+            cursor.execute(
+                """SELECT screen_key, content_hash FROM rag_embeddings
+                   WHERE collection_name = %s AND screen_key = ANY(%s)""",
+                (collection_name, list(screen_keys))
+            )
+            return {row[0]: row[1] for row in cursor.fetchall()}
+
+    def _supports_iterative_scan(self, cursor) -> bool:
+        if PGVectorManager._iterative_scan_supported is None:
+            cursor.execute("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+            row = cursor.fetchone()
+            version = tuple(int(part) for part in row[0].split(".")[:2]) if row else (0, 0)
+            PGVectorManager._iterative_scan_supported = version >= (0, 8)
+        return PGVectorManager._iterative_scan_supported
+
+    def _apply_search_profile(self, cursor, accuracy: str, k: int):
+        """정확도 프로파일을 현재 트랜잭션에만 적용합니다 (set_config(..., true) = SET LOCAL).
+        ef_search는 k 이상이어야 k개를 반환할 수 있으므로 max(프로파일 값, k)로 설정합니다."""
+        if accuracy is None:
+            return
+        if accuracy == "exact":
+            cursor.execute("SELECT set_config('enable_indexscan', 'off', true)")
+            return
+        ef_search, iterative_scan = self.SEARCH_PROFILES[accuracy]
+        cursor.execute("SELECT set_config('hnsw.ef_search', %s, true)",
+                       (str(min(max(ef_search, k), self.HNSW_EF_SEARCH_MAX)),))
+        if self._supports_iterative_scan(cursor):
+            cursor.execute("SELECT set_config('hnsw.iterative_scan', %s, true)", (iterative_scan,))
+
     def _build_filter_clause(self, filters: dict) -> tuple:
         """filters dict를 WHERE 절 조건과 파라미터 리스트로 변환합니다."""
         import json
@@ -121,7 +460,8 @@ class PGVectorManager:
             params.append(json.dumps(filters))
         return conditions, params
 
-    def _visual_search(self, collection_name: str, query_image_embedding: list, k: int, filters: dict) -> list:
+    def _visual_search(self, collection_name: str, query_image_embedding: list, k: int, filters: dict,
+                       accuracy: str = None) -> list:
         """CLIP image_embedding 컬럼에 대한 코사인 유사도 검색.
         image_embedding이 NULL인 행은 제외합니다.
         """
@@ -139,6 +479,7 @@ class PGVectorManager:
             LIMIT %s
         """
         with self.get_cursor() as cursor:
+            self._apply_search_profile(cursor, accuracy, k)
             cursor.execute(sql, params)
             rows = cursor.fetchall()
         return [
@@ -150,18 +491,28 @@ class PGVectorManager:
 
     def search_similar(self, collection_name: str, query_embedding: list, k: int = 5,
                        filters: dict = None, search_mode: str = "vector", query_text: str = None,
-                       image_embedding: list = None) -> list:
+                       image_embedding: list = None, accuracy: str = None, oversample: int = None) -> list:
         """벡터 유사도 검색 또는 하이브리드/비주얼 검색을 수행합니다.
         search_mode: 'vector' (기본) | 'hybrid' (벡터+BM25 RRF) | 'visual' (CLIP 이미지 임베딩)
+                     | 'quantized' (이진 양자화 후보) | 'matryoshka' (768차원 축소 후보, SHORT_EMBEDDING 비활성 시 vector)
         image_embedding: visual 모드에서 사용할 CLIP 벡터(512차원)
+        accuracy: 'fast' | 'balanced' | 'exact' (SEARCH_PROFILES), None이면 DB 기본 설정
+        oversample: quantized / matryoshka 모드에서 1단계 인덱스로 가져올 후보 배수 (k × oversample)
         """
         if search_mode == "visual" and image_embedding is not None:
-            return self._visual_search(collection_name, image_embedding, k, filters)
+            return self._visual_search(collection_name, image_embedding, k, filters, accuracy)
+        if search_mode == "quantized":
+            return self._quantized_search(collection_name, query_embedding, k, filters, accuracy,
+                                          oversample or self.BQ_DEFAULT_OVERSAMPLE)
+        if search_mode == "matryoshka" and self.SHORT_EMBEDDING_ENABLED:
+            return self._matryoshka_search(collection_name, query_embedding, k, filters, accuracy,
+                                           oversample or self.SHORT_DEFAULT_OVERSAMPLE)
         if search_mode == "hybrid" and query_text:
-            return self._hybrid_search(collection_name, query_embedding, query_text, k, filters)
-        return self._vector_search(collection_name, query_embedding, k, filters)
+            return self._hybrid_search(collection_name, query_embedding, query_text, k, filters, accuracy)
+        return self._vector_search(collection_name, query_embedding, k, filters, accuracy)
 
-    def _vector_search(self, collection_name: str, query_embedding: list, k: int, filters: dict) -> list:
+    def _vector_search(self, collection_name: str, query_embedding: list, k: int, filters: dict,
+                       accuracy: str = None) -> list:
         """pgvector 코사인 유사도 순수 벡터 검색."""
         import json
         filter_conditions, filter_params = self._build_filter_clause(filters)
@@ -177,6 +528,7 @@ class PGVectorManager:
             LIMIT %s
         """
         with self.get_cursor() as cursor:
+            self._apply_search_profile(cursor, accuracy, k)
             cursor.execute(sql, params)
             rows = cursor.fetchall()
         return [
@@ -184,51 +536,162 @@ class PGVectorManager:
             for row in rows
         ]
 
-    def _hybrid_search(self, collection_name: str, query_embedding: list, query_text: str, k: int, filters: dict) -> list:
-        """벡터 검색 + BM25 키워드 검색 결과를 RRF(Reciprocal Rank Fusion)로 결합합니다."""
+    def _quantized_search(self, collection_name: str, query_embedding: list, k: int, filters: dict,
+                          accuracy: str = None, oversample: int = BQ_DEFAULT_OVERSAMPLE) -> list:
+        """이진 양자화 Hamming HNSW로 k × oversample 후보 → halfvec 재정렬."""
+        coarse_order = f"binary_quantize(embedding)::bit({self.EMBEDDING_DIM}) <~> binary_quantize(%s::halfvec)"
+        return self._rescored_search(collection_name, query_embedding, k, filters, accuracy, oversample,
+                                     coarse_order, query_embedding)
+
+    def _matryoshka_search(self, collection_name: str, query_embedding: list, k: int, filters: dict,
+                           accuracy: str = None, oversample: int = SHORT_DEFAULT_OVERSAMPLE) -> list:
+        """768차원 축소 임베딩 HNSW로 k × oversample 후보 → 3072차원 halfvec 재정렬.
+        쿼리 벡터도 수집 시와 같은 규칙(앞 768차원 + 재정규화)으로 축소합니다."""
+        short_query = self.truncate_embedding(query_embedding, self.SHORT_EMBEDDING_DIM)
+        return self._rescored_search(collection_name, query_embedding, k, filters, accuracy, oversample,
+                                     "embedding_short <=> %s::halfvec", short_query)
+
+    def _rescored_search(self, collection_name: str, query_embedding: list, k: int, filters: dict,
+                         accuracy: str, oversample: int, coarse_order_sql: str, coarse_param) -> list:
+        """2단계 검색 (SQL 1회): coarse_order_sql 기준 인덱스로 k × oversample 후보를 고른 뒤
+        저장된 halfvec과의 정확한 코사인 거리로 재정렬하여 상위 k개를 반환합니다."""
+        import json
+        filter_conditions, filter_params = self._build_filter_clause(filters)
+        conditions = ["collection_name = %s"] + filter_conditions
+        where_clause = " AND ".join(conditions)
+        candidate_k = k * max(1, oversample)
+        params = [collection_name] + filter_params + [coarse_param, candidate_k,
+                                                      query_embedding, query_embedding, k]
+
+        sql = f"""
+            WITH candidates AS (
+                SELECT content, metadata, embedding
+                FROM rag_embeddings
+                WHERE {where_clause}
+                ORDER BY {coarse_order_sql}
+                LIMIT %s
+            )
+            SELECT content, metadata, 1 - (embedding <=> %s::halfvec) AS score
+            FROM candidates
+            ORDER BY embedding <=> %s::halfvec
+            LIMIT %s
+        """
+        with self.get_cursor() as cursor:
+            self._apply_search_profile(cursor, accuracy, candidate_k)
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+        return [
+            {"content": row[0], "metadata": row[1] if isinstance(row[1], dict) else json.loads(row[1]), "score": float(row[2])}
+            for row in rows
+        ]
+
+    def batch_vector_search(self, collection_name: str, query_embeddings: list, k: int, filters: dict,
+                            accuracy: str = None) -> list:
+        """여러 쿼리 임베딩의 벡터 검색을 SQL 1회로 수행합니다 (unnest + LATERAL, 쿼리별 HNSW 인덱스 스캔).
+        반환: query_embeddings와 같은 순서의 결과 리스트 목록."""
+        import json
+        filter_conditions, filter_params = self._build_filter_clause(filters)
+        conditions = ["collection_name = %s"] + filter_conditions
+        where_clause = " AND ".join(conditions)
+        # 2차원 배열은 unnest 시 스칼라로 펼쳐지므로 벡터 리터럴 문자열 배열로 전달
+        vectors = ["[" + ",".join(str(float(v)) for v in emb) + "]" for emb in query_embeddings]
+        params = [vectors, collection_name] + filter_params + [k]
+
+        sql = f"""
+            WITH queries AS (
+                SELECT ord, vec::halfvec AS query_vec
+                FROM unnest(%s::text[]) WITH ORDINALITY AS q(vec, ord)
+            )
+            SELECT q.ord, r.content, r.metadata, r.score
+            FROM queries q
+            CROSS JOIN LATERAL (
+                SELECT content, metadata, 1 - (embedding <=> q.query_vec) AS score
+                FROM rag_embeddings
+                WHERE {where_clause}
+                ORDER BY embedding <=> q.query_vec
+                LIMIT %s
+            ) r
+            ORDER BY q.ord, r.score DESC
+        """
+        with self.get_cursor() as cursor:
+            self._apply_search_profile(cursor, accuracy, k)
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+        grouped = [[] for _ in query_embeddings]
+        for row in rows:
+            grouped[row[0] - 1].append(
+                {"content": row[1], "metadata": row[2] if isinstance(row[2], dict) else json.loads(row[2]), "score": float(row[3])}
+            )
+        return grouped
+
+    def _lexical_leg(self, query_text: str, mode: str = None) -> tuple:
+        """키워드 레그의 (tsvector 컬럼, tsquery SQL, 파라미터) — mode(미지정 시 LEXICAL_MODE)에 따라 선택."""
+        if (mode or self.LEXICAL_MODE) == "bigram":
+            return "content_lex", "to_tsquery('simple', %s)", korean_lexical.lexical_query(query_text)
+        return "content_tsv", "plainto_tsquery('simple', %s)", query_text
+
+    def _hybrid_search(self, collection_name: str, query_embedding: list, query_text: str, k: int, filters: dict,
+                       accuracy: str = None, lexical_mode: str = None) -> list:
+        """벡터 검색 + 키워드(tsvector) 검색 결과를 RRF(Reciprocal Rank Fusion)로 결합합니다 (SQL 1회).
+        tsquery는 한 번만 만들고, 각 레그는 거리·ts_rank를 행당 1회 계산해 id와 순위만 넘깁니다.
+        본문·메타데이터는 결합 후 최종 k개만 조회합니다."""
         import json
         filter_conditions, filter_params = self._build_filter_clause(filters)
         base_conditions = ["collection_name = %s"] + filter_conditions
         where_clause = " AND ".join(base_conditions)
+        lexical_column, tsquery_sql, tsquery_param = self._lexical_leg(query_text, lexical_mode)
 
         candidate_k = k * 3  # 각 검색에서 충분한 후보 확보
         base_params = [collection_name] + filter_params
 
         sql = f"""
-            WITH vector_ranks AS (
-                SELECT id, content, metadata,
-                       ROW_NUMBER() OVER (ORDER BY embedding <=> %s::halfvec) AS rank
-                FROM rag_embeddings
-                WHERE {where_clause}
-                ORDER BY embedding <=> %s::halfvec
-                LIMIT %s
+            WITH query AS (
+                SELECT {tsquery_sql} AS tsq
+            ),
+            vector_ranks AS (
+                SELECT id, ROW_NUMBER() OVER (ORDER BY distance) AS rank
+                FROM (
+                    SELECT id, embedding <=> %s::halfvec AS distance
+                    FROM rag_embeddings
+                    WHERE {where_clause}
+                    ORDER BY distance
+                    LIMIT %s
+                ) v
             ),
             keyword_ranks AS (
-                SELECT id, content, metadata,
-                       ROW_NUMBER() OVER (ORDER BY ts_rank(content_tsv, plainto_tsquery('simple', %s)) DESC) AS rank
-                FROM rag_embeddings
-                WHERE {where_clause}
-                AND content_tsv @@ plainto_tsquery('simple', %s)
-                ORDER BY ts_rank(content_tsv, plainto_tsquery('simple', %s)) DESC
+                SELECT id, ROW_NUMBER() OVER (ORDER BY lexical_score DESC) AS rank
+                FROM (
+                    SELECT id, ts_rank({lexical_column}, query.tsq) AS lexical_score
+                    FROM rag_embeddings, query
+                    WHERE {where_clause}
+                    AND {lexical_column} @@ query.tsq
+                    ORDER BY lexical_score DESC
+                    LIMIT %s
+                ) kw
+            ),
+            fused AS (
+                SELECT
+                    COALESCE(v.id, k.id) AS id,
+                    COALESCE(1.0 / (60 + v.rank), 0.0) + COALESCE(1.0 / (60 + k.rank), 0.0) AS rrf_score
+                FROM vector_ranks v
+                FULL OUTER JOIN keyword_ranks k ON v.id = k.id
+                ORDER BY rrf_score DESC
                 LIMIT %s
             )
-            SELECT
-                COALESCE(v.id, k.id) AS id,
-                COALESCE(v.content, k.content) AS content,
-                COALESCE(v.metadata, k.metadata) AS metadata,
-                COALESCE(1.0 / (60 + v.rank), 0.0) + COALESCE(1.0 / (60 + k.rank), 0.0) AS rrf_score
-            FROM vector_ranks v
-            FULL OUTER JOIN keyword_ranks k ON v.id = k.id
-            ORDER BY rrf_score DESC
-            LIMIT %s
+            SELECT r.id, r.content, r.metadata, f.rrf_score
+            FROM fused f
+            JOIN rag_embeddings r ON r.id = f.id AND r.collection_name = %s
+            ORDER BY f.rrf_score DESC
         """
         params = (
-            [query_embedding] + base_params + [query_embedding, candidate_k] +  # vector_ranks
-            [query_text] + base_params + [query_text, query_text, candidate_k] +  # keyword_ranks
-            [k]
+            [tsquery_param] +  # query
+            [query_embedding] + base_params + [candidate_k] +  # vector_ranks
+            base_params + [candidate_k] +  # keyword_ranks
+            [k, collection_name]
         )
 
         with self.get_cursor() as cursor:
+            self._apply_search_profile(cursor, accuracy, candidate_k)
             cursor.execute(sql, params)
             rows = cursor.fetchall()
         return [
@@ -261,6 +724,32 @@ class PGVectorManager:
             cursor.close()
             conn.close()
 
+    @contextmanager
+    def autocommit_cursor(self):
+        """트랜잭션 블록 밖에서 실행해야 하는 DDL(CREATE INDEX CONCURRENTLY 등)용 autocommit 커서.
+        반납 전 autocommit을 되돌려 풀의 다른 사용처에 영향이 없도록 합니다."""
+        conn = PGVectorManager._engine.connect()
+        raw = conn.connection.driver_connection
+        raw.rollback()  # pre_ping 등으로 열린 트랜잭션을 닫아야 autocommit 전환 가능
+        raw.autocommit = True
+        cursor = raw.cursor()
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+            raw.autocommit = False
+            conn.close()
+
+    @contextmanager
+    def cursor_scope(self, cursor=None):
+        """외부 트랜잭션 커서가 있으면 그대로 사용하고, 없으면 get_cursor()로 새 트랜잭션을 엽니다.
+        여러 저장 단계를 하나의 트랜잭션으로 묶을 때 사용합니다."""
+        if cursor is not None:
+            yield cursor
+        else:
+            with self.get_cursor() as cur:
+                yield cur
+
     @property
     def engine(self):
         return PGVectorManager._engine
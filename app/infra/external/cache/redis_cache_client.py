@@ -1,10 +1,19 @@
 import logging
-from typing import Optional
+import uuid
+from typing import AsyncIterator, List, Optional
 
 from app.core.interface.cache_client import CacheClient
 
 logger = logging.getLogger(__name__)
 
+# 토큰이 일치할 때만 삭제 (TTL 만료 후 다른 워커가 잡은 락을 지우지 않도록)
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
 
 class RedisCacheClient(CacheClient):
     """Redis 비동기 캐시 클라이언트."""
@@ -26,6 +35,15 @@ class RedisCacheClient(CacheClient):
             logger.warning(f"[Cache] GET 실패 key={key}: {e}")
             return None
 
+    async def mget(self, keys: List[str]) -> List[Optional[str]]:
+        if not keys:
+            return []
+        try:
+            return await self._redis.mget(keys)
+        except Exception as e:
+            logger.warning(f"[Cache] MGET 실패 keys={len(keys)}: {e}")
+            return [None] * len(keys)
+
     async def set(self, key: str, value: str, ttl: int = 3600):
         try:
             await self._redis.set(key, value, ex=ttl)
@@ -45,9 +63,48 @@ class RedisCacheClient(CacheClient):
         except Exception as e:
             logger.warning(f"[Cache] DELETE_PATTERN 실패 pattern={pattern}: {e}")
 
+    async def incr(self, key: str) -> int:
+        try:
+            return await self._redis.incr(key)
+        except Exception as e:
+            logger.warning(f"[Cache] INCR 실패 key={key}: {e}")
+            return 0
+
     async def ping(self) -> bool:
         return await self._redis.ping()
 
+    async def acquire_lock(self, key: str, ttl: int) -> Optional[str]:
+        """SET NX EX 기반 락. Redis 장애 시에는 락 없이 진행하도록 토큰을 반환합니다 (fail-open)."""
+        token = uuid.uuid4().hex
+        try:
+            return token if await self._redis.set(key, token, nx=True, ex=ttl) else None
+        except Exception as e:
+            logger.warning(f"[Cache] LOCK 실패 key={key}: {e}")
+            return token
+
+    async def release_lock(self, key: str, token: str):
+        try:
+            await self._redis.eval(_RELEASE_LOCK_SCRIPT, 1, key, token)
+        except Exception as e:
+            logger.warning(f"[Cache] UNLOCK 실패 key={key}: {e}")
+
+    async def publish(self, channel: str, message: str):
+        try:
+            await self._redis.publish(channel, message)
+        except Exception as e:
+            logger.warning(f"[Cache] PUBLISH 실패 channel={channel}: {e}")
+
+    async def listen(self, channel: str) -> AsyncIterator[str]:
+        """채널 메시지를 순서대로 반환합니다. 연결이 끊기면 예외가 전파됩니다."""
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(channel)
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    yield message["data"]
+        finally:
+            await pubsub.aclose()
+
     async def close(self):
         await self._redis.aclose()
 
@@ -58,11 +115,17 @@ class NullCacheClient(CacheClient):
     async def get(self, key: str) -> Optional[str]:
         return None
 
+    async def mget(self, keys: List[str]) -> List[Optional[str]]:
+        return [None] * len(keys)
+
     async def set(self, key: str, value: str, ttl: int = 3600):
         pass
 
     async def delete_pattern(self, pattern: str):
         pass
 
+    async def incr(self, key: str) -> int:
+        return 0
+
     async def ping(self) -> bool:
         return True
@@ -0,0 +1,78 @@
+import json
+from typing import Any, Dict, List, Optional
+
+from app.core.interface.job_store import JobStore
+
+_JOB_KEY = "rag:job:{job_id}"
+_PAYLOAD_KEY = "rag:job:{job_id}:payload"
+_OWNER_KEY = "rag:job:{job_id}:owner"  # 실행권 + 하트비트 (TTL 만료 = 워커 중단)
+_ACTIVE_SET = "rag:jobs:active"         # queued/running 잡 ID 집합
+_FINISHED_TTL = 7 * 24 * 3600           # 완료 잡 보관 기간 (7일)
+
+
+class RedisJobStore(JobStore):
+    """Redis 기반 수집 잡 저장소. REDIS_HOST 설정 시 PgJobStore 대신 사용합니다."""
+
+    def __init__(self, host: str, port: int = 6379, db: int = 0, password: Optional[str] = None):
+        import redis.asyncio as aioredis
+        self._redis = aioredis.Redis(
+            host=host,
+            port=port,
+            db=db,
+            password=password or None,
+            decode_responses=True,
+        )
+        self._stale_seconds = 300
+
+    async def create(self, job: Dict[str, Any], payload: List[Dict[str, Any]]):
+        job_id = job["job_id"]
+        pipe = self._redis.pipeline()
+        pipe.set(_JOB_KEY.format(job_id=job_id), json.dumps(job, ensure_ascii=False))
+        pipe.set(_PAYLOAD_KEY.format(job_id=job_id), json.dumps(payload, ensure_ascii=False))
+        pipe.sadd(_ACTIVE_SET, job_id)
+        await pipe.execute()
+
+    async def save(self, job: Dict[str, Any]):
+        job_id = job["job_id"]
+        pipe = self._redis.pipeline()
+        pipe.set(_JOB_KEY.format(job_id=job_id), json.dumps(job, ensure_ascii=False))
+        if job["status"] in ("queued", "running"):
+            # 재개(resume)된 잡: 활성 집합에 재등록하고 완료 시 걸린 보관 TTL 해제
+            pipe.sadd(_ACTIVE_SET, job_id)
+            pipe.persist(_JOB_KEY.format(job_id=job_id))
+            pipe.persist(_PAYLOAD_KEY.format(job_id=job_id))
+            # 하트비트: 실행권 TTL 연장
+            pipe.expire(_OWNER_KEY.format(job_id=job_id), self._stale_seconds)
+        else:
+            pipe.srem(_ACTIVE_SET, job_id)
+            pipe.delete(_OWNER_KEY.format(job_id=job_id))
+            pipe.expire(_JOB_KEY.format(job_id=job_id), _FINISHED_TTL)
+            pipe.expire(_PAYLOAD_KEY.format(job_id=job_id), _FINISHED_TTL)
+        await pipe.execute()
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raw = await self._redis.get(_JOB_KEY.format(job_id=job_id))
+        return json.loads(raw) if raw else None
+
+    async def load_payload(self, job_id: str) -> List[Dict[str, Any]]:
+        raw = await self._redis.get(_PAYLOAD_KEY.format(job_id=job_id))
+        return json.loads(raw) if raw else []
+
+    async def claim(self, job_id: str, worker_id: str, stale_seconds: int) -> bool:
+        self._stale_seconds = stale_seconds
+        if not await self._redis.sismember(_ACTIVE_SET, job_id):
+            return False
+        # SET NX EX: 실행권이 없거나 하트비트가 만료된 경우에만 획득
+        return bool(await self._redis.set(_OWNER_KEY.format(job_id=job_id), worker_id,
+                                          nx=True, ex=stale_seconds))
+
+    async def list_recoverable(self, stale_seconds: int) -> List[str]:
+        job_ids = await self._redis.smembers(_ACTIVE_SET)
+        recoverable = []
+        for job_id in job_ids:
+            if not await self._redis.exists(_OWNER_KEY.format(job_id=job_id)):
+                recoverable.append(job_id)
+        return recoverable
+
+    async def close(self):
+        await self._redis.aclose()
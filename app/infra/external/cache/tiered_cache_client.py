@@ -0,0 +1,174 @@
+import asyncio
+import fnmatch
+import glob
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from app.core.interface.cache_client import CacheClient
+from app.infra.monitoring.metrics import cache_tier_requests
+
+logger = logging.getLogger(__name__)
+
+_INVALIDATE_CHANNEL = "rag:cache:invalidate"
+
+
+class _L1Tier:
+    """항목 수 + 바이트 예산 + TTL을 가진 LRU (이벤트 루프 단일 스레드에서만 사용)."""
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._bytes = 0
+
+    @staticmethod
+    def _size(key: str, value: str) -> int:
+        return len(key) + len(value)  # 문자 수 기준 근사치
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: str, ttl: int):
+        size = self._size(key, value)
+        if size > self.max_bytes:
+            return  # 예산보다 큰 값은 L1에 두지 않음
+        self._remove(key)
+        self._data[key] = (value, time.monotonic() + min(ttl, self.ttl))
+        self._bytes += size
+        while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._data))
+            self._remove(oldest)
+
+    def purge(self, pattern: str) -> int:
+        keys = [k for k in self._data if fnmatch.fnmatchcase(k, pattern)]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def _remove(self, key: str):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._bytes -= self._size(key, entry[0])
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class TieredCacheClient(CacheClient):
+    """프로세스 내 L1(LRU) + Redis L2 2단 캐시.
+    hot 키는 Redis 왕복 없이 L1에서 반환하고, delete_pattern은 Redis Pub/Sub으로 전파되어
+    모든 워커의 L1에서 함께 삭제됩니다. L1 TTL은 짧게 유지하여 전파 누락 시에도 오래된 값이 남지 않게 합니다."""
+
+    def __init__(self, inner, max_entries: int = None, max_bytes: int = None, ttl: int = None):
+        self.inner = inner
+        self._l1 = _L1Tier(
+            max_entries or int(os.getenv("L1_CACHE_MAX_ENTRIES", "2048")),
+            max_bytes or int(os.getenv("L1_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+            ttl or int(os.getenv("L1_CACHE_TTL", "60")),
+        )
+        self._instance_id = uuid.uuid4().hex
+        self._listener: Optional[asyncio.Task] = None
+
+    async def get(self, key: str) -> Optional[str]:
+        value = self._l1.get(key)
+        if value is not None:
+            cache_tier_requests.labels(tier="l1", result="hit").inc()
+            return value
+        cache_tier_requests.labels(tier="l1", result="miss").inc()
+
+        value = await self.inner.get(key)
+        cache_tier_requests.labels(tier="l2", result="hit" if value is not None else "miss").inc()
+        if value is not None:
+            self._l1.put(key, value, self._l1.ttl)
+        return value
+
+    async def mget(self, keys: List[str]) -> List[Optional[str]]:
+        """L1 미스 키만 모아 Redis MGET 1회로 조회합니다."""
+        values = [self._l1.get(key) for key in keys]
+        missing = [i for i, value in enumerate(values) if value is None]
+        l1_hits = len(keys) - len(missing)
+        if l1_hits:
+            cache_tier_requests.labels(tier="l1", result="hit").inc(l1_hits)
+        if not missing:
+            return values
+        cache_tier_requests.labels(tier="l1", result="miss").inc(len(missing))
+
+        fetched = await self.inner.mget([keys[i] for i in missing])
+        l2_hits = 0
+        for i, value in zip(missing, fetched):
+            if value is not None:
+                l2_hits += 1
+                values[i] = value
+                self._l1.put(keys[i], value, self._l1.ttl)
+        if l2_hits:
+            cache_tier_requests.labels(tier="l2", result="hit").inc(l2_hits)
+        if len(missing) - l2_hits:
+            cache_tier_requests.labels(tier="l2", result="miss").inc(len(missing) - l2_hits)
+        return values
+
+    async def set(self, key: str, value: str, ttl: int = 3600):
+        self._l1.put(key, value, ttl)
+        await self.inner.set(key, value, ttl)
+
+    async def delete_pattern(self, pattern: str):
+        self._l1.purge(pattern)
+        await self.inner.delete_pattern(pattern)
+        await self.inner.publish(_INVALIDATE_CHANNEL, f"{self._instance_id}|{pattern}")
+
+    async def incr(self, key: str) -> int:
+        """세대 카운터 증가 후 다른 워커 L1의 이전 값도 즉시 무효화합니다."""
+        value = await self.inner.incr(key)
+        self._l1.put(key, str(value), self._l1.ttl)
+        await self.inner.publish(_INVALIDATE_CHANNEL, f"{self._instance_id}|{glob.escape(key)}")
+        return value
+
+    async def ping(self) -> bool:
+        return await self.inner.ping()
+
+    async def acquire_lock(self, key: str, ttl: int) -> Optional[str]:
+        return await self.inner.acquire_lock(key, ttl)
+
+    async def release_lock(self, key: str, token: str):
+        await self.inner.release_lock(key, token)
+
+    async def start(self):
+        """다른 워커의 무효화 메시지 구독을 시작합니다."""
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+
+    def handle_invalidation(self, message: str):
+        sender, _, pattern = message.partition("|")
+        if sender != self._instance_id and pattern:
+            self._l1.purge(pattern)
+
+    async def _listen(self):
+        while True:
+            try:
+                async for message in self.inner.listen(_INVALIDATE_CHANNEL):
+                    self.handle_invalidation(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 구독이 끊긴 동안의 무효화는 L1 TTL로 만료됨
+                logger.warning(f"[Cache] L1 무효화 구독 재연결: {e}")
+                self._l1.purge("*")
+                await asyncio.sleep(1)
@@ -0,0 +1,190 @@
+import asyncio
+import hashlib
+import struct
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import structlog
+
+from app.infra.monitoring.metrics import embedding_cache_hits, embedding_cache_misses
+
+logger = structlog.get_logger()
+
+_DOCUMENT_TASK = "document"
+_QUERY_TASK = "query"
+QUERY_TASK_TYPE = "RETRIEVAL_QUERY"  # Gemini embed_query가 사용하는 task_type
+
+
+def encode_float16(vector: List[float]) -> bytes:
+    """임베딩 벡터를 little-endian float16 바이트로 압축합니다 (3072차원 → 6KB)."""
+    return struct.pack(f"<{len(vector)}e", *vector)
+
+
+def decode_float16(data: bytes) -> List[float]:
+    return list(struct.unpack(f"<{len(data) // 2}e", data))
+
+
+class _LruTier:
+    """스레드 안전 in-process LRU (임베딩은 asyncio.to_thread 워커 스레드에서 호출됨)."""
+
+    def __init__(self, max_entries: int):
+        self._max = max_entries
+        self._data: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                value = self._data.get(key)
+                if value is not None:
+                    self._data.move_to_end(key)
+                    found[key] = value
+        return found
+
+    def put_many(self, items: Dict[str, bytes]):
+        with self._lock:
+            for key, value in items.items():
+                self._data[key] = value
+                self._data.move_to_end(key)
+            while len(self._data) > self._max:
+                self._data.popitem(last=False)
+
+
+class RedisEmbeddingStore:
+    """Redis 공유 계층 — 바이너리 값을 그대로 저장하기 위해 decode_responses=False 동기 클라이언트 사용."""
+
+    _KEY = "rag:emb:{key}"
+
+    def __init__(self, host: str, port: int = 6379, db: int = 0, password: Optional[str] = None,
+                 ttl: int = 30 * 24 * 3600):
+        import redis
+        self._redis = redis.Redis(host=host, port=port, db=db, password=password or None)
+        self._ttl = ttl
+
+    def get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        values = self._redis.mget([self._KEY.format(key=k) for k in keys])
+        return {k: v for k, v in zip(keys, values) if v is not None}
+
+    def put_many(self, items: Dict[str, bytes]):
+        pipe = self._redis.pipeline(transaction=False)
+        for key, value in items.items():
+            pipe.set(self._KEY.format(key=key), value, ex=self._ttl)
+        pipe.execute()
+
+
+class PgEmbeddingStore:
+    """Postgres 공유 계층 (rag_embedding_cache 테이블, float16 BYTEA)."""
+
+    def __init__(self):
+        from app.infra.database import PGVectorManager
+        self.connection_manager = PGVectorManager()
+        with self.connection_manager.get_cursor() as cursor:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS rag_embedding_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    vector BYTEA NOT NULL,
+                    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                );
+            """)
+
+    def get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        with self.connection_manager.get_cursor() as cursor:
+            cursor.execute("SELECT cache_key, vector FROM rag_embedding_cache WHERE cache_key = ANY(%s)",
+                           (list(keys),))
+            return {row[0]: bytes(row[1]) for row in cursor.fetchall()}
+
+    def put_many(self, items: Dict[str, bytes]):
+        keys = list(items.keys())
+        with self.connection_manager.get_cursor() as cursor:
+            cursor.execute(
+                """INSERT INTO rag_embedding_cache (cache_key, vector)
+                   SELECT * FROM unnest(%s::text[], %s::bytea[])
+                   ON CONFLICT (cache_key) DO NOTHING""",
+                (keys, [items[k] for k in keys])
+            )
+
+
+class CachedEmbeddings:
+    """LangChain Embeddings 호환 래퍼 — 모델명 + 작업 유형 + 텍스트 해시 키로 임베딩을 캐싱합니다.
+    L1: 프로세스 내 LRU / L2: Redis 또는 Postgres (플릿 전체 공유).
+    embed_query와 embed_documents는 Gemini task_type이 달라 벡터가 다르므로 키를 분리합니다."""
+
+    def __init__(self, inner, model_name: str, store=None, l1_size: int = 2048):
+        self.inner = inner
+        self.model_name = model_name
+        self.store = store
+        self._l1 = _LruTier(l1_size)
+
+    def _key(self, task: str, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\x00{task}\x00{text}".encode("utf-8")).hexdigest()
+
+    def _lookup(self, keys: List[str]) -> Dict[str, bytes]:
+        found = self._l1.get_many(keys)
+        if found:
+            embedding_cache_hits.labels(tier="l1").inc(len(found))
+        missing = [k for k in keys if k not in found]
+        if missing and self.store is not None:
+            try:
+                shared = self.store.get_many(missing)
+            except Exception as e:
+                logger.warning("embedding_cache_l2_get_failed", error=str(e)[:100])
+                shared = {}
+            if shared:
+                embedding_cache_hits.labels(tier="l2").inc(len(shared))
+                self._l1.put_many(shared)
+                found.update(shared)
+        return found
+
+    def _store(self, items: Dict[str, bytes]):
+        self._l1.put_many(items)
+        if self.store is not None:
+            try:
+                self.store.put_many(items)
+            except Exception as e:
+                logger.warning("embedding_cache_l2_put_failed", error=str(e)[:100])
+
+    def _split(self, task: str, texts: List[str]):
+        keys = [self._key(task, t) for t in texts]
+        found = self._lookup(list(dict.fromkeys(keys)))
+        # 캐시에 없는 텍스트만 중복 제거하여 API 호출
+        miss_texts = list(dict.fromkeys(t for t, k in zip(texts, keys) if k not in found))
+        embedding_cache_misses.inc(len(miss_texts))
+        return keys, found, miss_texts
+
+    def _merge(self, task: str, keys: List[str], found: Dict[str, bytes],
+               miss_texts: List[str], miss_vectors: List[List[float]]) -> List[List[float]]:
+        fresh = {self._key(task, t): encode_float16(v) for t, v in zip(miss_texts, miss_vectors)}
+        if fresh:
+            self._store(fresh)
+        found.update(fresh)
+        return [decode_float16(found[k]) for k in keys]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, found, miss_texts = self._split(_DOCUMENT_TASK, texts)
+        vectors = self.inner.embed_documents(miss_texts) if miss_texts else []
+        return self._merge(_DOCUMENT_TASK, keys, found, miss_texts, vectors)
+
+    def embed_query(self, text: str) -> List[float]:
+        keys, found, miss_texts = self._split(_QUERY_TASK, [text])
+        vectors = [self.inner.embed_query(text)] if miss_texts else []
+        return self._merge(_QUERY_TASK, keys, found, miss_texts, vectors)[0]
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """검색 쿼리 여러 건을 embed_documents 1회로 임베딩합니다.
+        task_type을 쿼리용으로 지정하므로 embed_query와 같은 벡터·같은 캐시 키를 사용합니다."""
+        keys, found, miss_texts = self._split(_QUERY_TASK, texts)
+        vectors = self.inner.embed_documents(miss_texts, task_type=QUERY_TASK_TYPE) if miss_texts else []
+        return self._merge(_QUERY_TASK, keys, found, miss_texts, vectors)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, found, miss_texts = await asyncio.to_thread(self._split, _DOCUMENT_TASK, texts)
+        vectors = await self.inner.aembed_documents(miss_texts) if miss_texts else []
+        return await asyncio.to_thread(self._merge, _DOCUMENT_TASK, keys, found, miss_texts, vectors)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        keys, found, miss_texts = await asyncio.to_thread(self._split, _QUERY_TASK, [text])
+        vectors = [await self.inner.aembed_query(text)] if miss_texts else []
+        merged = await asyncio.to_thread(self._merge, _QUERY_TASK, keys, found, miss_texts, vectors)
+        return merged[0]
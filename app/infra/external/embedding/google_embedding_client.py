@@ -1,9 +1,18 @@
 import os
+import structlog
 from dotenv import load_dotenv, find_dotenv
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 
+from app.infra.external.embedding.cached_embeddings import (
+    CachedEmbeddings, RedisEmbeddingStore, PgEmbeddingStore, QUERY_TASK_TYPE,
+)
+
 load_dotenv(find_dotenv())
 
+logger = structlog.get_logger()
+
+_MODEL_NAME = "models/gemini-embedding-001"
+
 
 class GoogleEmbeddingClient:
 
@@ -18,11 +27,41 @@ class GoogleEmbeddingClient:
         if not google_api_key:
             raise ValueError("GOOGLE API KEY가 없습니다.")
 
-        GoogleEmbeddingClient._embeddings = GoogleGenerativeAIEmbeddings(
+        embeddings = GoogleGenerativeAIEmbeddings(
             google_api_key=google_api_key,
-            model="models/gemini-embedding-001"
+            model=_MODEL_NAME
         )
+        if os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true":
+            # 모델명+텍스트 해시 키 임베딩 캐시 (L1 LRU + L2 Redis/Postgres)
+            embeddings = CachedEmbeddings(
+                embeddings, _MODEL_NAME, self._build_cache_store(),
+                l1_size=int(os.getenv("EMBEDDING_CACHE_L1_SIZE", "2048")),
+            )
+        GoogleEmbeddingClient._embeddings = embeddings
+
+    def _build_cache_store(self):
+        """공유 캐시 계층: REDIS_HOST 설정 시 Redis, 아니면 Postgres. 초기화 실패 시 L1만 사용."""
+        try:
+            redis_host = os.getenv("REDIS_HOST")
+            if redis_host:
+                return RedisEmbeddingStore(
+                    host=redis_host,
+                    port=int(os.getenv("REDIS_PORT", "6379")),
+                    db=int(os.getenv("REDIS_DB", "0")),
+                    password=os.getenv("REDIS_PASSWORD"),
+                )
+            return PgEmbeddingStore()
+        except Exception as e:
+            logger.warning("embedding_cache_store_unavailable", error=str(e)[:100])
+            return None
 
     @property
     def embeddings(self):
         return GoogleEmbeddingClient._embeddings
+
+    def embed_queries(self, texts: list) -> list:
+        """검색 쿼리 배치 임베딩 (embed_query와 동일한 RETRIEVAL_QUERY 벡터, API 호출 1회)."""
+        embeddings = GoogleEmbeddingClient._embeddings
+        if isinstance(embeddings, CachedEmbeddings):
+            return embeddings.embed_queries(texts)
+        return embeddings.embed_documents(texts, task_type=QUERY_TASK_TYPE)
@@ -0,0 +1,75 @@
+import asyncio
+import os
+import random
+
+import structlog
+
+from app.core.interface.llm_client import LlmClient
+from app.infra.external.llm.concurrency_limiter import AdaptiveConcurrencyLimiter
+from app.infra.monitoring.metrics import llm_throttled
+
+logger = structlog.get_logger()
+
+_THROTTLE_MARKERS = ("429", "resource exhausted", "resourceexhausted", "rate limit", "ratelimit", "quota")
+
+# 스로틀링 항목 재시도 설정 (full jitter 지수 백오프)
+_MAX_RETRIES = int(os.getenv("LLM_THROTTLE_MAX_RETRIES", "4"))
+_BACKOFF_BASE = float(os.getenv("LLM_THROTTLE_BACKOFF_BASE", "1.0"))
+_BACKOFF_MAX = 30.0
+
+# 프로세스 전역 공유 제한기 — 모든 LLM 호출(수집/분석)이 같은 한도를 나눠 사용
+_shared_limiter = None
+
+
+def get_shared_limiter() -> AdaptiveConcurrencyLimiter:
+    global _shared_limiter
+    if _shared_limiter is None:
+        _shared_limiter = AdaptiveConcurrencyLimiter(
+            initial=int(os.getenv("LLM_CONCURRENCY_INITIAL", "8")),
+            min_limit=int(os.getenv("LLM_CONCURRENCY_MIN", "1")),
+            max_limit=int(os.getenv("LLM_CONCURRENCY_MAX", "64")),
+            latency_target=float(os.getenv("LLM_LATENCY_TARGET_SECONDS", "30")),
+        )
+    return _shared_limiter
+
+
+def _is_throttle_error(e: Exception) -> bool:
+    text = f"{type(e).__name__} {e}".lower()
+    return any(marker in text for marker in _THROTTLE_MARKERS)
+
+
+class AdaptiveConcurrencyLlmClient(LlmClient):
+    """LlmClient 데코레이터 — async_llm_request를 프로세스 전역 AIMD 동시성 제한기로 감쌉니다.
+    스로틀링(429) 응답은 제한기에 보고하여 동시 실행 수를 줄이고, 해당 항목만 지터 백오프 후 재시도합니다."""
+
+    def __init__(self, inner: LlmClient, limiter: AdaptiveConcurrencyLimiter = None):
+        self.inner = inner
+        self.limiter = limiter or get_shared_limiter()
+
+    @property
+    def chat_llm(self):
+        return self.inner.chat_llm
+
+    def llm_request(self, prompt) -> str:
+        return self.inner.llm_request(prompt)
+
+    async def async_llm_request(self, prompt) -> str:
+        attempt = 0
+        while True:
+            async with self.limiter.slot() as slot:
+                try:
+                    return await self.inner.async_llm_request(prompt)
+                except Exception as e:
+                    if not _is_throttle_error(e) or attempt >= _MAX_RETRIES:
+                        if _is_throttle_error(e):
+                            slot.throttled()
+                        else:
+                            slot.failed()
+                        raise
+                    slot.throttled()
+                    llm_throttled.inc()
+                    logger.warning("llm_throttled", attempt=attempt + 1,
+                                   limit=self.limiter.limit, error=str(e)[:100])
+            # 슬롯 반납 후 대기하여 다른 요청이 한도를 사용할 수 있도록 함
+            attempt += 1
+            await asyncio.sleep(random.uniform(0, min(_BACKOFF_MAX, _BACKOFF_BASE * 2 ** attempt)))
@@ -0,0 +1,100 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+from app.infra.monitoring.metrics import (
+    llm_concurrency_limit, llm_inflight, llm_queue_depth,
+)
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD(Additive Increase / Multiplicative Decrease) 동시 실행 제한기.
+    - 성공 + 지연 목표 이내: limit += 1/limit (limit개 성공마다 +1)
+    - 스로틀링(429 등): limit × throttle_factor
+    - 지연 목표 초과: limit × latency_factor (완만한 감소)
+    감소 이후 시작된 요청의 신호만 반영하여, 같은 혼잡 구간에서 중복 감소를 방지합니다.
+    """
+
+    def __init__(self, initial: int, min_limit: int, max_limit: int, latency_target: float,
+                 throttle_factor: float = 0.5, latency_factor: float = 0.9):
+        self._limit = float(initial)
+        self._min = min_limit
+        self._max = max_limit
+        self._latency_target = latency_target
+        self._throttle_factor = throttle_factor
+        self._latency_factor = latency_factor
+        self._inflight = 0
+        self._waiting = 0
+        self._last_decrease = 0.0
+        self._cond = asyncio.Condition()
+        self._publish()
+
+    @property
+    def limit(self) -> int:
+        return max(self._min, int(self._limit))
+
+    @property
+    def inflight(self) -> int:
+        return self._inflight
+
+    @property
+    def queue_depth(self) -> int:
+        return self._waiting
+
+    @asynccontextmanager
+    async def slot(self):
+        """실행 슬롯 1개를 획득합니다. 블록 안에서 slot.throttled()로 스로틀링을 보고할 수 있습니다."""
+        async with self._cond:
+            self._waiting += 1
+            self._publish()
+            try:
+                await self._cond.wait_for(lambda: self._inflight < self.limit)
+            finally:
+                self._waiting -= 1
+            self._inflight += 1
+            self._publish()
+
+        slot = _Slot(time.monotonic())
+        try:
+            yield slot
+        finally:
+            async with self._cond:
+                self._inflight -= 1
+                self._on_complete(slot, succeeded=slot.outcome is None)
+                self._publish()
+                self._cond.notify_all()
+
+    def _on_complete(self, slot: "_Slot", succeeded: bool):
+        latency = time.monotonic() - slot.started
+        if slot.outcome == "throttled":
+            self._decrease(slot.started, self._throttle_factor)
+        elif succeeded and latency > self._latency_target:
+            self._decrease(slot.started, self._latency_factor)
+        elif succeeded:
+            self._limit = min(self._max, self._limit + 1.0 / max(self._limit, 1.0))
+
+    def _decrease(self, started: float, factor: float):
+        # 직전 감소 이전에 시작된 요청은 이미 반영된 혼잡 신호로 보고 무시
+        if started < self._last_decrease:
+            return
+        self._limit = max(float(self._min), self._limit * factor)
+        self._last_decrease = time.monotonic()
+
+    def _publish(self):
+        llm_concurrency_limit.set(self.limit)
+        llm_inflight.set(self._inflight)
+        llm_queue_depth.set(self._waiting)
+
+
+class _Slot:
+    __slots__ = ("started", "outcome")
+
+    def __init__(self, started: float):
+        self.started = started
+        self.outcome = None  # None(성공) | "throttled" | "error"
+
+    def throttled(self):
+        self.outcome = "throttled"
+
+    def failed(self):
+        self.outcome = "error"
@@ -1,4 +1,4 @@
-from prometheus_client import Counter, Histogram
+from prometheus_client import Counter, Gauge, Histogram
 
 cache_hits = Counter(
     "rag_cache_hits_total",
@@ -28,3 +28,115 @@ search_latency = Histogram(
     ["search_mode"],
     buckets=[0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0],
 )
+
+llm_concurrency_limit = Gauge(
+    "rag_llm_concurrency_limit",
+    "Current adaptive (AIMD) LLM concurrency limit",
+)
+
+llm_inflight = Gauge(
+    "rag_llm_inflight_requests",
+    "LLM requests currently in flight",
+)
+
+llm_queue_depth = Gauge(
+    "rag_llm_queue_depth",
+    "LLM requests waiting for a concurrency slot",
+)
+
+llm_throttled = Counter(
+    "rag_llm_throttled_total",
+    "LLM calls throttled by the provider (429) and retried",
+)
+
+analysis_cache_hits = Counter(
+    "rag_analysis_cache_hits_total",
+    "Vision analysis cache hits",
+    ["tier"],
+)
+
+analysis_cache_misses = Counter(
+    "rag_analysis_cache_misses_total",
+    "Vision analysis cache misses (LLM called)",
+)
+
+embedding_cache_hits = Counter(
+    "rag_embedding_cache_hits_total",
+    "Text embedding cache hits",
+    ["tier"],
+)
+
+embedding_cache_misses = Counter(
+    "rag_embedding_cache_misses_total",
+    "Text embedding cache misses (embedding API called)",
+)
+
+image_preprocess_bytes_saved = Counter(
+    "rag_image_preprocess_bytes_saved_total",
+    "Bytes removed from uploaded images by preprocessing before vision analysis",
+)
+
+image_preprocess_latency = Histogram(
+    "rag_image_preprocess_seconds",
+    "Per-image preprocessing time in seconds",
+    buckets=[0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0],
+)
+
+image_analysis_latency = Histogram(
+    "rag_image_analysis_seconds",
+    "Per-image vision analysis (LLM) latency in seconds",
+    ["preprocessed"],
+    buckets=[1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0],
+)
+
+analysis_direct_items = Counter(
+    "rag_analysis_direct_items_total",
+    "Pre-built screen analyses ingested without LLM calls",
+)
+
+vision_pack_fallbacks = Counter(
+    "rag_vision_pack_fallbacks_total",
+    "Screens from packed vision requests re-analyzed with single-image calls",
+)
+
+single_flight_coalesced = Counter(
+    "rag_single_flight_coalesced_total",
+    "Requests that joined an identical in-flight computation instead of running their own",
+    ["operation"],
+)
+
+cache_fill_lock = Counter(
+    "rag_cache_fill_lock_total",
+    "Cross-worker cache fill lock outcomes on cache miss",
+    ["outcome"],
+)
+
+cache_tier_requests = Counter(
+    "rag_cache_tier_requests_total",
+    "Cache lookups per tier (l1 in-process, l2 Redis) and result",
+    ["tier", "result"],
+)
+
+semantic_cache_requests = Counter(
+    "rag_semantic_cache_requests_total",
+    "Semantic query cache lookups after an exact-key miss",
+    ["result"],
+)
+
+semantic_cache_hit_samples = Counter(
+    "rag_semantic_cache_hit_samples_total",
+    "Sampled semantic cache hits re-checked against a fresh search (mismatch = likely false hit)",
+    ["outcome"],
+)
+
+search_accuracy_requests = Counter(
+    "rag_search_accuracy_requests_total",
+    "Search requests per resolved accuracy profile (fast | balanced | exact)",
+    ["profile"],
+)
+
+search_batch_size = Histogram(
+    "rag_search_batch_size",
+    "Number of queries per /search/batch request",
+    buckets=[1, 5, 10, 25, 50, 100],
+)
@@ -1,8 +1,19 @@
+import os
 from typing import List, Dict, Any, Tuple
 import json
+
+import structlog
+
 from app.core.interface.rag_repository import RagRepository
 from app.infra.database import PGVectorManager
 
+logger = structlog.get_logger()
+
+# 배치 저장 모드: true면 save_documents 배치 전체를 단일 트랜잭션으로 일괄 저장
+_BULK_WRITE = os.getenv("AGE_BULK_WRITE", "true").lower() == "true"
+# UNWIND 파라미터/multi-row INSERT 1회당 최대 행 수 (파라미터 크기 제한)
+_BULK_CHUNK_SIZE = 200
+
 
 def _age_safe_label(collection_name: str) -> str:
     """AGE 노드 레이블용 안전한 이름 반환.
@@ -25,34 +36,40 @@ class AgeRepositoryImpl(RagRepository):
             cursor.execute("SELECT 1")
         return True
 
+    def _prepare_age(self, cursor):
+        """AGE 로드 및 search_path 설정. 트랜잭션(커서)마다 1회만 실행하면 됩니다."""
+        cursor.execute("LOAD 'age';")
+        cursor.execute("SET search_path = ag_catalog, '$user', public;")
+
+    def _run_cypher(self, cursor, query: str, cypher_params: dict = None) -> list:
+        """이미 AGE가 준비된 커서에서 Cypher 쿼리를 실행하고 결과를 파싱합니다."""
+        # Cypher 쿼리 실행 (파라미터가 있으면 AGE 파라미터 바인딩 사용)
+        if cypher_params:
+            params_json = json.dumps(cypher_params, ensure_ascii=False)
+            full_query = f"SELECT * FROM cypher('{self.graph_name}', $$ {query} $$, %s) as (result agtype);"
+            cursor.execute(full_query, (params_json,))
+        else:
+            full_query = f"SELECT * FROM cypher('{self.graph_name}', $$ {query} $$) as (result agtype);"
+            cursor.execute(full_query)
+
+        # agtype 결과를 Python dict/list로 변환하여 반환
+        # AGE는 ::vertex, ::edge 등의 타입 접미사를 붙이므로 제거 후 파싱
+        rows = cursor.fetchall()
+        result = []
+        for row in rows:
+            s = str(row[0])
+            if "::" in s:
+                s = s[:s.rfind("::")]
+            result.append(json.loads(s))
+        return result
+
     def _execute_cypher(self, query: str, cypher_params: dict = None):
         """Cypher 쿼리를 실행하는 도우미 함수.
         호출마다 커넥션 풀에서 커넥션을 체크아웃하고, 완료 후 자동 반납합니다.
         cypher_params: Cypher 쿼리 내 $param 자리를 채울 dict. JSON으로 인코딩되어 AGE에 전달됩니다."""
         with self.connection_manager.get_cursor() as cursor:
-            # AGE 로드 및 search_path 설정
-            cursor.execute("LOAD 'age';")
-            cursor.execute("SET search_path = ag_catalog, '$user', public;")
-
-            # Cypher 쿼리 실행 (파라미터가 있으면 AGE 파라미터 바인딩 사용)
-            if cypher_params:
-                params_json = json.dumps(cypher_params, ensure_ascii=False)
-                full_query = f"SELECT * FROM cypher('{self.graph_name}', $$ {query} $$, %s) as (result agtype);"
-                cursor.execute(full_query, (params_json,))
-            else:
-                full_query = f"SELECT * FROM cypher('{self.graph_name}', $$ {query} $$) as (result agtype);"
-                cursor.execute(full_query)
-
-            # agtype 결과를 Python dict/list로 변환하여 반환
-            # AGE는 ::vertex, ::edge 등의 타입 접미사를 붙이므로 제거 후 파싱
-            rows = cursor.fetchall()
-            result = []
-            for row in rows:
-                s = str(row[0])
-                if "::" in s:
-                    s = s[:s.rfind("::")]
-                result.append(json.loads(s))
-            return result
+            self._prepare_age(cursor)
+            return self._run_cypher(cursor, query, cypher_params)
 
     def save_documents(self, collection_name: str, documents: List[Dict[str, Any]]):
         """
@@ -60,8 +77,90 @@ class AgeRepositoryImpl(RagRepository):
         1. Apache AGE 그래프: Screen 노드와 Service 노드의 BELONGS_TO 관계
         2. pgvector 테이블: 코사인 유사도 검색을 위한 임베딩 저장
         구조: (Screen:collection_name)-[:BELONGS_TO]->(Service)
+        화면 식별 키(screen_key: service_name, screen_name, version) 기준 upsert — 재수집 시 중복 생성 없이 제자리 갱신.
         AGE 파라미터 바인딩($param)으로 따옴표/특수문자 안전 처리.
+        AGE_BULK_WRITE=true(기본)면 배치 전체를 단일 트랜잭션으로 일괄 저장합니다.
+        """
+        if not documents:
+            return
+        if _BULK_WRITE:
+            self._save_documents_bulk(collection_name, documents)
+        else:
+            self._save_documents_each(collection_name, documents)
+
+    def find_changed_documents(self, collection_name: str, documents: List[Dict[str, Any]]) -> List[int]:
+        keys = [PGVectorManager.screen_key(doc.get("metadata", {})) for doc in documents]
+        stored = self.connection_manager.get_content_hashes(collection_name, list(set(keys)))
+        return [
+            i for i, (doc, key) in enumerate(zip(documents, keys))
+            if stored.get(key) != PGVectorManager.content_hash(doc)
+        ]
+
+    def _save_documents_bulk(self, collection_name: str, documents: List[Dict[str, Any]]):
+        """
+        배치 전체를 하나의 트랜잭션으로 저장합니다.
+        - Service 노드: 중복 제거 후 UNWIND + MERGE
+        - Screen 노드: UNWIND + MERGE(screen_key) + SET + BELONGS_TO 관계 MERGE
+        - pgvector: multi-row INSERT ... ON CONFLICT 1회
+        LOAD 'age' / search_path 설정은 트랜잭션당 1회. 중간 실패 시 배치 전체 롤백.
         """
+        age_label = _age_safe_label(collection_name)
+
+        # 같은 화면이 배치에 여러 번 있으면 마지막 문서만 저장
+        latest = {}
+        for doc in documents:
+            latest[PGVectorManager.screen_key(doc.get("metadata", {}))] = doc
+        documents = list(latest.values())
+
+        screen_rows = []
+        services = {}
+        for screen_key, doc in latest.items():
+            metadata = doc.get("metadata", {})
+            service_name = metadata.get("service_name", "unknown")
+            version = metadata.get("version", "1.0.0")
+            services[(service_name, version)] = {"service_name": service_name, "version": version}
+            screen_rows.append({
+                "service_name": service_name,
+                "version": version,
+                "content": doc.get("page_content", ""),
+                "metadata_str": json.dumps(metadata, ensure_ascii=False),
+                "screen_name": metadata.get("screen_name", "unknown"),
+                "screen_key": screen_key,
+                "content_hash": PGVectorManager.content_hash(doc),
+            })
+
+        service_query = """
+        UNWIND $rows AS row
+        MERGE (s:Service {name: row.service_name, version: row.version})
+        RETURN id(s)
+        """
+        screen_query = f"""
+        UNWIND $rows AS row
+        MATCH (s:Service {{name: row.service_name, version: row.version}})
+        MERGE (n:`{age_label}` {{screen_key: row.screen_key}})
+        SET n.content = row.content, n.metadata = row.metadata_str,
+            n.screen_name = row.screen_name, n.content_hash = row.content_hash
+        MERGE (n)-[:BELONGS_TO]->(s)
+        RETURN id(n)
+        """
+
+        service_rows = list(services.values())
+        with self.connection_manager.get_cursor() as cursor:
+            self._prepare_age(cursor)
+            for i in range(0, len(service_rows), _BULK_CHUNK_SIZE):
+                self._run_cypher(cursor, service_query, {"rows": service_rows[i:i + _BULK_CHUNK_SIZE]})
+            for i in range(0, len(screen_rows), _BULK_CHUNK_SIZE):
+                self._run_cypher(cursor, screen_query, {"rows": screen_rows[i:i + _BULK_CHUNK_SIZE]})
+            for i in range(0, len(documents), _BULK_CHUNK_SIZE):
+                self.connection_manager.insert_embeddings(
+                    collection_name, documents[i:i + _BULK_CHUNK_SIZE], cursor=cursor
+                )
+
+        logger.info("save_documents_bulk", collection_name=collection_name,
+                    doc_count=len(documents), service_count=len(service_rows))
+
+    def _save_documents_each(self, collection_name: str, documents: List[Dict[str, Any]]):
+        """문서 단위로 개별 트랜잭션을 사용하는 기존 저장 방식 (AGE_BULK_WRITE=false)."""
         # AGE 레이블에는 콜론(:) 등 특수문자 불가 → _age_safe_label()로 치환
         age_label = _age_safe_label(collection_name)
 
@@ -69,6 +168,7 @@ class AgeRepositoryImpl(RagRepository):
             content = doc.get("page_content", "")
             embedding = doc.get("embedding", [])
             metadata = doc.get("metadata", {})
+            content_hash = PGVectorManager.content_hash(doc)
 
             service_name = metadata.get("service_name", "unknown")
             screen_name = metadata.get("screen_name", "unknown")
@@ -84,15 +184,14 @@ class AgeRepositoryImpl(RagRepository):
                 "version": version
             })
 
-            # 2. AGE: Screen 노드 CREATE + BELONGS_TO 관계 생성
+            # 2. AGE: Screen 노드 MERGE(screen_key) + 속성 갱신 + BELONGS_TO 관계
             # age_label은 콜론 제거된 안전한 레이블명, 백틱으로 감싸서 직접 삽입
             screen_query = f"""
             MATCH (s:Service {{name: $service_name, version: $version}})
-            CREATE (n:`{age_label}` {{
-                content: $content,
-                metadata: $metadata_str,
-                screen_name: $screen_name
-            }})-[:BELONGS_TO]->(s)
+            MERGE (n:`{age_label}` {{screen_key: $screen_key}})
+            SET n.content = $content, n.metadata = $metadata_str,
+                n.screen_name = $screen_name, n.content_hash = $content_hash
+            MERGE (n)-[:BELONGS_TO]->(s)
             RETURN n
             """
             self._execute_cypher(screen_query, {
@@ -100,7 +199,9 @@ class AgeRepositoryImpl(RagRepository):
                 "version": version,
                 "content": content,
                 "metadata_str": json.dumps(metadata, ensure_ascii=False),
-                "screen_name": screen_name
+                "screen_name": screen_name,
+                "screen_key": PGVectorManager.screen_key(metadata),
+                "content_hash": content_hash,
             })
 
             # 3. pgvector 테이블: 임베딩 저장 (검색 전용)
@@ -109,31 +210,68 @@ class AgeRepositoryImpl(RagRepository):
                 content=content,
                 metadata=metadata,
                 embedding=embedding,
-                image_embedding=doc.get("image_embedding")  # None이면 NULL 저장
+                image_embedding=doc.get("image_embedding"),  # None이면 NULL 저장
+                content_hash=content_hash,
             )
 
     def similarity_search(self, collection_name: str, query_embedding: List[float], k: int = 5,
                           filters: dict = None, search_mode: str = "vector", query_text: str = None,
-                          image_embedding: list = None) -> List[Tuple[Dict[str, Any], float]]:
+                          image_embedding: list = None, accuracy: str = None,
+                          oversample: int = None) -> List[Tuple[Dict[str, Any], float]]:
         """
         pgvector 코사인 유사도 검색 또는 하이브리드/비주얼 검색을 수행합니다.
         search_mode='hybrid' + query_text 전달 시 벡터+BM25 RRF 결합 결과를 반환합니다.
         search_mode='visual' + image_embedding 전달 시 CLIP 이미지 임베딩 검색을 수행합니다.
         """
         rows = self.connection_manager.search_similar(
-            collection_name, query_embedding, k, filters, search_mode, query_text, image_embedding
+            collection_name, query_embedding, k, filters, search_mode, query_text, image_embedding, accuracy,
+            oversample
         )
         return [
             ({"page_content": row["content"], "metadata": row["metadata"]}, row["score"])
             for row in rows
         ]
 
+    def similarity_search_batch(self, collection_name: str, query_embeddings: List[List[float]], k: int = 5,
+                                filters: dict = None, search_mode: str = "vector",
+                                query_texts: List[str] = None, accuracy: str = None,
+                                oversample: int = None) -> List[List[Tuple[Dict[str, Any], float]]]:
+        """
+        vector 모드는 전체 쿼리를 SQL 1회(LATERAL 조인)로 검색합니다.
+        그 외 모드는 배치 경로가 없어 쿼리별 검색으로 처리합니다 (/search/batch는 vector·visual만 허용).
+        """
+        if search_mode != "vector":
+            return super().similarity_search_batch(collection_name, query_embeddings, k, filters,
+                                                   search_mode, query_texts, accuracy, oversample)
+        grouped = self.connection_manager.batch_vector_search(collection_name, query_embeddings, k, filters,
+                                                              accuracy)
+        return [
+            [({"page_content": row["content"], "metadata": row["metadata"]}, row["score"]) for row in rows]
+            for rows in grouped
+        ]
+
     def collection_exists(self, collection_name: str) -> bool:
         """
         pgvector 테이블에 해당 컬렉션 데이터가 있는지 확인합니다.
         """
         return self.connection_manager.collection_exists_in_vector_table(collection_name)
 
+    def delete_collection(self, collection_name: str) -> List[str]:
+        """
+        컬렉션 레이블의 Screen 노드(관계 포함)와 pgvector 행을 한 트랜잭션에서 삭제합니다.
+        파티션 모드에서는 벡터 행 삭제가 파티션 DROP이므로 컬렉션 크기와 무관하게 즉시 끝납니다.
+        """
+        age_label = _age_safe_label(collection_name)
+        with self.connection_manager.get_cursor() as cursor:
+            self._prepare_age(cursor)
+            services = self._run_cypher(
+                cursor, f"MATCH (n:`{age_label}`)-[:BELONGS_TO]->(s:Service) RETURN DISTINCT s.name"
+            )
+            self._run_cypher(cursor, f"MATCH (n:`{age_label}`) DETACH DELETE n")
+            self.connection_manager.drop_collection(collection_name, cursor)
+        logger.info("collection_deleted", collection_name=collection_name, services=len(services))
+        return services
+
     def get_screens_by_service(self, service_name: str, version: str = None) -> list:
         """
         AGE 그래프에서 서비스에 속한 화면 노드 전체를 조회합니다.
@@ -0,0 +1,85 @@
+import asyncio
+import json
+from typing import Any, Dict, Optional
+
+from app.core.interface.analysis_cache import AnalysisCache
+from app.core.interface.cache_client import CacheClient
+from app.infra.database import PGVectorManager
+from app.infra.monitoring.metrics import analysis_cache_hits, analysis_cache_misses
+
+_REDIS_KEY = "rag:analysis:{cache_key}"  # cache_key가 프롬프트 버전으로 시작 → 버전 단위 패턴 삭제 가능
+_REDIS_TTL = 7 * 24 * 3600  # Redis 전면 캐시 TTL (원본은 Postgres에 영구 보관)
+
+
+class PgAnalysisCache(AnalysisCache):
+    """Postgres(rag_analysis_cache) 영구 저장 + Redis 전면 캐시(선택) 2단 분석 결과 캐시.
+    Redis 미설정 시 NullCacheClient가 주입되어 Postgres만 사용합니다."""
+
+    def __init__(self, cache_client: CacheClient):
+        self.cache_client = cache_client
+        self.connection_manager = PGVectorManager()
+        self._ensure_table()
+
+    def _ensure_table(self):
+        with self.connection_manager.get_cursor() as cursor:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS rag_analysis_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    image_sha256 TEXT NOT NULL,
+                    prompt_version TEXT NOT NULL,
+                    analysis JSONB NOT NULL,
+                    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                );
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS rag_analysis_cache_prompt_idx
+                ON rag_analysis_cache (prompt_version);
+            """)
+
+    async def get(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        cached = await self.cache_client.get(_REDIS_KEY.format(cache_key=cache_key))
+        if cached is not None:
+            analysis_cache_hits.labels(tier="redis").inc()
+            return json.loads(cached)
+
+        def _select():
+            with self.connection_manager.get_cursor() as cursor:
+                cursor.execute("SELECT analysis FROM rag_analysis_cache WHERE cache_key = %s", (cache_key,))
+                return cursor.fetchone()
+
+        row = await asyncio.to_thread(_select)
+        if row is None:
+            analysis_cache_misses.inc()
+            return None
+
+        analysis_cache_hits.labels(tier="postgres").inc()
+        analysis = row[0] if isinstance(row[0], dict) else json.loads(row[0])
+        # Redis 전면 캐시 채움
+        await self.cache_client.set(_REDIS_KEY.format(cache_key=cache_key),
+                                    json.dumps(analysis, ensure_ascii=False), _REDIS_TTL)
+        return analysis
+
+    async def set(self, cache_key: str, image_sha256: str, prompt_version: str, analysis: Dict[str, Any]):
+        payload = json.dumps(analysis, ensure_ascii=False)
+
+        def _upsert():
+            with self.connection_manager.get_cursor() as cursor:
+                cursor.execute(
+                    """INSERT INTO rag_analysis_cache (cache_key, image_sha256, prompt_version, analysis)
+                       VALUES (%s, %s, %s, %s::jsonb)
+                       ON CONFLICT (cache_key) DO UPDATE SET analysis = EXCLUDED.analysis, created_at = now()""",
+                    (cache_key, image_sha256, prompt_version, payload)
+                )
+
+        await asyncio.to_thread(_upsert)
+        await self.cache_client.set(_REDIS_KEY.format(cache_key=cache_key), payload, _REDIS_TTL)
+
+    async def purge_prompt_version(self, prompt_version: str) -> int:
+        def _delete():
+            with self.connection_manager.get_cursor() as cursor:
+                cursor.execute("DELETE FROM rag_analysis_cache WHERE prompt_version = %s", (prompt_version,))
+                return cursor.rowcount
+
+        deleted = await asyncio.to_thread(_delete)
+        await self.cache_client.delete_pattern(_REDIS_KEY.format(cache_key=f"{prompt_version}:*"))
+        return deleted
@@ -0,0 +1,102 @@
+import asyncio
+import json
+from typing import Any, Dict, List
+
+from app.core.interface.ingest_checkpoint import IngestCheckpoint
+from app.infra.database import PGVectorManager
+
+
+class PgIngestCheckpoint(IngestCheckpoint):
+    """PostgreSQL 기반 수집 항목 체크포인트 (rag_ingest_checkpoints 스테이징 테이블).
+    분석 결과는 JSONB, 임베딩은 REAL[]로 보관하며 저장 완료 시 임베딩 컬럼은 비웁니다."""
+
+    def __init__(self):
+        self.connection_manager = PGVectorManager()
+        self._ensure_table()
+
+    def _ensure_table(self):
+        with self.connection_manager.get_cursor() as cursor:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS rag_ingest_checkpoints (
+                    job_id TEXT NOT NULL,
+                    item_index INT NOT NULL,
+                    stage TEXT NOT NULL,
+                    analysis JSONB,
+                    embedding REAL[],
+                    image_embedding REAL[],
+                    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                    PRIMARY KEY (job_id, item_index)
+                );
+            """)
+
+    async def load(self, job_id: str) -> Dict[int, Dict[str, Any]]:
+        def _load():
+            with self.connection_manager.get_cursor() as cursor:
+                cursor.execute(
+                    """SELECT item_index, stage, analysis, embedding, image_embedding
+                       FROM rag_ingest_checkpoints WHERE job_id = %s""",
+                    (job_id,)
+                )
+                return {
+                    row[0]: {
+                        "stage": row[1],
+                        "analysis": row[2] if row[2] is None or isinstance(row[2], dict) else json.loads(row[2]),
+                        "embedding": row[3],
+                        "image_embedding": row[4],
+                    }
+                    for row in cursor.fetchall()
+                }
+        return await asyncio.to_thread(_load)
+
+    async def save_analyses(self, job_id: str, analyses: Dict[int, Dict[str, Any]]):
+        if not analyses:
+            return
+        indices = list(analyses.keys())
+
+        def _save():
+            with self.connection_manager.get_cursor() as cursor:
+                cursor.execute(
+                    """INSERT INTO rag_ingest_checkpoints (job_id, item_index, stage, analysis)
+                       SELECT %s, t.item_index, 'analyzed', t.analysis::jsonb
+                       FROM unnest(%s::int[], %s::text[]) AS t(item_index, analysis)
+                       ON CONFLICT (job_id, item_index) DO UPDATE
+                       SET stage = 'analyzed', analysis = EXCLUDED.analysis,
+                           embedding = NULL, image_embedding = NULL, updated_at = now()""",
+                    (job_id, indices, [json.dumps(analyses[i], ensure_ascii=False) for i in indices])
+                )
+        await asyncio.to_thread(_save)
+
+    async def save_embeddings(self, job_id: str, embeddings: Dict[int, Dict[str, Any]]):
+        if not embeddings:
+            return
+
+        def _save():
+            # 차원이 다르고 NULL이 섞인 벡터 목록은 unnest로 펼칠 수 없어 executemany(파이프라인) 사용
+            with self.connection_manager.get_cursor() as cursor:
+                cursor.executemany(
+                    """UPDATE rag_ingest_checkpoints
+                       SET stage = 'embedded', embedding = %s, image_embedding = %s, updated_at = now()
+                       WHERE job_id = %s AND item_index = %s""",
+                    [(e["embedding"], e.get("image_embedding"), job_id, i) for i, e in embeddings.items()]
+                )
+        await asyncio.to_thread(_save)
+
+    async def mark_stored(self, job_id: str, item_indices: List[int]):
+        if not item_indices:
+            return
+
+        def _mark():
+            with self.connection_manager.get_cursor() as cursor:
+                cursor.execute(
+                    """UPDATE rag_ingest_checkpoints
+                       SET stage = 'stored', embedding = NULL, image_embedding = NULL, updated_at = now()
+                       WHERE job_id = %s AND item_index = ANY(%s)""",
+                    (job_id, list(item_indices))
+                )
+        await asyncio.to_thread(_mark)
+
+    async def clear(self, job_id: str):
+        def _clear():
+            with self.connection_manager.get_cursor() as cursor:
+                cursor.execute("DELETE FROM rag_ingest_checkpoints WHERE job_id = %s", (job_id,))
+        await asyncio.to_thread(_clear)
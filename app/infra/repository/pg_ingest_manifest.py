@@ -0,0 +1,61 @@
+import asyncio
+from typing import Any, Dict, List
+
+from app.core.interface.ingest_manifest import IngestManifest
+from app.infra.database import PGVectorManager
+
+
+class PgIngestManifest(IngestManifest):
+    """PostgreSQL 기반 디렉토리 수집 이력 (rag_ingest_files 테이블)."""
+
+    def __init__(self):
+        self.connection_manager = PGVectorManager()
+        self._ensure_table()
+
+    def _ensure_table(self):
+        with self.connection_manager.get_cursor() as cursor:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS rag_ingest_files (
+                    collection_name TEXT NOT NULL,
+                    file_path TEXT NOT NULL,
+                    sha256 TEXT NOT NULL,
+                    mtime DOUBLE PRECISION NOT NULL,
+                    size BIGINT NOT NULL,
+                    meta_digest TEXT NOT NULL,
+                    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                    PRIMARY KEY (collection_name, file_path)
+                );
+            """)
+
+    async def load(self, collection_name: str) -> Dict[str, Dict[str, Any]]:
+        def _load():
+            with self.connection_manager.get_cursor() as cursor:
+                cursor.execute(
+                    """SELECT file_path, sha256, mtime, size, meta_digest
+                       FROM rag_ingest_files WHERE collection_name = %s""",
+                    (collection_name,)
+                )
+                return {
+                    row[0]: {"sha256": row[1], "mtime": row[2], "size": row[3], "meta_digest": row[4]}
+                    for row in cursor.fetchall()
+                }
+        return await asyncio.to_thread(_load)
+
+    async def record(self, collection_name: str, entries: List[Dict[str, Any]]):
+        if not entries:
+            return
+
+        def _record():
+            with self.connection_manager.get_cursor() as cursor:
+                cursor.execute(
+                    """INSERT INTO rag_ingest_files (collection_name, file_path, sha256, mtime, size, meta_digest)
+                       SELECT %s, * FROM unnest(%s::text[], %s::text[], %s::float8[], %s::bigint[], %s::text[])
+                       ON CONFLICT (collection_name, file_path) DO UPDATE
+                       SET sha256 = EXCLUDED.sha256, mtime = EXCLUDED.mtime, size = EXCLUDED.size,
+                           meta_digest = EXCLUDED.meta_digest, updated_at = now()""",
+                    (collection_name,
+                     [e["file_path"] for e in entries], [e["sha256"] for e in entries],
+                     [e["mtime"] for e in entries], [e["size"] for e in entries],
+                     [e["meta_digest"] for e in entries])
+                )
+        await asyncio.to_thread(_record)
@@ -0,0 +1,105 @@
+import asyncio
+import json
+from typing import Any, Dict, List, Optional
+
+from app.core.interface.job_store import JobStore
+from app.infra.database import PGVectorManager
+
+
+class PgJobStore(JobStore):
+    """PostgreSQL 기반 수집 잡 저장소 (rag_ingest_jobs 테이블).
+    동기 DB 호출은 asyncio.to_thread로 위임하여 이벤트 루프 블로킹을 방지합니다."""
+
+    def __init__(self):
+        self.connection_manager = PGVectorManager()
+        self._ensure_table()
+
+    def _ensure_table(self):
+        with self.connection_manager.get_cursor() as cursor:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS rag_ingest_jobs (
+                    job_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    job JSONB NOT NULL,
+                    payload JSONB,
+                    owner TEXT,
+                    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                );
+            """)
+            # 재개 대상 조회용 부분 인덱스 (완료된 잡은 인덱싱 제외)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS rag_ingest_jobs_active_idx
+                ON rag_ingest_jobs (updated_at)
+                WHERE status IN ('queued', 'running');
+            """)
+
+    async def create(self, job: Dict[str, Any], payload: List[Dict[str, Any]]):
+        def _create():
+            with self.connection_manager.get_cursor() as cursor:
+                cursor.execute(
+                    """INSERT INTO rag_ingest_jobs (job_id, status, job, payload)
+                       VALUES (%s, %s, %s::jsonb, %s::jsonb)""",
+                    (job["job_id"], job["status"], json.dumps(job, ensure_ascii=False),
+                     json.dumps(payload, ensure_ascii=False))
+                )
+        await asyncio.to_thread(_create)
+
+    async def save(self, job: Dict[str, Any]):
+        def _save():
+            with self.connection_manager.get_cursor() as cursor:
+                cursor.execute(
+                    """UPDATE rag_ingest_jobs
+                       SET status = %s, job = %s::jsonb, updated_at = now()
+                       WHERE job_id = %s""",
+                    (job["status"], json.dumps(job, ensure_ascii=False), job["job_id"])
+                )
+        await asyncio.to_thread(_save)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        def _get():
+            with self.connection_manager.get_cursor() as cursor:
+                cursor.execute("SELECT job FROM rag_ingest_jobs WHERE job_id = %s", (job_id,))
+                row = cursor.fetchone()
+            if row is None:
+                return None
+            return row[0] if isinstance(row[0], dict) else json.loads(row[0])
+        return await asyncio.to_thread(_get)
+
+    async def load_payload(self, job_id: str) -> List[Dict[str, Any]]:
+        def _load():
+            with self.connection_manager.get_cursor() as cursor:
+                cursor.execute("SELECT payload FROM rag_ingest_jobs WHERE job_id = %s", (job_id,))
+                row = cursor.fetchone()
+            if row is None or row[0] is None:
+                return []
+            return row[0] if isinstance(row[0], list) else json.loads(row[0])
+        return await asyncio.to_thread(_load)
+
+    async def claim(self, job_id: str, worker_id: str, stale_seconds: int) -> bool:
+        def _claim():
+            with self.connection_manager.get_cursor() as cursor:
+                cursor.execute(
+                    """UPDATE rag_ingest_jobs
+                       SET status = 'running', owner = %s, updated_at = now()
+                       WHERE job_id = %s
+                         AND (status = 'queued'
+                              OR (status = 'running' AND updated_at < now() - make_interval(secs => %s)))
+                       RETURNING job_id""",
+                    (worker_id, job_id, stale_seconds)
+                )
+                return cursor.fetchone() is not None
+        return await asyncio.to_thread(_claim)
+
+    async def list_recoverable(self, stale_seconds: int) -> List[str]:
+        def _list():
+            with self.connection_manager.get_cursor() as cursor:
+                cursor.execute(
+                    """SELECT job_id FROM rag_ingest_jobs
+                       WHERE status = 'queued'
+                          OR (status = 'running' AND updated_at < now() - make_interval(secs => %s))
+                       ORDER BY created_at""",
+                    (stale_seconds,)
+                )
+                return [row[0] for row in cursor.fetchall()]
+        return await asyncio.to_thread(_list)
@@ -26,8 +26,10 @@ logger = structlog.get_logger()
 async def lifespan(app: FastAPI):
     logger.info("application_start", message="의존성 주입 설정")
     setup_dependencies()
+    await start_background_workers()
     yield
     logger.info("application_stop", message="리소스 정리")
+    await stop_background_workers()
     cleanup_resources()
 
 
@@ -46,30 +48,95 @@ def setup_dependencies():
     from app.core.interface.rerank_client import RerankClient
     from app.core.interface.cache_client import CacheClient
     from app.infra.external.llm.google_client import GoogleChatClient
+    from app.infra.external.llm.adaptive_llm_client import AdaptiveConcurrencyLlmClient
     from app.infra.external.rerank.cross_encoder_client import CrossEncoderClient
     from app.infra.external.cache.redis_cache_client import RedisCacheClient, NullCacheClient
+    from app.infra.external.cache.tiered_cache_client import TieredCacheClient
     from app.core.interface.multimodal_embedding_client import MultimodalEmbeddingClient
     from app.infra.external.embedding.clip_embedding_client import ClipEmbeddingClient
+    from app.core.interface.job_store import JobStore
+    from app.core.interface.analysis_cache import AnalysisCache
+    from app.infra.repository.pg_analysis_cache import PgAnalysisCache
+    from app.core.interface.ingest_manifest import IngestManifest
+    from app.infra.repository.pg_ingest_manifest import PgIngestManifest
+    from app.core.service.ingestion_job_service import IngestionJobService
+    from app.core.interface.ingest_checkpoint import IngestCheckpoint
+    from app.infra.repository.pg_ingest_checkpoint import PgIngestCheckpoint
+    from app.infra.repository.pg_job_store import PgJobStore
+    from app.infra.external.cache.redis_job_store import RedisJobStore
     from app.di_container import DIContainer
 
     DIContainer.register(RagRepository, AgeRepositoryImpl())
-    DIContainer.register(LlmClient, GoogleChatClient())
+    # 프로세스 전역 AIMD 동시성 제한기로 LLM 호출을 감쌈 (429 스로틀링 대응)
+    DIContainer.register(LlmClient, AdaptiveConcurrencyLlmClient(GoogleChatClient()))
     DIContainer.register(RerankClient, CrossEncoderClient())
     DIContainer.register(MultimodalEmbeddingClient, ClipEmbeddingClient())
 
     redis_host = os.getenv("REDIS_HOST")
     if redis_host:
-        DIContainer.register(CacheClient, RedisCacheClient(
+        redis_cache = RedisCacheClient(
             host=redis_host,
             port=int(os.getenv("REDIS_PORT", "6379")),
             db=int(os.getenv("REDIS_DB", "0")),
             password=os.getenv("REDIS_PASSWORD"),
-        ))
+        )
+        # 프로세스 내 L1 캐시를 Redis 앞에 둠 (무효화는 Pub/Sub으로 전 워커에 전파)
+        if os.getenv("L1_CACHE_ENABLED", "true").lower() == "true":
+            DIContainer.register(CacheClient, TieredCacheClient(redis_cache))
+        else:
+            DIContainer.register(CacheClient, redis_cache)
     else:
         DIContainer.register(CacheClient, NullCacheClient())
 
+    # 이미지 분석 결과 캐시: Postgres 영구 저장 + Redis 전면 캐시 (CacheClient가 Null이면 Postgres만)
+    DIContainer.register(AnalysisCache, PgAnalysisCache(DIContainer.get(CacheClient)))
+
+    # 디렉토리 수집 이력 (신규/변경 파일만 재처리)
+    DIContainer.register(IngestManifest, PgIngestManifest())
+
     DIContainer.register(RagGenerationService, RagGenerationService())
 
+    # 비동기 수집 잡 저장소: Redis 설정 시 Redis, 아니면 Postgres(rag_ingest_jobs)
+    if redis_host:
+        job_store = RedisJobStore(
+            host=redis_host,
+            port=int(os.getenv("REDIS_PORT", "6379")),
+            db=int(os.getenv("REDIS_DB", "0")),
+            password=os.getenv("REDIS_PASSWORD"),
+        )
+    else:
+        job_store = PgJobStore()
+    DIContainer.register(JobStore, job_store)
+    # 항목별 단계 체크포인트 (analyzed/embedded/stored) — 저장 실패 잡 재개 시 LLM 분석·임베딩 재사용
+    DIContainer.register(IngestCheckpoint, PgIngestCheckpoint())
+    DIContainer.register(IngestionJobService, IngestionJobService(
+        DIContainer.get(RagGenerationService), job_store, DIContainer.get(IngestCheckpoint)
+    ))
+
+
+async def start_background_workers():
+    from app.core.service.ingestion_job_service import IngestionJobService
+    from app.core.interface.cache_client import CacheClient
+    from app.infra.external.cache.tiered_cache_client import TieredCacheClient
+    from app.di_container import DIContainer
+
+    cache = DIContainer.get(CacheClient)
+    if isinstance(cache, TieredCacheClient):
+        await cache.start()
+    await DIContainer.get(IngestionJobService).start()
+
+
+async def stop_background_workers():
+    from app.core.service.ingestion_job_service import IngestionJobService
+    from app.core.interface.cache_client import CacheClient
+    from app.infra.external.cache.tiered_cache_client import TieredCacheClient
+    from app.di_container import DIContainer
+
+    await DIContainer.get(IngestionJobService).stop()
+    cache = DIContainer.get(CacheClient)
+    if isinstance(cache, TieredCacheClient):
+        await cache.stop()
+
 
 def cleanup_resources():
     ## TODO : 디비 정리등 리소스 정리를 만들어야 함.
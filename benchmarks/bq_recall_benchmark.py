@@ -0,0 +1,116 @@
+"""2단계 검색 벤치마크 — _vector_search(halfvec HNSW) vs _quantized_search(bit HNSW + 재정렬)
+SHORT_EMBEDDING=true면 _matryoshka_search(768차원 축소 HNSW + 재정렬)도 같은 oversample 목록으로 측정합니다.
+
+실행 (DB 접속 환경변수 필요):
+    python -m benchmarks.bq_recall_benchmark --rows 5000 --queries 50 --k 10 --oversample 1,2,4,8
+    python -m benchmarks.bq_recall_benchmark --input rows.jsonl   # 실제 임베딩(JSONL, embedding_bulk_loader 입력 형식) 사용
+
+임시 컬렉션(__bench_bq__)에 벡터를 적재하고, exact 프로파일(전수 비교) 결과를 정답으로
+경로별 recall@k와 평균/p95 지연을 출력한 뒤 컬렉션을 삭제합니다.
+이진 양자화 HNSW 인덱스가 없으면 concurrent_index 배치로 쓰기를 막지 않고 생성하며, 측정 후 다시 삭제합니다.
+임의 벡터는 군집 구조가 없어 양자화 recall이 실제 임베딩보다 낮게 나오므로 실제 데이터 측정을 권장합니다.
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+
+from app.infra.database import PGVectorManager
+from app.infra.batch.concurrent_index import ConcurrentIndexBuilder
+from app.infra.batch.embedding_bulk_loader import EmbeddingBulkLoader, _read_jsonl
+
+_BENCH_COLLECTION = "__bench_bq__"
+
+
+def _synthetic_docs(n: int, clusters: int = 50):
+    """군집 중심 + 잡음으로 만든 벡터 (실제 임베딩처럼 이웃이 뭉쳐 있는 분포)."""
+    dim = PGVectorManager.EMBEDDING_DIM
+    centers = [[random.gauss(0, 1) for _ in range(dim)] for _ in range(clusters)]
+    for i in range(n):
+        center = centers[i % clusters]
+        yield {
+            "page_content": f"bench-{i}",
+            "metadata": {"service_name": "bench", "screen_name": f"screen{i}", "version": "1.0.0"},
+            "embedding": [c + random.gauss(0, 0.6) for c in center],
+        }
+
+
+def _perturb(vector: list) -> list:
+    return [v + random.gauss(0, 0.3) for v in vector]
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    rows = fn()
+    return [row["content"] for row in rows], (time.perf_counter() - started) * 1000
+
+
+def _summary(recalls: list, latencies: list) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "recall_at_k": round(statistics.mean(recalls), 4),
+        "mean_ms": round(statistics.mean(latencies), 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--oversample", default="1,2,4,8", help="쉼표 구분 후보 배수 목록")
+    parser.add_argument("--input", help="실제 임베딩 JSONL (미지정 시 합성 벡터)")
+    args = parser.parse_args()
+
+    mgr = PGVectorManager()
+    mgr.ensure_vector_table()
+    # quantized 경로용 이진 양자화 HNSW 인덱스 — 없으면 CONCURRENTLY 생성 (BQ_INDEX 설정은 바꾸지 않음)
+    with mgr.get_cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s)", (f"public.{mgr.BQ_HNSW_INDEX}",))
+        created_bq_index = cursor.fetchone()[0] is None
+    if created_bq_index:
+        ConcurrentIndexBuilder(mgr).run("bq")
+    docs = list(_read_jsonl(args.input)) if args.input else list(_synthetic_docs(args.rows))
+    queries = [_perturb(doc["embedding"]) for doc in random.sample(docs, min(args.queries, len(docs)))]
+    factors = [int(f) for f in args.oversample.split(",")]
+
+    try:
+        EmbeddingBulkLoader(mgr).load(_BENCH_COLLECTION, docs)
+        paths = {"halfvec_hnsw": lambda q: mgr._vector_search(_BENCH_COLLECTION, q, args.k, None, "balanced")}
+        for factor in factors:
+            paths[f"bq_oversample_{factor}"] = (
+                lambda q, f=factor: mgr._quantized_search(_BENCH_COLLECTION, q, args.k, None, "balanced", f)
+            )
+            if mgr.SHORT_EMBEDDING_ENABLED:
+                paths[f"matryoshka_oversample_{factor}"] = (
+                    lambda q, f=factor: mgr._matryoshka_search(_BENCH_COLLECTION, q, args.k, None, "balanced", f)
+                )
+
+        recalls = {name: [] for name in paths}
+        latencies = {name: [] for name in paths}
+        for query in queries:
+            truth, _ = _timed(lambda: mgr._vector_search(_BENCH_COLLECTION, query, args.k, None, "exact"))
+            for name, search in paths.items():
+                found, ms = _timed(lambda: search(query))
+                recalls[name].append(len(set(found) & set(truth)) / max(len(truth), 1))
+                latencies[name].append(ms)
+    finally:
+        mgr.drop_collection(_BENCH_COLLECTION)
+        if created_bq_index:
+            # 파티션 부모 인덱스는 CONCURRENTLY DROP 불가
+            concurrently = "" if mgr.is_partitioned() else "CONCURRENTLY "
+            with mgr.autocommit_cursor() as cursor:
+                cursor.execute(f"DROP INDEX {concurrently}IF EXISTS public.{mgr.BQ_HNSW_INDEX}")
+
+    print(json.dumps({
+        "rows": len(docs),
+        "queries": len(queries),
+        "k": args.k,
+        "results": {name: _summary(recalls[name], latencies[name]) for name in paths},
+    }, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
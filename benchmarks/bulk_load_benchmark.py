@@ -0,0 +1,69 @@
+"""rag_embeddings 적재 처리량 벤치마크 — 기존 insert_embedding 루프 vs 바이너리 COPY 적재기
+
+실행 (DB 접속 환경변수 필요):
+    python -m benchmarks.bulk_load_benchmark --rows 2000
+
+임시 컬렉션(__bench_load__)에 임의 벡터를 적재한 뒤 삭제합니다. 출력: 경로별 rows/sec.
+"""
+import argparse
+import json
+import random
+import time
+
+from app.infra.database import PGVectorManager
+from app.infra.batch.embedding_bulk_loader import EmbeddingBulkLoader
+
+_BENCH_COLLECTION = "__bench_load__"
+
+
+def _synthetic_docs(n: int, with_image: bool):
+    for i in range(n):
+        yield {
+            "page_content": f"벤치마크 화면 {i} 로그인 버튼 검색 목록",
+            "metadata": {"service_name": "bench", "screen_name": f"screen{i}", "version": "1.0.0"},
+            "embedding": [random.uniform(-1, 1) for _ in range(PGVectorManager.EMBEDDING_DIM)],
+            "image_embedding": ([random.uniform(-1, 1) for _ in range(PGVectorManager.IMAGE_EMBEDDING_DIM)]
+                                if with_image else None),
+        }
+
+
+def _cleanup(mgr: PGVectorManager):
+    with mgr.get_cursor() as cursor:
+        cursor.execute("DELETE FROM rag_embeddings WHERE collection_name = %s", (_BENCH_COLLECTION,))
+
+
+def _bench_insert_loop(mgr: PGVectorManager, docs: list) -> float:
+    started = time.perf_counter()
+    for doc in docs:
+        mgr.insert_embedding(_BENCH_COLLECTION, doc["page_content"], doc["metadata"],
+                             doc["embedding"], doc["image_embedding"])
+    return len(docs) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--with-image", action="store_true", help="CLIP 벡터 컬럼도 채움")
+    args = parser.parse_args()
+
+    mgr = PGVectorManager()
+    mgr.ensure_vector_table()
+    docs = list(_synthetic_docs(args.rows, args.with_image))
+
+    try:
+        loop_rps = _bench_insert_loop(mgr, docs)
+        _cleanup(mgr)
+        copy_rps = EmbeddingBulkLoader(mgr).load(_BENCH_COLLECTION, docs)["rows_per_sec"]
+    finally:
+        _cleanup(mgr)
+
+    print(json.dumps({
+        "rows": args.rows,
+        "insert_embedding_rows_per_sec": round(loop_rps, 1),
+        "copy_binary_rows_per_sec": copy_rps,
+        "speedup": round(copy_rps / loop_rps, 2) if loop_rps else None,
+    }, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""CLIP 이미지 인코딩 처리량 벤치마크 — 단건 encode 반복 vs 병렬 디코딩 + 배치 encode
+
+실행 (sentence-transformers, Pillow 필요 / 첫 실행 시 모델 다운로드):
+    CUDA_VISIBLE_DEVICES= python -m benchmarks.clip_batch_benchmark --images 128
+
+임의 생성한 모바일 스크린샷 크기(1080x2400) PNG를 사용합니다. 출력: 경로별 images/sec.
+"""
+import argparse
+import base64
+import io
+import json
+import random
+import time
+
+from app.infra.external.embedding.clip_embedding_client import ClipEmbeddingClient
+
+
+def _synthetic_images(n: int, size=(1080, 2400)) -> list:
+    from PIL import Image, ImageDraw
+    images = []
+    for i in range(n):
+        img = Image.new("RGB", size, (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255)))
+        draw = ImageDraw.Draw(img)
+        for _ in range(20):
+            x, y = random.randint(0, size[0] - 200), random.randint(0, size[1] - 100)
+            draw.rectangle([x, y, x + 200, y + 100], fill=(random.randint(0, 255), 0, random.randint(0, 255)))
+        buf = io.BytesIO()
+        img.save(buf, format="PNG")
+        images.append(base64.b64encode(buf.getvalue()).decode())
+    return images
+
+
+def _bench_single(client: ClipEmbeddingClient, b64s: list) -> float:
+    """기존 경로: 문서마다 디코딩 + 모델 forward 1회"""
+    from PIL import Image
+    started = time.perf_counter()
+    for b64 in b64s:
+        img = Image.open(io.BytesIO(base64.b64decode(b64))).convert("RGB")
+        ClipEmbeddingClient._model.encode([img])[0].tolist()
+    return len(b64s) / (time.perf_counter() - started)
+
+
+def _bench_batch(client: ClipEmbeddingClient, b64s: list) -> float:
+    started = time.perf_counter()
+    client.embed_images_base64(b64s)
+    return len(b64s) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=128)
+    args = parser.parse_args()
+
+    client = ClipEmbeddingClient()
+    client._ensure_model()
+    b64s = _synthetic_images(args.images)
+    client.embed_images_base64(b64s[:2])  # 워밍업
+
+    single_ips = _bench_single(client, b64s)
+    batch_ips = _bench_batch(client, b64s)
+
+    print(json.dumps({
+        "images": args.images,
+        "single_images_per_sec": round(single_ips, 2),
+        "batch_images_per_sec": round(batch_ips, 2),
+        "speedup": round(batch_ips / single_ips, 2) if single_ips else None,
+    }, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
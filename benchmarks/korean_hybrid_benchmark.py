@@ -0,0 +1,183 @@
+"""한국어 하이브리드 검색 벤치마크 — 기존 RRF SQL(공백 분리 content_tsv) vs 단일 패스 RRF(simple / bigram)
+
+실행 (DB 접속 환경변수 필요):
+    python -m benchmarks.korean_hybrid_benchmark --rows 380 --queries 100 --k 5
+
+임시 컬렉션(__bench_ko_hybrid__)에 "비밀번호재설정" 같은 복합명사·조사가 붙은 화면 설명을 적재하고,
+띄어 쓴 형태·다른 조사로 바꾼 쿼리("비밀번호 재설정에서")로 정답 화면이 top-k에 드는 비율(hit@k)과
+평균/p95 지연을 경로별로 출력한 뒤 컬렉션을 삭제합니다.
+쿼리 벡터는 정답 문서 벡터에 큰 잡음(--noise)을 더해 만들어 벡터 레그만으로는 정답을 놓치는 상황을 재현합니다.
+LEXICAL_INDEX 설정과 무관하게 벤치 컬렉션의 content_lex만 직접 채우고, GIN 인덱스가 없으면
+concurrent_index 배치로 쓰기를 막지 않고 생성한 뒤 측정 후 다시 삭제합니다.
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+
+from app.infra.database import PGVectorManager
+from app.infra.database.korean_lexical import lexical_document
+from app.infra.batch.concurrent_index import ConcurrentIndexBuilder
+from app.infra.batch.embedding_bulk_loader import EmbeddingBulkLoader
+
+_BENCH_COLLECTION = "__bench_ko_hybrid__"
+
+_NOUNS = ["회원가입", "비밀번호", "재설정", "로그인", "장바구니", "주문내역", "배송조회", "결제수단", "알림설정", "프로필",
+          "쿠폰함", "포인트", "고객센터", "상품상세", "검색결과", "리뷰작성", "환불신청", "계좌등록", "본인인증", "공지사항"]
+_PARTICLES = ["을", "를", "에서", "으로", "의", "은", "는", "이", "가", "에"]
+_PREDICATES = ["확인합니다", "변경할 수 있습니다", "표시됩니다", "입력합니다", "선택합니다"]
+
+# 변경 전 _hybrid_search SQL (content_tsv, 레그마다 본문 전달, tsquery·ts_rank 반복 평가)
+_LEGACY_HYBRID_SQL = """
+    WITH vector_ranks AS (
+        SELECT id, content, metadata,
+               ROW_NUMBER() OVER (ORDER BY embedding <=> %s::halfvec) AS rank
+        FROM rag_embeddings
+        WHERE collection_name = %s
+        ORDER BY embedding <=> %s::halfvec
+        LIMIT %s
+    ),
+    keyword_ranks AS (
+        SELECT id, content, metadata,
+               ROW_NUMBER() OVER (ORDER BY ts_rank(content_tsv, plainto_tsquery('simple', %s)) DESC) AS rank
+        FROM rag_embeddings
+        WHERE collection_name = %s
+        AND content_tsv @@ plainto_tsquery('simple', %s)
+        ORDER BY ts_rank(content_tsv, plainto_tsquery('simple', %s)) DESC
+        LIMIT %s
+    )
+    SELECT
+        COALESCE(v.id, k.id) AS id,
+        COALESCE(v.content, k.content) AS content,
+        COALESCE(v.metadata, k.metadata) AS metadata,
+        COALESCE(1.0 / (60 + v.rank), 0.0) + COALESCE(1.0 / (60 + k.rank), 0.0) AS rrf_score
+    FROM vector_ranks v
+    FULL OUTER JOIN keyword_ranks k ON v.id = k.id
+    ORDER BY rrf_score DESC
+    LIMIT %s
+"""
+
+
+def _unit(vector: list) -> list:
+    norm = sum(v * v for v in vector) ** 0.5
+    return [v / norm for v in vector]
+
+
+def _corpus(n: int):
+    """화면마다 고유한 복합명사(명사 2개 붙여쓰기)를 제목으로 갖는 설명문과 (쿼리, 정답 screen_name) 목록."""
+    dim = PGVectorManager.EMBEDDING_DIM
+    pairs = [(a, b) for a in _NOUNS for b in _NOUNS if a != b]
+    random.shuffle(pairs)
+    docs, cases = [], []
+    for i, (a, b) in enumerate(pairs[:n]):
+        filler = random.sample(_NOUNS, 2)
+        content = (f"{a}{b}{random.choice(_PARTICLES)} {random.choice(_PREDICATES)}. "
+                   f"{filler[0]}{random.choice(_PARTICLES)} {filler[1]}{random.choice(_PARTICLES)} "
+                   f"{random.choice(_PREDICATES)}.")
+        screen_name = f"screen{i}"
+        docs.append({
+            "page_content": content,
+            "metadata": {"service_name": "bench", "screen_name": screen_name, "version": "1.0.0"},
+            "embedding": _unit([random.gauss(0, 1) for _ in range(dim)]),
+        })
+        cases.append((f"{a} {b}{random.choice(_PARTICLES)}", screen_name, docs[-1]["embedding"]))
+    return docs, cases
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    rows = fn()
+    return rows, (time.perf_counter() - started) * 1000
+
+
+def _fill_lexical(mgr: PGVectorManager):
+    """벤치 컬렉션 행의 content_lex를 bigram 문서로 채웁니다 (simple 모드 적재 시 NULL)."""
+    with mgr.get_cursor() as cursor:
+        cursor.execute("SELECT id, content FROM rag_embeddings WHERE collection_name = %s", (_BENCH_COLLECTION,))
+        rows = cursor.fetchall()
+        cursor.execute("""
+            UPDATE rag_embeddings r
+            SET content_lex = to_tsvector('simple', b.doc)
+            FROM unnest(%s::bigint[], %s::text[]) AS b(id, doc)
+            WHERE r.collection_name = %s AND r.id = b.id
+        """, ([row[0] for row in rows], [lexical_document(row[1]) for row in rows], _BENCH_COLLECTION))
+
+
+def _summary(hits: list, latencies: list) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "hit_at_k": round(statistics.mean(hits), 4),
+        "mean_ms": round(statistics.mean(latencies), 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=380, help="화면 수 (최대 380 = 명사 쌍 수)")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--noise", type=float, default=25.0,
+                        help="쿼리 벡터 잡음 노름 (정답 벡터 노름 1 대비, 클수록 벡터 레그가 약해짐)")
+    args = parser.parse_args()
+
+    mgr = PGVectorManager()
+    mgr.ensure_vector_table()
+    # content_lex GIN 인덱스 — 없으면 CONCURRENTLY 생성 (LEXICAL_INDEX 설정은 바꾸지 않음)
+    with mgr.get_cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s)", (f"public.{mgr.LEXICAL_INDEX}",))
+        created_lex_index = cursor.fetchone()[0] is None
+    if created_lex_index:
+        ConcurrentIndexBuilder(mgr).run("lexical")
+    docs, cases = _corpus(args.rows)
+    cases = random.sample(cases, min(args.queries, len(cases)))
+    noise = args.noise / PGVectorManager.EMBEDDING_DIM ** 0.5
+    queries = [(text, target, _unit([v + random.gauss(0, noise) for v in emb])) for text, target, emb in cases]
+
+    def legacy(text, emb):
+        with mgr.get_cursor() as cursor:
+            cursor.execute(_LEGACY_HYBRID_SQL, [emb, _BENCH_COLLECTION, emb, args.k * 3,
+                                                text, _BENCH_COLLECTION, text, text, args.k * 3, args.k])
+            return [{"metadata": row[2]} for row in cursor.fetchall()]
+
+    def fused(mode):
+        return lambda text, emb: mgr._hybrid_search(_BENCH_COLLECTION, emb, text, args.k, None, lexical_mode=mode)
+
+    paths = {
+        "vector_only": lambda text, emb: mgr._vector_search(_BENCH_COLLECTION, emb, args.k, None),
+        "legacy_simple": legacy,
+        "fused_simple": fused("simple"),
+        "fused_bigram": fused("bigram"),
+    }
+
+    try:
+        EmbeddingBulkLoader(mgr).load(_BENCH_COLLECTION, docs)
+        _fill_lexical(mgr)
+        hits = {name: [] for name in paths}
+        latencies = {name: [] for name in paths}
+        for text, target, emb in queries:
+            for name, search in paths.items():
+                rows, ms = _timed(lambda: search(text, emb))
+                names = [(row["metadata"] if isinstance(row["metadata"], dict) else json.loads(row["metadata"]))
+                         .get("screen_name") for row in rows]
+                hits[name].append(1.0 if target in names else 0.0)
+                latencies[name].append(ms)
+    finally:
+        mgr.drop_collection(_BENCH_COLLECTION)
+        if created_lex_index:
+            # 파티션 부모 인덱스는 CONCURRENTLY DROP 불가
+            concurrently = "" if mgr.is_partitioned() else "CONCURRENTLY "
+            with mgr.autocommit_cursor() as cursor:
+                cursor.execute(f"DROP INDEX {concurrently}IF EXISTS public.{mgr.LEXICAL_INDEX}")
+
+    print(json.dumps({
+        "rows": len(docs),
+        "queries": len(queries),
+        "k": args.k,
+        "results": {name: _summary(hits[name], latencies[name]) for name in paths},
+    }, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
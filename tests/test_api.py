@@ -185,3 +185,195 @@ def test_search_auth_disabled_when_no_api_keys(monkeypatch):
         )
         # 인증은 통과 (401/403 아님)
         assert resp.status_code not in (401, 403)
+
+
+def test_generation_rejects_directory_outside_root(monkeypatch, tmp_path):
+    """/generation/vector: DIRECTORY_INGEST_ROOT 밖의 directory_path는 400"""
+    monkeypatch.setenv("API_KEYS", "")
+    monkeypatch.setenv("REDIS_HOST", "")
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    monkeypatch.setenv("DIRECTORY_INGEST_ROOT", str(tmp_path / "screens"))
+
+    mock_service = MagicMock()
+    mock_service.generation_rag = AsyncMock(return_value={})
+
+    with patch("app.di_container.DIContainer.get") as mock_get:
+        from app.core.service.rag_generation_service import RagGenerationService
+        mock_get.side_effect = lambda interface: mock_service if interface == RagGenerationService else MagicMock()
+
+        from app.main import app
+        client = TestClient(app, raise_server_exceptions=False)
+        resp = client.post(
+            "/api/rag/generation/vector",
+            json={"collection_name": "screens", "directory_path": str(tmp_path / "screens" / ".." / "etc")}
+        )
+        assert resp.status_code == 400
+        mock_service.generation_rag.assert_not_called()
+
+
+def test_text_stream_reads_body_while_streaming(monkeypatch):
+    """/add/text/stream: 요청 본문 전체가 서비스 스트림으로 전달되고 결과가 NDJSON으로 반환"""
+    import json
+    monkeypatch.setenv("API_KEYS", "")
+    monkeypatch.setenv("REDIS_HOST", "")
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+
+    received = []
+
+    async def _ingest_text_stream(collection_name, byte_stream):
+        async for chunk in byte_stream:
+            received.append(chunk)
+        body = b"".join(received).decode()
+        for i, line in enumerate(body.splitlines(), start=1):
+            yield {"line": i, "status": "stored", "error": None, "collection": collection_name}
+
+    mock_service = MagicMock()
+    mock_service.ingest_text_stream = _ingest_text_stream
+
+    with patch("app.di_container.DIContainer.get") as mock_get:
+        from app.core.service.rag_generation_service import RagGenerationService
+        mock_get.side_effect = lambda interface: mock_service if interface == RagGenerationService else MagicMock()
+
+        from app.main import app
+        client = TestClient(app, raise_server_exceptions=False)
+        body = "\n".join(json.dumps({"text_content": f"t{i}"}) for i in range(3)) + "\n"
+        resp = client.post(
+            "/api/rag/add/text/stream?collection_name=screens&system_id=sys01",
+            content=body.encode(),
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in resp.text.splitlines()]
+        assert [line["line"] for line in lines] == [1, 2, 3]
+        assert lines[0]["collection"] == "sys01:screens"
+
+
+def _run_body_stream(messages, consume):
+    """_BodyStreamingResponse를 ASGI로 직접 실행 — messages 순서로 receive() 응답, consume(body)로 본문 처리"""
+    import asyncio
+    from app.api.rag_controller import _BodyStreamingResponse
+
+    sent = []
+    queue = list(messages)
+
+    async def receive():
+        if queue:
+            return queue.pop(0)
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        sent.append(message)
+
+    response = _BodyStreamingResponse(consume, media_type="application/x-ndjson")
+    asyncio.run(asyncio.wait_for(response({"type": "http", "path": "/stream"}, receive, send), 5))
+    return sent
+
+
+def test_text_stream_cancels_processing_on_disconnect_after_body():
+    """본문을 다 읽은 뒤 클라이언트가 끊으면 처리 중인 스트림이 취소됨"""
+    import asyncio
+    state = {}
+
+    async def consume(body):
+        async for _ in body:
+            pass
+        yield "first\n"
+        try:
+            await asyncio.sleep(3600)  # 처리 중 (LLM·임베딩 대기)
+        finally:
+            state["cancelled"] = True
+
+    sent = _run_body_stream([{"type": "http.request", "body": b"{}\n", "more_body": False},
+                             {"type": "http.disconnect"}], consume)
+    assert state["cancelled"] is True
+    assert sent[1]["body"] == b"first\n"
+
+
+def test_text_stream_stops_on_disconnect_while_reading_body():
+    """본문 수신 중 연결이 끊기면 ClientDisconnect로 처리를 중단하고 예외를 올리지 않음"""
+    state = {"chunks": 0}
+
+    async def consume(body):
+        async for _ in body:
+            state["chunks"] += 1
+        yield "unreachable\n"
+
+    sent = _run_body_stream([{"type": "http.request", "body": b"{}\n", "more_body": True},
+                             {"type": "http.disconnect"}], consume)
+    assert state["chunks"] == 1
+    assert all(m.get("body") != b"unreachable\n" for m in sent)
+
+
+def test_add_analysis_validates_and_skips_llm(monkeypatch):
+    """/add/analysis: 스키마 검증 후 ingest_analysis_items로 바로 저장, 잘못된 본문은 422"""
+    monkeypatch.setenv("API_KEYS", "")
+    monkeypatch.setenv("REDIS_HOST", "")
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+
+    mock_service = MagicMock()
+    mock_service.ingest_analysis_items = AsyncMock(return_value=[None])
+
+    with patch("app.di_container.DIContainer.get") as mock_get:
+        from app.core.service.rag_generation_service import RagGenerationService
+        mock_get.side_effect = lambda interface: mock_service if interface == RagGenerationService else MagicMock()
+
+        from app.main import app
+        client = TestClient(app, raise_server_exceptions=False)
+        analysis = {
+            "input_metadata": {"service_name": "회원", "screen_name": "로그인", "version": "2.0.0"},
+            "screen_analysis": {"screen_type": "로그인", "primary_purpose": "사용자 인증"},
+            "search_keywords": ["로그인"],
+        }
+        resp = client.post("/api/rag/add/analysis",
+                           json={"collection_name": "screens", "system_id": "sys01", "analyses": [analysis]})
+        assert resp.status_code == 200
+        assert resp.json() == {"result": "ok", "stored": 1, "failed": []}
+        kwargs = mock_service.ingest_analysis_items.call_args.kwargs
+        assert kwargs["collection_name"] == "sys01:screens"
+        assert kwargs["analyses"][0]["input_metadata"]["version"] == "2.0.0"
+        assert kwargs["analyses"][0]["extracted_elements"]["button_texts"] == []
+
+        bad = client.post("/api/rag/add/analysis",
+                          json={"collection_name": "screens", "analyses": [{"input_metadata": {}}]})
+        assert bad.status_code == 422
+        mock_service.ingest_analysis_items.assert_awaited_once()
+
+
+def test_search_batch_returns_results_per_query(monkeypatch):
+    """/search/batch: 쿼리 순서대로 결과를 묶어 반환, 빈 쿼리 목록·배치 미지원 모드는 422"""
+    monkeypatch.setenv("API_KEYS", "")
+    monkeypatch.setenv("REDIS_HOST", "")
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+
+    mock_service = MagicMock()
+    mock_service.search_rag_batch = AsyncMock(return_value=[
+        [({"page_content": "로그인", "metadata": {}}, 0.91234)],
+        [],
+    ])
+
+    with patch("app.di_container.DIContainer.get") as mock_get:
+        from app.core.service.rag_generation_service import RagGenerationService
+        mock_get.side_effect = lambda interface: mock_service if interface == RagGenerationService else MagicMock()
+
+        from app.main import app
+        client = TestClient(app, raise_server_exceptions=False)
+        resp = client.post(
+            "/api/rag/search/batch",
+            json={"collection_name": "screens", "queries": ["login", "payment"], "system_id": "sys01"}
+        )
+        assert resp.status_code == 200
+        body = resp.json()["results"]
+        assert [item["query"] for item in body] == ["login", "payment"]
+        assert body[0]["results"][0]["score"] == 0.9123
+        assert body[1]["results"] == []
+        assert mock_service.search_rag_batch.call_args.kwargs["collection_name"] == "sys01:screens"
+
+        resp = client.post("/api/rag/search/batch", json={"collection_name": "screens", "queries": []})
+        assert resp.status_code == 422
+
+        # 배치 경로가 없는 모드는 거부
+        resp = client.post("/api/rag/search/batch",
+                           json={"collection_name": "screens", "queries": ["login"], "search_mode": "hybrid"})
+        assert resp.status_code == 422
+        assert mock_service.search_rag_batch.await_count == 1
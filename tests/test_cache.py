@@ -0,0 +1,562 @@
+"""캐시 계층 단위 테스트 — 외부 Redis/DB 없이 인메모리 대체 객체로 검증"""
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+# --- CI 환경에서 미설치 패키지 사전 Mock ---
+_MOCKS = [
+    "langchain", "langchain.prompts",
+    "langchain_core", "langchain_core.documents",
+    "langchain_google_genai",
+    "sqlalchemy",
+    "sqlalchemy.orm",
+    "sqlalchemy.pool",
+]
+for _m in _MOCKS:
+    sys.modules.setdefault(_m, MagicMock())
+
+
+class _MemoryStore:
+    """L2 공유 계층 대체 (get_many / put_many)"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get_many(self, keys):
+        return {k: self.data[k] for k in keys if k in self.data}
+
+    def put_many(self, items):
+        self.data.update(items)
+
+
+# ──────────────────────────────────────────────
+# 1. 텍스트 임베딩 캐시 (L1 LRU + L2 공유)
+# ──────────────────────────────────────────────
+class TestCachedEmbeddings:
+
+    def _make(self, store=None, l1_size=16):
+        from app.infra.external.embedding.cached_embeddings import CachedEmbeddings
+        inner = MagicMock()
+        inner.embed_documents.side_effect = lambda texts: [[float(len(t)), 0.5] for t in texts]
+        inner.embed_query.side_effect = lambda text: [0.25, float(len(text))]
+        return CachedEmbeddings(inner, "models/test", store, l1_size=l1_size), inner
+
+    def test_float16_roundtrip(self):
+        from app.infra.external.embedding.cached_embeddings import encode_float16, decode_float16
+        data = encode_float16([0.5, -1.0, 0.125])
+        assert len(data) == 6
+        assert decode_float16(data) == [0.5, -1.0, 0.125]
+
+    def test_repeat_documents_hit_l1(self):
+        emb, inner = self._make()
+        first = emb.embed_documents(["로그인", "회원가입"])
+        second = emb.embed_documents(["로그인", "회원가입"])
+        assert first == second
+        inner.embed_documents.assert_called_once_with(["로그인", "회원가입"])
+
+    def test_only_misses_are_embedded_and_order_kept(self):
+        emb, inner = self._make()
+        emb.embed_documents(["a"])
+        result = emb.embed_documents(["bbb", "a", "bbb"])
+        inner.embed_documents.assert_called_with(["bbb"])
+        assert result == [[3.0, 0.5], [1.0, 0.5], [3.0, 0.5]]
+
+    def test_shared_tier_serves_other_process(self):
+        store = _MemoryStore()
+        emb_a, _ = self._make(store)
+        emb_a.embed_documents(["화면 설명"])
+        emb_b, inner_b = self._make(store)
+        emb_b.embed_documents(["화면 설명"])
+        inner_b.embed_documents.assert_not_called()
+
+    def test_query_and_document_keys_are_separate(self):
+        emb, inner = self._make()
+        emb.embed_documents(["로그인"])
+        emb.embed_query("로그인")
+        inner.embed_query.assert_called_once_with("로그인")
+
+    def test_l2_failure_falls_back_to_api(self):
+        store = MagicMock()
+        store.get_many.side_effect = ConnectionError("redis down")
+        store.put_many.side_effect = ConnectionError("redis down")
+        emb, inner = self._make(store)
+        assert emb.embed_query("q") == [0.25, 1.0]
+        inner.embed_query.assert_called_once()
+
+    def test_l1_evicts_lru(self):
+        emb, inner = self._make(l1_size=1)
+        emb.embed_query("a")
+        emb.embed_query("b")
+        emb.embed_query("a")
+        assert inner.embed_query.call_count == 3
+
+
+# ──────────────────────────────────────────────
+# 2. 동일 요청 합치기 (single-flight) + 워커 간 채우기 락
+# ──────────────────────────────────────────────
+class TestSingleFlight:
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        import asyncio
+        from app.core.service.single_flight import SingleFlight
+        flight, calls = SingleFlight("test"), []
+
+        async def _work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return ["result"]
+
+        results = await asyncio.gather(*[flight.do("k", _work) for _ in range(5)])
+        assert calls == [1]
+        assert all(r == ["result"] for r in results)
+        assert flight.inflight() == 0
+
+    @pytest.mark.asyncio
+    async def test_exception_shared_and_next_call_retries(self):
+        import asyncio
+        from app.core.service.single_flight import SingleFlight
+        flight, calls = SingleFlight("test"), []
+
+        async def _fail():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            raise RuntimeError("db down")
+
+        results = await asyncio.gather(*[flight.do("k", _fail) for _ in range(3)], return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        await asyncio.gather(flight.do("k", _fail), return_exceptions=True)
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_leader_cancel_does_not_cancel_followers(self):
+        import asyncio
+        from app.core.service.single_flight import SingleFlight
+        flight = SingleFlight("test")
+
+        async def _work():
+            await asyncio.sleep(0.02)
+            return 42
+
+        leader = asyncio.create_task(flight.do("k", _work))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("k", _work))
+        await asyncio.sleep(0)
+        leader.cancel()
+        assert await follower == 42
+
+
+class TestSearchCoalescing:
+
+    def _make_service(self, cache_client=None):
+        import time
+        from unittest.mock import AsyncMock
+        from app.core.service.rag_generation_service import RagGenerationService
+        svc = object.__new__(RagGenerationService)
+        if cache_client is None:
+            cache_client = MagicMock()
+            cache_client.get = AsyncMock(return_value=None)
+            cache_client.set = AsyncMock()
+        svc.cache_client = cache_client
+        svc.rerank_client = None
+        svc.embedding_client = MagicMock()
+        svc.embedding_client.embeddings.embed_query.side_effect = lambda q: time.sleep(0.02) or [0.1]
+        svc.vector_repository = MagicMock()
+        svc.vector_repository.similarity_search.return_value = [({"page_content": "로그인", "metadata": {}}, 0.9)]
+        svc.vector_repository.get_screens_by_service.side_effect = lambda s, v: time.sleep(0.02) or [{"screen_name": "a"}]
+        return svc
+
+    @pytest.mark.asyncio
+    async def test_identical_concurrent_searches_hit_db_once(self):
+        import asyncio
+        svc = self._make_service()
+        results = await asyncio.gather(*[svc.search_rag("col", "로그인", k=3) for _ in range(5)])
+        svc.embedding_client.embeddings.embed_query.assert_called_once()
+        svc.vector_repository.similarity_search.assert_called_once()
+        svc.cache_client.set.assert_awaited_once()
+        assert all(len(r) == 1 for r in results)
+
+    @pytest.mark.asyncio
+    async def test_different_queries_not_coalesced(self):
+        import asyncio
+        svc = self._make_service()
+        await asyncio.gather(svc.search_rag("col", "a"), svc.search_rag("col", "b"))
+        assert svc.vector_repository.similarity_search.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_graph_lookup_coalesced(self):
+        import asyncio
+        svc = self._make_service()
+        await asyncio.gather(*[svc.get_screens_by_service("회원") for _ in range(4)])
+        svc.vector_repository.get_screens_by_service.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_fill_lock_waits_for_other_worker(self, monkeypatch):
+        import json
+        from unittest.mock import AsyncMock
+        import app.core.service.rag_generation_service as mod
+        monkeypatch.setattr(mod, "_CACHE_FILL_LOCK", True)
+        monkeypatch.setattr(mod, "_CACHE_FILL_POLL_SECONDS", 0.001)
+        cache = MagicMock()
+        filled = json.dumps([[{"page_content": "from-other-worker", "metadata": {}}, 0.5]])
+        cache.get = AsyncMock(side_effect=[None, None, filled])
+        cache.set = AsyncMock()
+        cache.acquire_lock = AsyncMock(return_value=None)  # 다른 워커가 계산 중
+        cache.release_lock = AsyncMock()
+        svc = self._make_service(cache)
+        results = await svc.search_rag("col", "로그인")
+        assert results[0][0]["page_content"] == "from-other-worker"
+        svc.vector_repository.similarity_search.assert_not_called()
+        cache.release_lock.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_fill_lock_released_after_compute(self, monkeypatch):
+        from unittest.mock import AsyncMock
+        import app.core.service.rag_generation_service as mod
+        monkeypatch.setattr(mod, "_CACHE_FILL_LOCK", True)
+        cache = MagicMock()
+        cache.get = AsyncMock(return_value=None)
+        cache.set = AsyncMock()
+        cache.acquire_lock = AsyncMock(return_value="tok")
+        cache.release_lock = AsyncMock()
+        svc = self._make_service(cache)
+        await svc.search_rag("col", "로그인")
+        svc.vector_repository.similarity_search.assert_called_once()
+        lock_key, token = cache.release_lock.call_args[0]
+        assert lock_key.startswith("rag:lock:rag:search:col:") and token == "tok"
+
+
+# ──────────────────────────────────────────────
+# 3. 프로세스 내 L1 + Redis L2 (Pub/Sub 무효화)
+# ──────────────────────────────────────────────
+class _FakeRedisCache:
+    """RedisCacheClient 대체 — 키-값 저장 + Pub/Sub 채널 공유"""
+
+    def __init__(self, data=None, bus=None):
+        import asyncio
+        self.data = data if data is not None else {}
+        self.bus = bus if bus is not None else []
+        self.gets = 0
+        self.queue = asyncio.Queue()
+
+    async def get(self, key):
+        self.gets += 1
+        return self.data.get(key)
+
+    async def mget(self, keys):
+        self.gets += 1
+        return [self.data.get(key) for key in keys]
+
+    async def set(self, key, value, ttl=3600):
+        self.data[key] = value
+
+    async def delete_pattern(self, pattern):
+        import fnmatch
+        for key in [k for k in self.data if fnmatch.fnmatchcase(k, pattern)]:
+            del self.data[key]
+
+    async def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+    async def publish(self, channel, message):
+        for subscriber in self.bus:
+            subscriber.put_nowait(message)
+
+    async def listen(self, channel):
+        self.bus.append(self.queue)
+        while True:
+            yield await self.queue.get()
+
+
+class TestTieredCacheClient:
+
+    def _make(self, inner=None, **kwargs):
+        from app.infra.external.cache.tiered_cache_client import TieredCacheClient
+        inner = inner or _FakeRedisCache()
+        return TieredCacheClient(inner, **kwargs), inner
+
+    @pytest.mark.asyncio
+    async def test_l1_hit_skips_redis(self):
+        cache, inner = self._make()
+        inner.data["rag:search:col:a"] = "[1]"
+        assert await cache.get("rag:search:col:a") == "[1]"
+        assert await cache.get("rag:search:col:a") == "[1]"
+        assert inner.gets == 1
+
+    @pytest.mark.asyncio
+    async def test_lru_respects_entry_and_byte_budget(self):
+        cache, inner = self._make(max_entries=2, max_bytes=40)
+        await cache.set("a", "x" * 10)
+        await cache.set("b", "x" * 10)
+        await cache.get("a")  # a를 최근 사용으로
+        await cache.set("c", "x" * 10)  # 항목 수 초과 → b 제거
+        inner.data.clear()
+        assert await cache.get("a") is not None
+        assert await cache.get("b") is None
+        await cache.set("big", "x" * 100)  # 예산 초과 값은 L1 제외
+        assert len(cache._l1) == 2
+
+    @pytest.mark.asyncio
+    async def test_l1_entries_expire(self, monkeypatch):
+        import app.infra.external.cache.tiered_cache_client as mod
+        now = [1000.0]
+        monkeypatch.setattr(mod.time, "monotonic", lambda: now[0])
+        cache, inner = self._make(ttl=5)
+        await cache.set("k", "v", ttl=3600)
+        inner.data.clear()
+        now[0] += 6
+        assert await cache.get("k") is None
+
+    @pytest.mark.asyncio
+    async def test_delete_pattern_invalidates_other_workers(self):
+        import asyncio
+        data, bus = {}, []
+        worker_a, _ = self._make(_FakeRedisCache(data, bus))
+        worker_b, inner_b = self._make(_FakeRedisCache(data, bus))
+        await worker_b.start()
+        await asyncio.sleep(0)  # 구독 등록
+        await worker_a.set("rag:search:col:q", "[old]")
+        assert await worker_b.get("rag:search:col:q") == "[old]"  # B의 L1에 적재
+
+        await worker_a.delete_pattern("rag:search:col:*")
+        await asyncio.sleep(0.01)
+        assert await worker_b.get("rag:search:col:q") is None
+        await worker_b.stop()
+
+    def test_own_invalidation_message_ignored(self):
+        cache, _ = self._make()
+        cache._l1.put("rag:search:col:q", "v", 60)
+        cache.handle_invalidation(f"{cache._instance_id}|rag:search:*")
+        assert cache._l1.get("rag:search:col:q") == "v"
+        cache.handle_invalidation("other|rag:search:*")
+        assert cache._l1.get("rag:search:col:q") is None
+
+
+# ──────────────────────────────────────────────
+# 4. 세대 카운터 기반 O(1) 무효화
+# ──────────────────────────────────────────────
+class TestGenerationInvalidation:
+
+    def _make_service(self, cache):
+        from app.core.service.rag_generation_service import RagGenerationService
+        svc = object.__new__(RagGenerationService)
+        svc.cache_client = cache
+        svc.rerank_client = None
+        svc.embedding_client = MagicMock()
+        svc.embedding_client.embeddings.embed_query.return_value = [0.1]
+        svc.vector_repository = MagicMock()
+        svc.vector_repository.similarity_search.return_value = [({"page_content": "c", "metadata": {}}, 0.9)]
+        svc.vector_repository.get_screens_by_service.return_value = [{"screen_name": "a"}]
+        svc.vector_repository.get_related_screens.return_value = [{"screen_name": "b"}]
+        return svc
+
+    @pytest.mark.asyncio
+    async def test_write_bumps_generation_and_misses_old_entries(self):
+        cache = _FakeRedisCache()
+        svc = self._make_service(cache)
+        await svc.search_rag("col", "q")
+        await svc.search_rag("col", "q")
+        assert svc.vector_repository.similarity_search.call_count == 1
+
+        await svc._bump_generations("col", ["회원"])
+        await svc.search_rag("col", "q")
+        assert svc.vector_repository.similarity_search.call_count == 2
+        assert not any("*" in k for k in cache.data)
+
+    @pytest.mark.asyncio
+    async def test_graph_results_invalidated_by_scope(self):
+        svc = self._make_service(_FakeRedisCache())
+        await svc.get_screens_by_service("회원")
+        await svc.get_related_screens("col", "로그인")
+        await svc._bump_generations("other", ["주문"])  # 다른 컬렉션/서비스 쓰기
+        await svc.get_screens_by_service("회원")
+        await svc.get_related_screens("col", "로그인")
+        assert svc.vector_repository.get_screens_by_service.call_count == 1
+        assert svc.vector_repository.get_related_screens.call_count == 1
+
+        await svc._bump_generations("col", ["회원", None])
+        await svc.get_screens_by_service("회원")
+        await svc.get_related_screens("col", "로그인")
+        assert svc.vector_repository.get_screens_by_service.call_count == 2
+        assert svc.vector_repository.get_related_screens.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_tiered_incr_refreshes_other_workers_generation(self):
+        import asyncio
+        from app.infra.external.cache.tiered_cache_client import TieredCacheClient
+        data, bus = {}, []
+        worker_a = TieredCacheClient(_FakeRedisCache(data, bus))
+        worker_b = TieredCacheClient(_FakeRedisCache(data, bus))
+        await worker_b.start()
+        await asyncio.sleep(0)
+        await worker_a.incr("rag:gen:collection:col")
+        assert await worker_b.get("rag:gen:collection:col") == "1"  # B의 L1에 적재
+        await worker_a.incr("rag:gen:collection:col")
+        await asyncio.sleep(0.01)
+        assert await worker_b.get("rag:gen:collection:col") == "2"
+        await worker_b.stop()
+
+
+# ──────────────────────────────────────────────
+# 5. 의미 기반 검색 결과 캐시 (numpy 필요)
+# ──────────────────────────────────────────────
+class TestSemanticQueryCache:
+
+    @pytest.fixture(autouse=True)
+    def _numpy(self):
+        pytest.importorskip("numpy", reason="numpy 미설치")
+
+    def test_hit_within_threshold_only(self):
+        from app.core.service.semantic_cache import SemanticQueryCache
+        cache = SemanticQueryCache(threshold=0.95, max_entries=4)
+        cache.store("b", "login screen", [1.0, 0.0, 0.0], ["r1"])
+        results, similarity, cached_query = cache.lookup("b", [0.99, 0.05, 0.0])
+        assert results == ["r1"] and cached_query == "login screen" and similarity > 0.95
+        assert cache.lookup("b", [0.7, 0.7, 0.0]) is None
+        assert cache.lookup("other", [1.0, 0.0, 0.0]) is None
+        assert cache.lookup("b", [1.0, 0.0]) is None  # 차원 불일치
+
+    def test_bounded_ring_buffer_and_buckets(self):
+        from app.core.service.semantic_cache import SemanticQueryCache
+        cache = SemanticQueryCache(threshold=0.99, max_entries=2, max_buckets=1)
+        cache.store("b", "q1", [1.0, 0.0], ["r1"])
+        cache.store("b", "q2", [0.0, 1.0], ["r2"])
+        cache.store("b", "q3", [-1.0, 0.0], ["r3"])  # q1 슬롯 덮어씀
+        assert cache.lookup("b", [1.0, 0.0]) is None
+        assert cache.lookup("b", [0.0, 1.0])[0] == ["r2"]
+        cache.store("c", "q", [1.0, 0.0], ["x"])  # 버킷 1개 한도 → b 제거
+        assert cache.lookup("b", [0.0, 1.0]) is None
+
+    def test_expired_entries_ignored(self, monkeypatch):
+        import app.core.service.semantic_cache as mod
+        now = [100.0]
+        monkeypatch.setattr(mod.time, "monotonic", lambda: now[0])
+        cache = mod.SemanticQueryCache(threshold=0.9, ttl=10)
+        cache.store("b", "q", [1.0, 0.0], ["r"])
+        now[0] += 11
+        assert cache.lookup("b", [1.0, 0.0]) is None
+
+    def _make_service(self):
+        from unittest.mock import AsyncMock
+        from app.core.service.rag_generation_service import RagGenerationService
+        from app.core.service.semantic_cache import SemanticQueryCache
+        svc = object.__new__(RagGenerationService)
+        svc.cache_client = MagicMock()
+        svc.cache_client.get = AsyncMock(return_value=None)
+        svc.cache_client.set = AsyncMock()
+        svc.rerank_client = None
+        svc.semantic_cache = SemanticQueryCache(threshold=0.95)
+        vectors = {"login screen": [1.0, 0.0, 0.0], "log-in page": [0.98, 0.1, 0.0], "결제": [0.0, 1.0, 0.0]}
+        svc.embedding_client = MagicMock()
+        svc.embedding_client.embeddings.embed_query.side_effect = lambda q: vectors[q]
+        svc.vector_repository = MagicMock()
+        svc.vector_repository.similarity_search.return_value = [({"page_content": "로그인", "metadata": {}}, 0.9)]
+        return svc
+
+    @pytest.mark.asyncio
+    async def test_similar_query_served_without_db_search(self):
+        svc = self._make_service()
+        first = await svc.search_rag("col", "login screen")
+        second = await svc.search_rag("col", "log-in page")
+        assert second == first
+        svc.vector_repository.similarity_search.assert_called_once()
+        await svc.search_rag("col", "결제")
+        assert svc.vector_repository.similarity_search.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_sampled_hit_verified_against_fresh_search(self, monkeypatch):
+        import asyncio
+        import app.core.service.rag_generation_service as mod
+        monkeypatch.setattr(mod, "_SEMANTIC_CACHE_SAMPLE_RATE", 1.0)
+        svc = self._make_service()
+        await svc.search_rag("col", "login screen")
+        svc.vector_repository.similarity_search.return_value = [({"page_content": "다른 화면", "metadata": {}}, 0.8)]
+        before = mod.semantic_cache_hit_samples.labels(outcome="mismatch")._value.get()
+        await svc.search_rag("col", "log-in page")
+        await asyncio.gather(*list(mod._background_tasks))
+        assert mod.semantic_cache_hit_samples.labels(outcome="mismatch")._value.get() == before + 1
+
+
+# ──────────────────────────────────────────────
+# 6. 배치 검색 (MGET + 임베딩 1회 + SQL 1회)
+# ──────────────────────────────────────────────
+class TestBatchSearch:
+
+    def _make_service(self, cache):
+        from app.core.service.rag_generation_service import RagGenerationService
+        svc = object.__new__(RagGenerationService)
+        svc.cache_client = cache
+        svc.rerank_client = None
+        svc.embedding_client = MagicMock()
+        svc.embedding_client.embed_queries.side_effect = lambda qs: [[float(len(q))] for q in qs]
+        svc.vector_repository = MagicMock()
+        svc.vector_repository.similarity_search_batch.side_effect = lambda c, embs, *args: [
+            [({"page_content": f"doc{int(e[0])}", "metadata": {}}, 0.9)] for e in embs
+        ]
+        return svc
+
+    @pytest.mark.asyncio
+    async def test_misses_share_one_embedding_and_one_search(self):
+        cache = _FakeRedisCache()
+        svc = self._make_service(cache)
+        await svc.search_rag_batch("col", ["a"])
+        cache.gets = 0
+
+        results = await svc.search_rag_batch("col", ["bb", "a", "ccc", "bb"])
+        assert [r[0][0]["page_content"] for r in results] == ["doc2", "doc1", "doc3", "doc2"]
+        svc.embedding_client.embed_queries.assert_called_with(["bb", "ccc"])
+        assert svc.vector_repository.similarity_search_batch.call_count == 2
+        assert cache.gets == 2  # 세대 번호 GET + 검색 결과 MGET
+
+        await svc.search_rag_batch("col", ["ccc", "bb"])
+        assert svc.vector_repository.similarity_search_batch.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_batch_and_single_search_share_cache_entries(self):
+        cache = _FakeRedisCache()
+        svc = self._make_service(cache)
+        svc.embedding_client.embeddings.embed_query.return_value = [1.0]
+        svc.vector_repository.similarity_search.return_value = [({"page_content": "single", "metadata": {}}, 0.8)]
+        await svc.search_rag("col", "q", k=3)
+        results = await svc.search_rag_batch("col", ["q"], k=3)
+        assert results[0][0][0]["page_content"] == "single"
+        svc.embedding_client.embed_queries.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_tiered_mget_fetches_only_l1_misses(self):
+        from app.infra.external.cache.tiered_cache_client import TieredCacheClient
+        inner = _FakeRedisCache({"b": "2"})
+        cache = TieredCacheClient(inner)
+        await cache.set("a", "1")
+        assert await cache.mget(["a", "b", "c"]) == ["1", "2", None]
+        assert await cache.mget(["a", "b"]) == ["1", "2"]
+        assert inner.gets == 1
+
+    def test_embed_queries_uses_query_task_and_cache_keys(self):
+        from app.infra.external.embedding.cached_embeddings import CachedEmbeddings
+        inner = MagicMock()
+        inner.embed_query.side_effect = lambda text: [0.25, float(len(text))]
+        inner.embed_documents.side_effect = lambda texts, task_type=None: [[0.5, float(len(t))] for t in texts]
+        emb = CachedEmbeddings(inner, "models/test")
+        emb.embed_query("a")
+        assert emb.embed_queries(["a", "bb"]) == [[0.25, 1.0], [0.5, 2.0]]
+        inner.embed_documents.assert_called_once_with(["bb"], task_type="RETRIEVAL_QUERY")
+        assert emb.embed_query("bb") == [0.5, 2.0]
+
+    def test_batch_vector_search_groups_rows_by_query(self):
+        from app.infra.database.pgvectorDB import PGVectorManager
+        mgr = object.__new__(PGVectorManager)
+        cursor = MagicMock()
+        cursor.__enter__ = MagicMock(return_value=cursor)
+        cursor.__exit__ = MagicMock(return_value=False)
+        cursor.fetchall.return_value = [(1, "a", {}, 0.9), (1, "b", {}, 0.8), (3, "c", "{}", 0.7)]
+        mgr.get_cursor = MagicMock(return_value=cursor)
+
+        grouped = mgr.batch_vector_search("col", [[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]], 2, {"service_name": "s"})
+        assert [[r["content"] for r in rows] for rows in grouped] == [["a", "b"], [], ["c"]]
+        assert cursor.execute.call_count == 1
+        sql, params = cursor.execute.call_args[0]
+        assert "LATERAL" in sql and "unnest" in sql
+        assert params[0] == ["[0.1,0.2]", "[0.3,0.4]", "[0.5,0.6]"]
@@ -0,0 +1,1234 @@
+"""수집(ingestion) 경로 단위 테스트 — 배치 저장, DB 연결 없이 mock 커서로 검증"""
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+# --- CI 환경에서 미설치 패키지 사전 Mock ---
+_MOCKS = [
+    "langchain", "langchain.prompts",
+    "langchain_core", "langchain_core.documents",
+    "langchain_google_genai",
+    "sentence_transformers",
+    "PIL", "PIL.Image",
+    # pgvectorDB.py 모듈 레벨 import 대응
+    "sqlalchemy",
+    "sqlalchemy.orm",
+    "sqlalchemy.pool",
+]
+for _m in _MOCKS:
+    sys.modules.setdefault(_m, MagicMock())
+
+
+def _mock_cursor_cm(cursor):
+    cm = MagicMock()
+    cm.__enter__ = MagicMock(return_value=cursor)
+    cm.__exit__ = MagicMock(return_value=False)
+    return cm
+
+
+def _make_docs(n, service="svc"):
+    return [
+        {
+            "page_content": f"화면 {i}",
+            "embedding": [0.1] * 4,
+            "metadata": {"service_name": service, "screen_name": f"screen{i}", "version": "1.0.0"},
+            "image_embedding": None,
+        }
+        for i in range(n)
+    ]
+
+
+# ──────────────────────────────────────────────
+# 1. AgeRepositoryImpl 배치 저장 (단일 트랜잭션)
+# ──────────────────────────────────────────────
+class TestBulkSaveDocuments:
+
+    def _make_repo(self):
+        from app.infra.repository.age_repository_impl import AgeRepositoryImpl
+        from app.infra.database.pgvectorDB import PGVectorManager
+        repo = object.__new__(AgeRepositoryImpl)
+        repo.graph_name = "biz_rag_graph"
+        repo.connection_manager = object.__new__(PGVectorManager)
+        cursor = MagicMock()
+        cursor.fetchall.return_value = []
+        repo.connection_manager.get_cursor = MagicMock(return_value=_mock_cursor_cm(cursor))
+        return repo, cursor
+
+    def test_bulk_uses_single_transaction(self):
+        repo, cursor = self._make_repo()
+        repo._save_documents_bulk("sys01:col", _make_docs(3))
+
+        # 커넥션 체크아웃 1회, LOAD 'age' 1회
+        repo.connection_manager.get_cursor.assert_called_once()
+        sqls = [c[0][0] for c in cursor.execute.call_args_list]
+        assert sum("LOAD 'age'" in s for s in sqls) == 1
+        # Service MERGE 1회 + Screen CREATE 1회 + multi-row INSERT 1회
+        assert sum("UNWIND $rows" in s for s in sqls) == 2
+        inserts = [s for s in sqls if "INSERT INTO rag_embeddings" in s]
+        assert len(inserts) == 1
+        assert inserts[0].count("::vector") == 3  # 행마다 image_embedding 캐스트 1개
+
+    def test_bulk_dedupes_services(self):
+        import json
+        repo, cursor = self._make_repo()
+        repo._save_documents_bulk("col", _make_docs(5))
+
+        service_call = next(c for c in cursor.execute.call_args_list if "MERGE" in c[0][0])
+        rows = json.loads(service_call[0][1][0])["rows"]
+        assert rows == [{"service_name": "svc", "version": "1.0.0"}]
+
+    def test_bulk_uses_safe_label(self):
+        repo, cursor = self._make_repo()
+        repo._save_documents_bulk("sys01:col", _make_docs(1))
+        screen_sql = next(c[0][0] for c in cursor.execute.call_args_list if "MERGE (n:" in c[0][0])
+        assert "`sys01__col`" in screen_sql
+
+    def test_bulk_failure_propagates_for_rollback(self):
+        """배치 도중 실패 시 예외가 get_cursor 컨텍스트로 전파되어 전체 롤백"""
+        repo, cursor = self._make_repo()
+        cursor.execute.side_effect = [None, None, None, RuntimeError("db down")]
+        with pytest.raises(RuntimeError):
+            repo._save_documents_bulk("col", _make_docs(2))
+        cm = repo.connection_manager.get_cursor.return_value
+        exc_type = cm.__exit__.call_args[0][0]
+        assert exc_type is RuntimeError
+
+    def test_save_documents_empty_is_noop(self):
+        repo, _ = self._make_repo()
+        repo.save_documents("col", [])
+        repo.connection_manager.get_cursor.assert_not_called()
+
+
+# ──────────────────────────────────────────────
+# 2. 바이너리 COPY 적재기 인코딩
+# ──────────────────────────────────────────────
+class TestBinaryCopyEncoding:
+
+    def test_halfvec_layout(self):
+        import struct
+        from app.infra.batch.embedding_bulk_loader import encode_halfvec
+        data = encode_halfvec([1.0, -0.5, 0.25])
+        assert len(data) == 4 + 3 * 2
+        assert struct.unpack("!hh3e", data) == (3, 0, 1.0, -0.5, 0.25)
+
+    def test_vector_layout(self):
+        import struct
+        from app.infra.batch.embedding_bulk_loader import encode_vector
+        data = encode_vector([0.5] * 512)
+        assert len(data) == 4 + 512 * 4
+        assert struct.unpack("!hh", data[:4]) == (512, 0)
+
+    def test_jsonb_has_version_byte(self):
+        from app.infra.batch.embedding_bulk_loader import encode_jsonb
+        data = encode_jsonb({"screen_name": "로그인"})
+        assert data[:1] == b"\x01"
+        assert "로그인" in data[1:].decode("utf-8")
+
+    def test_row_null_image_embedding(self):
+        import struct
+        from app.infra.batch.embedding_bulk_loader import encode_row
+        row = encode_row("col", {"page_content": "a", "metadata": {}, "embedding": [0.1, 0.2]})
+        assert struct.unpack("!h", row[:2]) == (8,)
+        # 마지막 필드(image_embedding)는 NULL(-1)
+        assert row[-4:] == struct.pack("!i", -1)
+
+    def test_load_streams_copy_and_merges(self):
+        from app.infra.batch.embedding_bulk_loader import EmbeddingBulkLoader, _COPY_HEADER
+        from app.infra.database.pgvectorDB import PGVectorManager
+        mgr = object.__new__(PGVectorManager)
+        cursor = MagicMock()
+        copy = MagicMock()
+        cursor.copy.return_value = _mock_cursor_cm(copy)
+        mgr.get_cursor = MagicMock(return_value=_mock_cursor_cm(cursor))
+
+        stats = EmbeddingBulkLoader(mgr).load("col", _make_docs(3), rebuild_index=True)
+
+        assert stats["rows"] == 3
+        assert "FORMAT BINARY" in cursor.copy.call_args[0][0]
+        written = b"".join(c[0][0] for c in copy.write.call_args_list)
+        assert written.startswith(_COPY_HEADER)
+        sqls = [c[0][0] for c in cursor.execute.call_args_list]
+        assert any("DROP INDEX" in s for s in sqls)
+        assert any("CREATE TEMP TABLE rag_embeddings_stage" in s for s in sqls)
+        merge = next(s for s in sqls if "INSERT INTO rag_embeddings" in s)
+        assert "to_tsvector('simple', content)" in merge
+        assert "ON CONFLICT (collection_name, screen_key)" in merge
+        assert any("USING hnsw" in s for s in sqls)
+
+    def test_rebuild_index_skipped_on_partitioned_table(self):
+        from app.infra.batch.embedding_bulk_loader import EmbeddingBulkLoader
+        from app.infra.database.pgvectorDB import PGVectorManager
+        mgr = object.__new__(PGVectorManager)
+        cursor = MagicMock()
+        cursor.fetchone.side_effect = [("p",), ("exists",)]  # relkind, 파티션 존재
+        cursor.copy.return_value = _mock_cursor_cm(MagicMock())
+        mgr.get_cursor = MagicMock(return_value=_mock_cursor_cm(cursor))
+
+        # ensure_vector_table 없이 실행되는 CLI도 카탈로그로 파티션 모드를 판별
+        EmbeddingBulkLoader(mgr).load("col", _make_docs(1), rebuild_index=True)
+        sqls = [c[0][0] for c in cursor.execute.call_args_list]
+        assert not any("DROP INDEX" in s for s in sqls)
+        assert any("to_regclass" in s for s in sqls)
+
+
+# ──────────────────────────────────────────────
+# 3. 비동기 수집 잡 큐
+# ──────────────────────────────────────────────
+class _MemoryJobStore:
+    """테스트용 인메모리 JobStore"""
+
+    def __init__(self):
+        self.jobs, self.payloads, self.owners = {}, {}, {}
+
+    async def create(self, job, payload):
+        import copy
+        self.jobs[job["job_id"]] = copy.deepcopy(job)
+        self.payloads[job["job_id"]] = payload
+
+    async def save(self, job):
+        import copy
+        self.jobs[job["job_id"]] = copy.deepcopy(job)
+        if job["status"] not in ("queued", "running"):
+            self.owners.pop(job["job_id"], None)  # 완료 시 실행권 반납
+
+    async def get(self, job_id):
+        import copy
+        return copy.deepcopy(self.jobs.get(job_id))
+
+    async def load_payload(self, job_id):
+        return self.payloads.get(job_id, [])
+
+    async def claim(self, job_id, worker_id, stale_seconds):
+        if job_id in self.owners:
+            return False
+        self.owners[job_id] = worker_id
+        return True
+
+    async def list_recoverable(self, stale_seconds):
+        return [j for j, job in self.jobs.items() if job["status"] == "queued" and j not in self.owners]
+
+
+class TestIngestionJobService:
+
+    def _make(self, errors_by_index=None):
+        from app.core.service.ingestion_job_service import IngestionJobService
+        errors_by_index = errors_by_index or {}
+
+        async def _ingest(collection_name, items, on_progress):
+            for i in range(len(items)):
+                if i in errors_by_index:
+                    await on_progress(i, "failed", errors_by_index[i])
+                else:
+                    await on_progress(i, "analyzed", None)
+            for i in range(len(items)):
+                if i not in errors_by_index:
+                    await on_progress(i, "stored", None)
+
+        rag_service = MagicMock()
+        rag_service.ingest_text_items = _ingest
+        rag_service.ingest_image_items = _ingest
+        store = _MemoryJobStore()
+        return IngestionJobService(rag_service, store), store
+
+    @pytest.mark.asyncio
+    async def test_submit_returns_job_id_and_persists(self):
+        svc, store = self._make()
+        job_id = await svc.submit("text", "col", [{"screen_name": "a"}, {"screen_name": "b"}])
+        job = await svc.get_status(job_id)
+        assert job["status"] == "queued"
+        assert job["total"] == 2
+        assert store.payloads[job_id] == [{"screen_name": "a"}, {"screen_name": "b"}]
+
+    @pytest.mark.asyncio
+    async def test_run_marks_all_items_stored(self):
+        svc, _ = self._make()
+        job_id = await svc.submit("image", "col", [{"filename": "1.png"}, {"filename": "2.png"}])
+        await svc._run(job_id)
+        job = await svc.get_status(job_id)
+        assert job["status"] == "succeeded"
+        assert job["stored"] == 2
+        assert [item["name"] for item in job["items"]] == ["1.png", "2.png"]
+
+    @pytest.mark.asyncio
+    async def test_run_reports_per_item_failures(self):
+        svc, _ = self._make(errors_by_index={1: "JSONDecodeError: bad"})
+        job_id = await svc.submit("text", "col", [{}, {}, {}])
+        await svc._run(job_id)
+        job = await svc.get_status(job_id)
+        assert job["status"] == "partial"
+        assert job["failed"] == 1
+        assert job["items"][1]["error"] == "JSONDecodeError: bad"
+
+    @pytest.mark.asyncio
+    async def test_run_skips_job_claimed_elsewhere(self):
+        svc, store = self._make()
+        job_id = await svc.submit("text", "col", [{}])
+        store.owners[job_id] = "other-worker"
+        await svc._run(job_id)
+        assert (await svc.get_status(job_id))["status"] == "queued"
+
+    @pytest.mark.asyncio
+    async def test_resume_skips_stored_items(self):
+        svc, store = self._make()
+        seen = []
+
+        async def _ingest(collection_name, items, on_progress):
+            seen.extend(items)
+            for i in range(len(items)):
+                await on_progress(i, "stored", None)
+
+        svc.rag_service.ingest_text_items = _ingest
+        job_id = await svc.submit("text", "col", [{"screen_name": "a"}, {"screen_name": "b"}])
+        store.jobs[job_id]["items"][0]["status"] = "stored"
+        await svc._run(job_id)
+        assert seen == [{"screen_name": "b"}]
+        assert (await svc.get_status(job_id))["status"] == "succeeded"
+
+
+# ──────────────────────────────────────────────
+# 4. LLM AIMD 동시성 제한기
+# ──────────────────────────────────────────────
+class TestAdaptiveConcurrencyLlmClient:
+
+    def _limiter(self, initial=4, max_limit=8, latency_target=10.0):
+        from app.infra.external.llm.concurrency_limiter import AdaptiveConcurrencyLimiter
+        return AdaptiveConcurrencyLimiter(initial=initial, min_limit=1, max_limit=max_limit,
+                                          latency_target=latency_target)
+
+    @pytest.mark.asyncio
+    async def test_inflight_never_exceeds_limit(self):
+        import asyncio
+        from app.infra.external.llm.adaptive_llm_client import AdaptiveConcurrencyLlmClient
+        limiter = self._limiter(initial=3, max_limit=3)
+        peak = {"now": 0, "max": 0}
+
+        async def _request(prompt):
+            peak["now"] += 1
+            peak["max"] = max(peak["max"], peak["now"])
+            await asyncio.sleep(0.01)
+            peak["now"] -= 1
+            return "ok"
+
+        inner = MagicMock()
+        inner.async_llm_request = _request
+        client = AdaptiveConcurrencyLlmClient(inner, limiter)
+        results = await asyncio.gather(*[client.async_llm_request("p") for _ in range(20)])
+        assert results == ["ok"] * 20
+        assert peak["max"] <= 3
+
+    @pytest.mark.asyncio
+    async def test_success_grows_limit_additively(self):
+        limiter = self._limiter(initial=2, max_limit=8)
+        for _ in range(4):
+            async with limiter.slot():
+                pass
+        assert limiter.limit == 3
+
+    @pytest.mark.asyncio
+    async def test_throttle_halves_limit_and_retries(self, monkeypatch):
+        import app.infra.external.llm.adaptive_llm_client as mod
+        monkeypatch.setattr(mod, "_BACKOFF_BASE", 0.0)
+        limiter = self._limiter(initial=8)
+        calls = {"n": 0}
+
+        async def _request(prompt):
+            calls["n"] += 1
+            if calls["n"] == 1:
+                raise RuntimeError("429 Resource has been exhausted (e.g. check quota).")
+            return "ok"
+
+        inner = MagicMock()
+        inner.async_llm_request = _request
+        result = await mod.AdaptiveConcurrencyLlmClient(inner, limiter).async_llm_request("p")
+        assert result == "ok"
+        assert calls["n"] == 2
+        assert limiter.limit == 4
+
+    @pytest.mark.asyncio
+    async def test_non_throttle_error_is_not_retried(self):
+        from app.infra.external.llm.adaptive_llm_client import AdaptiveConcurrencyLlmClient
+        limiter = self._limiter(initial=4)
+        inner = MagicMock()
+
+        async def _request(prompt):
+            raise ValueError("invalid prompt")
+
+        inner.async_llm_request = _request
+        with pytest.raises(ValueError):
+            await AdaptiveConcurrencyLlmClient(inner, limiter).async_llm_request("p")
+        assert limiter.limit == 4
+        assert limiter.inflight == 0
+
+
+# ──────────────────────────────────────────────
+# 5. 이미지 분석 결과 캐시 (content-addressed)
+# ──────────────────────────────────────────────
+class TestAnalysisCache:
+
+    def _make_service(self, cached=None):
+        from unittest.mock import AsyncMock
+        from app.core.service.rag_generation_service import RagGenerationService
+        svc = object.__new__(RagGenerationService)
+        svc.analysis_cache = MagicMock()
+        svc.analysis_cache.get = AsyncMock(return_value=cached)
+        svc.analysis_cache.set = AsyncMock()
+        svc.llm_client = MagicMock()
+        svc.llm_client.async_llm_request = AsyncMock(return_value='```json{"screen_analysis": {}}```')
+        return svc
+
+    def _item(self, image_bytes=b"png-bytes", **meta):
+        import base64
+        item = {"service_name": "svc", "screen_name": "로그인", "version": "1.0.0",
+                "access_level": "user", "filename": "a.png",
+                "image": base64.b64encode(image_bytes).decode()}
+        item.update(meta)
+        return item
+
+    @pytest.mark.asyncio
+    async def test_hit_skips_llm(self):
+        svc = self._make_service(cached={"screen_analysis": {"screen_type": "로그인"}})
+        result = await svc._call_llm_with_image(self._item())
+        assert result == {"screen_analysis": {"screen_type": "로그인"}}
+        svc.llm_client.async_llm_request.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_miss_calls_llm_and_stores(self):
+        import hashlib
+        from app.config.prompt import app_analysis_prompt_version
+        svc = self._make_service(cached=None)
+        result = await svc._call_llm_with_image(self._item())
+        assert result == {"screen_analysis": {}}
+        svc.llm_client.async_llm_request.assert_awaited_once()
+        key, image_sha, version, analysis = svc.analysis_cache.set.call_args[0]
+        assert image_sha == hashlib.sha256(b"png-bytes").hexdigest()
+        assert version == app_analysis_prompt_version
+        assert key.startswith(f"{app_analysis_prompt_version}:{image_sha}:")
+
+    def test_key_ignores_filename_but_not_metadata(self):
+        svc = self._make_service()
+        base, _ = svc._analysis_cache_key(self._item())
+        renamed, _ = svc._analysis_cache_key(self._item(filename="other.png"))
+        other_meta, _ = svc._analysis_cache_key(self._item(screen_name="회원가입"))
+        other_image, _ = svc._analysis_cache_key(self._item(image_bytes=b"other"))
+        assert base == renamed
+        assert base != other_meta
+        assert base != other_image
+
+
+# ──────────────────────────────────────────────
+# 6. 토큰 기반 동시 임베딩 배치
+# ──────────────────────────────────────────────
+class TestEmbedInBatches:
+
+    def _make_service(self, embeddings):
+        from app.core.service.rag_generation_service import RagGenerationService
+        svc = object.__new__(RagGenerationService)
+        svc.embedding_client = MagicMock()
+        svc.embedding_client.embeddings = embeddings
+        return svc
+
+    def test_plan_respects_item_and_token_limits(self, monkeypatch):
+        import app.core.service.rag_generation_service as mod
+        monkeypatch.setattr(mod, "_EMBED_BATCH_MAX_ITEMS", 3)
+        monkeypatch.setattr(mod, "_EMBED_BATCH_MAX_TOKENS", 10)
+        texts = ["a"] * 5 + ["x" * 60] + ["b"]
+        batches = mod._plan_embed_batches(texts)
+        assert batches == [[0, 1, 2], [3, 4], [5], [6]]
+
+    def test_async_api_concurrent_and_ordered(self, monkeypatch):
+        import asyncio
+        import app.core.service.rag_generation_service as mod
+        monkeypatch.setattr(mod, "_EMBED_BATCH_MAX_ITEMS", 2)
+
+        class _Emb:
+            in_flight = peak = 0
+
+            async def aembed_documents(self, texts):
+                _Emb.in_flight += 1
+                _Emb.peak = max(_Emb.peak, _Emb.in_flight)
+                await asyncio.sleep(0.01)
+                _Emb.in_flight -= 1
+                return [[float(t)] for t in texts]
+
+        svc = self._make_service(_Emb())
+        texts = [str(i) for i in range(9)]
+        assert svc._embed_in_batches(texts) == [[float(i)] for i in range(9)]
+        assert _Emb.peak > 1
+
+    def test_only_failed_batch_is_retried(self, monkeypatch):
+        import app.core.service.rag_generation_service as mod
+        monkeypatch.setattr(mod, "_EMBED_BATCH_MAX_ITEMS", 1)
+        monkeypatch.setattr(mod.random, "uniform", lambda a, b: 0)
+        calls = []
+
+        def _embed(texts):
+            calls.append(texts[0])
+            if texts[0] == "b" and calls.count("b") == 1:
+                raise RuntimeError("503 unavailable")
+            return [[1.0]]
+
+        embeddings = MagicMock()
+        embeddings.embed_documents.side_effect = _embed
+        svc = self._make_service(embeddings)
+        assert svc._embed_in_batches(["a", "b", "c"]) == [[1.0]] * 3
+        assert sorted(calls) == ["a", "b", "b", "c"]
+
+    def test_exhausted_retries_raise(self, monkeypatch):
+        import app.core.service.rag_generation_service as mod
+        monkeypatch.setattr(mod.random, "uniform", lambda a, b: 0)
+        embeddings = MagicMock()
+        embeddings.embed_documents.side_effect = RuntimeError("boom")
+        svc = self._make_service(embeddings)
+        with pytest.raises(RuntimeError):
+            svc._embed_in_batches(["a"])
+        assert embeddings.embed_documents.call_count == mod._EMBED_MAX_RETRIES + 1
+
+
+# ──────────────────────────────────────────────
+# 7. Vision 분석 전 이미지 전처리
+# ──────────────────────────────────────────────
+class TestImagePreprocessing:
+
+    def _make_service(self):
+        from unittest.mock import AsyncMock
+        from app.core.service.rag_generation_service import RagGenerationService
+        svc = object.__new__(RagGenerationService)
+        svc.image_preprocessor = MagicMock()
+        svc.image_preprocessor.process_item.side_effect = lambda item: {
+            **item, "image": "c21hbGw=", "mime_type": "image/webp", "clip_image": "Y2xpcA==",
+        }
+        svc.analysis_cache = MagicMock()
+        svc.analysis_cache.get = AsyncMock(return_value=None)
+        svc.analysis_cache.set = AsyncMock()
+        svc.llm_client = MagicMock()
+        svc.llm_client.async_llm_request = AsyncMock(return_value='{"screen_analysis": {}}')
+        svc.imageExtractor = MagicMock()
+        svc.imageExtractor.create_column_document.return_value = [MagicMock()]
+        svc.cache_client = MagicMock()
+        svc.cache_client.incr = AsyncMock(return_value=1)
+        svc._insert_to_collection = MagicMock()
+        return svc
+
+    @pytest.mark.asyncio
+    async def test_ingest_uses_preprocessed_and_clip_variant(self):
+        import base64
+        svc = self._make_service()
+        item = {"service_name": "svc", "screen_name": "로그인", "version": "1.0.0", "access_level": "user",
+                "filename": "a.png", "image": base64.b64encode(b"original").decode()}
+        errors = await svc.ingest_image_items("col", [item])
+        assert errors == [None]
+        messages = svc.llm_client.async_llm_request.call_args[0][0]
+        url = messages[-1].content[1]["image_url"]["url"]
+        assert url == "data:image/webp;base64,c21hbGw="
+        assert svc._insert_to_collection.call_args[0][2] == ["Y2xpcA=="]
+
+    def test_create_image_url_prefers_mime_type(self):
+        from app.core.service.rag_generation_service import RagGenerationService
+        svc = object.__new__(RagGenerationService)
+        assert svc._create_image_url("a.png", "xx", "image/webp") == "data:image/webp;base64,xx"
+        assert svc._create_image_url("a.png", "xx") == "data:image/png;base64,xx"
+
+    def test_disabled_or_failed_returns_original(self, monkeypatch):
+        import base64
+        from app.core.service.image_preprocessor import ImagePreprocessor
+        item = {"filename": "a.png", "image": base64.b64encode(b"x").decode()}
+        monkeypatch.setenv("IMAGE_PREPROCESS_ENABLED", "false")
+        assert ImagePreprocessor().process_item(item) is item
+
+        monkeypatch.setenv("IMAGE_PREPROCESS_ENABLED", "true")
+        pre = ImagePreprocessor()
+        pre.process_bytes = MagicMock(side_effect=OSError("cannot identify image file"))
+        assert pre.process_item(item) is item
+
+    def test_real_image_shrinks_and_crops_status_bar(self, monkeypatch):
+        if isinstance(sys.modules.get("PIL.Image"), MagicMock):
+            pytest.skip("Pillow 미설치 (mock)")
+        import base64
+        import io
+        from PIL import Image, ImageDraw
+        from app.core.service.image_preprocessor import ImagePreprocessor
+
+        img = Image.new("RGB", (1080, 2400), (30, 30, 30))
+        ImageDraw.Draw(img).rectangle([0, 100, 1079, 2299], fill=(200, 120, 40))
+        for y in range(100, 2300, 40):
+            ImageDraw.Draw(img).line([0, y, 1079, y], fill=(0, 0, 0))
+        buf = io.BytesIO()
+        img.save(buf, format="PNG")
+        monkeypatch.setenv("IMAGE_MAX_LONG_EDGE", "800")
+
+        out = ImagePreprocessor().process_item({"filename": "a.png", "image": base64.b64encode(buf.getvalue()).decode()})
+        assert out["mime_type"] == "image/webp"
+        processed = Image.open(io.BytesIO(base64.b64decode(out["image"])))
+        assert max(processed.size) == 800
+        assert processed.size[0] > 800 * 1080 / 2400 + 10  # 상·하단 단색 바 크롭 → 세로 비율 감소
+        clip = Image.open(io.BytesIO(base64.b64decode(out["clip_image"])))
+        assert min(clip.size) == 224
+
+
+# ──────────────────────────────────────────────
+# 8. 디렉토리 증분 수집 (manifest.json + 수집 이력)
+# ──────────────────────────────────────────────
+class _MemoryIngestManifest:
+    """IngestManifest 인메모리 대체"""
+
+    def __init__(self):
+        self.rows = {}
+
+    async def load(self, collection_name):
+        return {k: dict(v) for k, v in self.rows.get(collection_name, {}).items()}
+
+    async def record(self, collection_name, entries):
+        for e in entries:
+            self.rows.setdefault(collection_name, {})[e["file_path"]] = {
+                k: e[k] for k in ("sha256", "mtime", "size", "meta_digest")
+            }
+
+
+class TestDirectoryIngestion:
+
+    def _make_service(self, fail_names=()):
+        from unittest.mock import AsyncMock
+        from app.core.service.rag_generation_service import RagGenerationService
+        from app.core.service.data_extractor import ImageExtractor
+        svc = object.__new__(RagGenerationService)
+        svc.imageExtractor = ImageExtractor()
+        svc.ingest_manifest = _MemoryIngestManifest()
+        svc.batches = []
+
+        async def _ingest(collection_name, items):
+            svc.batches.append([item["filename"] for item in items])
+            return [("Error" if item["filename"] in fail_names else None) for item in items]
+
+        svc.ingest_image_items = AsyncMock(side_effect=_ingest)
+        return svc
+
+    def _make_dir(self, tmp_path, n=3):
+        import json
+        for i in range(n):
+            (tmp_path / f"{i}.png").write_bytes(f"image-{i}".encode())
+        (tmp_path / "manifest.json").write_text(json.dumps({
+            "defaults": {"service_name": "svc", "version": "2.0.0", "access_level": "user"},
+            "files": {"0": {"screen_name": "로그인"}},
+        }, ensure_ascii=False), encoding="utf-8")
+        return tmp_path
+
+    @pytest.mark.asyncio
+    async def test_rerun_processes_only_new_or_changed(self, tmp_path):
+        directory = self._make_dir(tmp_path)
+        svc = self._make_service()
+        first = await svc.generation_rag("col", str(directory))
+        assert first == {"scanned": 3, "skipped": 0, "processed": 3, "failed": 0}
+
+        second = await svc.generation_rag("col", str(directory))
+        assert second == {"scanned": 3, "skipped": 3, "processed": 0, "failed": 0}
+
+        (directory / "1.png").write_bytes(b"changed")
+        (directory / "9.png").write_bytes(b"new")
+        third = await svc.generation_rag("col", str(directory))
+        assert third["processed"] == 2
+        assert sorted(svc.batches[-1]) == ["1.png", "9.png"]
+
+    @pytest.mark.asyncio
+    async def test_metadata_from_manifest(self, tmp_path):
+        directory = self._make_dir(tmp_path, n=2)
+        svc = self._make_service()
+        await svc.generation_rag("col", str(directory))
+        items = svc.ingest_image_items.call_args[0][1]
+        assert items[0]["screen_name"] == "로그인"
+        assert items[1]["screen_name"] == ""
+        assert all(item["service_name"] == "svc" and item["version"] == "2.0.0" for item in items)
+
+    @pytest.mark.asyncio
+    async def test_streams_in_bounded_chunks(self, tmp_path, monkeypatch):
+        import app.core.service.rag_generation_service as mod
+        monkeypatch.setattr(mod, "_DIRECTORY_CHUNK_SIZE", 2)
+        directory = self._make_dir(tmp_path, n=5)
+        svc = self._make_service()
+        await svc.generation_rag("col", str(directory))
+        assert [len(b) for b in svc.batches] == [2, 2, 1]
+
+    @pytest.mark.asyncio
+    async def test_failed_files_retried_next_run(self, tmp_path):
+        directory = self._make_dir(tmp_path)
+        fail_names = {"2.png"}
+        svc = self._make_service(fail_names=fail_names)
+        first = await svc.generation_rag("col", str(directory))
+        assert first["failed"] == 1
+        fail_names.clear()
+        second = await svc.generation_rag("col", str(directory))
+        assert second["processed"] == 1
+        assert svc.batches[-1] == ["2.png"]
+
+    @pytest.mark.asyncio
+    async def test_touched_but_unchanged_file_not_reanalyzed(self, tmp_path):
+        import os
+        directory = self._make_dir(tmp_path, n=1)
+        svc = self._make_service()
+        await svc.generation_rag("col", str(directory))
+        os.utime(directory / "0.png", (1_000_000, 1_000_000))
+        result = await svc.generation_rag("col", str(directory))
+        assert result["processed"] == 0 and result["skipped"] == 1
+        assert len(svc.batches) == 1
+
+
+# ──────────────────────────────────────────────
+# 9. 화면 단위 upsert (screen_key + content_hash)
+# ──────────────────────────────────────────────
+class TestScreenUpsert:
+
+    def _make_service(self, changed):
+        from app.core.service.rag_generation_service import RagGenerationService
+        svc = object.__new__(RagGenerationService)
+        svc.vector_repository = MagicMock()
+        svc.vector_repository.find_changed_documents.return_value = changed
+        svc.embedding_client = MagicMock()
+        svc.embedding_client.embeddings.embed_documents.side_effect = lambda texts: [[0.1]] * len(texts)
+        svc.clip_client = MagicMock()
+        svc.clip_client.embed_images_base64.side_effect = lambda imgs: [[0.2]] * len(imgs)
+        return svc
+
+    def _docs(self, n):
+        docs = []
+        for i in range(n):
+            doc = MagicMock()
+            doc.page_content = f"화면 {i}"
+            doc.metadata = {"service_name": "svc", "screen_name": f"s{i}", "version": "1.0.0"}
+            docs.append(doc)
+        return docs
+
+    def test_screen_key_ignores_collection_and_other_metadata(self):
+        from app.infra.database.pgvectorDB import PGVectorManager
+        base = {"service_name": "svc", "screen_name": "로그인", "version": "1.0.0"}
+        assert PGVectorManager.screen_key(base) == PGVectorManager.screen_key({**base, "screen_type": "폼"})
+        assert PGVectorManager.screen_key(base) != PGVectorManager.screen_key({**base, "version": "1.0.1"})
+        # 빈 값은 저장 시 기본값과 같은 키 (SQL 백필식과 동일 규칙)
+        assert PGVectorManager.screen_key({"service_name": "svc", "screen_name": "", "version": "1.0.0"}) == \
+            PGVectorManager.screen_key({"service_name": "svc", "version": "1.0.0"})
+
+    def test_unchanged_screens_skip_embedding(self):
+        svc = self._make_service(changed=[])
+        svc._insert_to_collection("col", self._docs(2), base64_images=["aW1n", "aW1n"])
+        svc.embedding_client.embeddings.embed_documents.assert_not_called()
+        svc.clip_client.embed_images_base64.assert_not_called()
+        svc.vector_repository.save_documents.assert_not_called()
+
+    def test_only_changed_screens_embedded_and_saved(self):
+        svc = self._make_service(changed=[1])
+        svc._insert_to_collection("col", self._docs(3), base64_images=["YQ==", "Yg==", "Yw=="])
+        svc.embedding_client.embeddings.embed_documents.assert_called_once_with(["화면 1"])
+        svc.clip_client.embed_images_base64.assert_called_once_with(["Yg=="])
+        saved = svc.vector_repository.save_documents.call_args[0][1]
+        assert [d["metadata"]["screen_name"] for d in saved] == ["s1"]
+        assert saved[0]["image_sha256"]
+
+    def test_find_changed_compares_content_hash(self):
+        from app.infra.repository.age_repository_impl import AgeRepositoryImpl
+        from app.infra.database.pgvectorDB import PGVectorManager
+        repo = object.__new__(AgeRepositoryImpl)
+        repo.connection_manager = MagicMock()
+        docs = [{"page_content": f"화면 {i}", "metadata": {"service_name": "svc", "screen_name": f"s{i}"}}
+                for i in range(3)]
+        repo.connection_manager.get_content_hashes.return_value = {
+            PGVectorManager.screen_key(docs[0]["metadata"]): PGVectorManager.content_hash(docs[0]),
+            PGVectorManager.screen_key(docs[1]["metadata"]): "stale",
+        }
+        assert repo.find_changed_documents("col", docs) == [1, 2]
+
+    def test_bulk_upsert_collapses_duplicate_screens(self):
+        import json
+        from app.infra.repository.age_repository_impl import AgeRepositoryImpl
+        from app.infra.database.pgvectorDB import PGVectorManager
+        repo = object.__new__(AgeRepositoryImpl)
+        repo.graph_name = "biz_rag_graph"
+        repo.connection_manager = object.__new__(PGVectorManager)
+        cursor = MagicMock()
+        cursor.fetchall.return_value = []
+        repo.connection_manager.get_cursor = MagicMock(return_value=_mock_cursor_cm(cursor))
+
+        docs = _make_docs(2)
+        docs[1]["metadata"] = dict(docs[0]["metadata"])
+        docs[1]["page_content"] = "갱신된 화면"
+        repo._save_documents_bulk("col", docs)
+
+        calls = cursor.execute.call_args_list
+        screen_call = next(c for c in calls if "MERGE (n:" in c[0][0])
+        rows = json.loads(screen_call[0][1][0])["rows"]
+        assert [r["content"] for r in rows] == ["갱신된 화면"]
+        insert_sql = next(c[0][0] for c in calls if "INSERT INTO rag_embeddings" in c[0][0])
+        assert "ON CONFLICT (collection_name, screen_key) DO UPDATE" in insert_sql
+        assert insert_sql.count("::vector") == 1
+
+    def test_dedupe_keeps_keyed_or_newest_vertex(self):
+        from app.infra.batch.screen_dedupe import ScreenDedupe
+        from app.infra.database.pgvectorDB import PGVectorManager
+        meta = {"service_name": "svc", "screen_name": "로그인", "version": "1.0.0"}
+        key = PGVectorManager.screen_key(meta)
+        import json as _json
+        vertices = [
+            {"id": 1, "properties": {"metadata": _json.dumps(meta)}},
+            {"id": 2, "properties": {"metadata": _json.dumps(meta), "screen_key": key}},
+            {"id": 3, "properties": {"metadata": _json.dumps(meta)}},
+            {"id": 4, "properties": {"metadata": _json.dumps({**meta, "screen_name": "가입"})}},
+        ]
+        repo = MagicMock()
+        repo.connection_manager.get_cursor.return_value = _mock_cursor_cm(MagicMock())
+        repo._run_cypher.side_effect = lambda cursor, query, params=None: vertices if params is None else []
+
+        stats = ScreenDedupe(repo).run("col")
+        assert stats == {"scanned": 4, "deleted": 2, "keyed": 1}
+        delete_params = next(c[0][2] for c in repo._run_cypher.call_args_list if "DETACH DELETE" in c[0][1])
+        assert sorted(delete_params["ids"]) == [1, 3]
+
+    def _make_manager(self, *fetchone):
+        from app.infra.database.pgvectorDB import PGVectorManager
+        mgr = object.__new__(PGVectorManager)
+        cursor = MagicMock()
+        cursor.fetchone.side_effect = list(fetchone)
+        mgr.get_cursor = MagicMock(return_value=_mock_cursor_cm(cursor))
+        return mgr, cursor
+
+    def test_startup_creates_index_without_touching_rows(self):
+        mgr, cursor = self._make_manager((None,), (False,))
+        mgr._ensure_screen_key_index(cursor)
+        sqls = [c[0][0] for c in cursor.execute.call_args_list]
+        assert mgr.SCREEN_KEY_INDEX_SQL in sqls
+        assert not any("DELETE" in s or "UPDATE" in s for s in sqls)
+
+    def test_startup_skips_index_when_backfill_pending(self):
+        mgr, cursor = self._make_manager((None,), (True,))
+        assert mgr._ensure_screen_key_index(cursor) == "screen_key_backfill_required"
+        assert mgr.SCREEN_KEY_INDEX_SQL not in [c[0][0] for c in cursor.execute.call_args_list]
+
+    def test_startup_fails_after_committing_columns_when_index_blocked(self):
+        # to_regclass(rag_embeddings), 인덱스 없음, 미백필 행 있음, relkind
+        mgr, cursor = self._make_manager(("rag_embeddings",), (None,), (True,), ("r",))
+        cm = mgr.get_cursor.return_value
+        with pytest.raises(RuntimeError, match="screen_dedupe --table"):
+            mgr.ensure_vector_table()
+        cm.__exit__.assert_called_once_with(None, None, None)  # 컬럼 추가 트랜잭션은 정상 종료(커밋) 후 중단
+        sqls = [c[0][0] for c in cursor.execute.call_args_list]
+        assert any("ADD COLUMN IF NOT EXISTS screen_key" in s for s in sqls)
+        assert mgr.SCREEN_KEY_INDEX_SQL not in sqls
+
+    def test_duplicates_rollback_index_savepoint(self):
+        mgr, cursor = self._make_manager((None,), (False,))
+
+        def _execute(sql, params=None):
+            if sql == mgr.SCREEN_KEY_INDEX_SQL:
+                raise RuntimeError("could not create unique index")
+
+        cursor.execute.side_effect = _execute
+        assert mgr._ensure_screen_key_index(cursor) == "duplicate_screens"
+        sqls = [c[0][0] for c in cursor.execute.call_args_list]
+        assert sqls[-1] == "ROLLBACK TO SAVEPOINT screen_key_index"
+
+    def test_table_dedupe_dry_run_changes_nothing(self):
+        from app.infra.batch.screen_dedupe import EmbeddingScreenDedupe
+        mgr, cursor = self._make_manager((4,), (2,))
+        stats = EmbeddingScreenDedupe(mgr).run(dry_run=True)
+        assert stats == {"unkeyed": 4, "keyed": 0, "duplicates": 2, "deleted": 0}
+        assert all(c[0][0].strip().startswith("SELECT") for c in cursor.execute.call_args_list)
+
+    def test_table_dedupe_backfills_deletes_then_indexes(self):
+        from app.infra.batch.screen_dedupe import EmbeddingScreenDedupe
+        mgr, cursor = self._make_manager((2,), (1,))
+        cursor.fetchall.side_effect = [[(3,), (8,)], []]
+        cursor.rowcount = 1
+        stats = EmbeddingScreenDedupe(mgr).run(batch_size=2)
+        assert stats == {"unkeyed": 2, "keyed": 2, "duplicates": 1, "deleted": 1}
+        sqls = [c[0][0] for c in cursor.execute.call_args_list]
+        delete_at = next(i for i, s in enumerate(sqls) if "DELETE FROM rag_embeddings" in s)
+        assert sqls[delete_at - 1].startswith("LOCK TABLE rag_embeddings")
+        assert sqls[-1] == mgr.SCREEN_KEY_INDEX_SQL
+
+
+# ──────────────────────────────────────────────
+# 10. NDJSON 스트리밍 텍스트 수집
+# ──────────────────────────────────────────────
+class TestNdjsonTextStream:
+
+    async def _stream(self, *chunks):
+        for chunk in chunks:
+            yield chunk
+
+    def _make_service(self, fail_screens=()):
+        from unittest.mock import AsyncMock
+        from app.core.service.rag_generation_service import RagGenerationService
+        svc = object.__new__(RagGenerationService)
+        svc.chunks = []
+
+        async def _ingest(collection_name, items):
+            svc.chunks.append([item["screen_name"] for item in items])
+            return [("boom" if item["screen_name"] in fail_screens else None) for item in items]
+
+        svc.ingest_text_items = AsyncMock(side_effect=_ingest)
+        return svc
+
+    async def _collect(self, svc, *chunks):
+        return [r async for r in svc.ingest_text_stream("col", self._stream(*chunks))]
+
+    @pytest.mark.asyncio
+    async def test_records_split_across_chunks(self):
+        svc = self._make_service()
+        results = await self._collect(
+            svc,
+            b'{"screen_name": "a", "text_content": "\xeb\xa1\x9c',  # "로그인" UTF-8 중간에서 분할
+            b'\xea\xb7\xb8\xec\x9d\xb8"}\n{"screen_name": "b", "text_content": "t"}',
+        )
+        assert [r.get("status") for r in results[:-1]] == ["stored", "stored"]
+        assert svc.ingest_text_items.call_args[0][1][0]["text_content"] == "로그인"
+        assert results[-1] == {"summary": {"records": 2, "stored": 2, "failed": 0, "invalid": 0}}
+
+    @pytest.mark.asyncio
+    async def test_invalid_lines_reported_without_stopping(self):
+        svc = self._make_service()
+        results = await self._collect(
+            svc, b'not json\n\n{"screen_name": "x"}\n[1]\n{"screen_name": "ok", "text_content": "t"}\n'
+        )
+        by_line = {r["line"]: r["status"] for r in results if "line" in r}
+        assert by_line == {1: "invalid", 3: "invalid", 4: "invalid", 5: "stored"}
+        assert svc.chunks == [["ok"]]
+
+    @pytest.mark.asyncio
+    async def test_bounded_chunks_and_per_record_failures(self, monkeypatch):
+        import json
+        import app.core.service.rag_generation_service as mod
+        monkeypatch.setattr(mod, "_NDJSON_CHUNK_SIZE", 2)
+        svc = self._make_service(fail_screens=("s3",))
+        body = "".join(json.dumps({"screen_name": f"s{i}", "text_content": "t"}) + "\n" for i in range(5))
+        results = await self._collect(svc, body.encode())
+        assert svc.chunks == [["s0", "s1"], ["s2", "s3"], ["s4"]]
+        failed = [r for r in results if r.get("status") == "failed"]
+        assert [r["line"] for r in failed] == [4]
+        assert results[-1]["summary"]["stored"] == 4
+
+    @pytest.mark.asyncio
+    async def test_oversized_line_is_invalid(self, monkeypatch):
+        import app.core.service.rag_generation_service as mod
+        monkeypatch.setattr(mod, "_NDJSON_MAX_LINE_BYTES", 16)
+        svc = self._make_service()
+        results = await self._collect(svc, b'{"text_content": "' + b"x" * 40, b'"}\n{"text_content": "t"}\n')
+        assert [r.get("status") for r in results[:-1]] == ["invalid", "stored"]
+
+
+# ──────────────────────────────────────────────
+# 11. 사전 분석 결과 직접 수집 (LLM 생략)
+# ──────────────────────────────────────────────
+class TestDirectAnalysisIngest:
+
+    def _make_service(self):
+        from unittest.mock import AsyncMock
+        from app.core.service.data_extractor import ImageExtractor
+        from app.core.service.rag_generation_service import RagGenerationService
+        svc = object.__new__(RagGenerationService)
+        svc.imageExtractor = ImageExtractor()
+        svc.llm_client = MagicMock()
+        svc.cache_client = MagicMock()
+        svc.cache_client.incr = AsyncMock(return_value=1)
+        svc._insert_to_collection = MagicMock()
+        return svc
+
+    def _minimal(self, screen_name="로그인"):
+        from app.api.model.request.rag_request import ScreenAnalysisDocument
+        return ScreenAnalysisDocument.model_validate({
+            "input_metadata": {"service_name": "회원", "screen_name": screen_name},
+            "screen_analysis": {"screen_type": "로그인", "primary_purpose": "사용자 인증"},
+        }).model_dump()
+
+    @pytest.mark.asyncio
+    async def test_defaults_satisfy_document_builder_without_llm(self):
+        svc = self._make_service()
+        errors = await svc.ingest_analysis_items("col", [self._minimal("로그인"), self._minimal("회원가입")])
+        assert errors == [None, None]
+        svc.llm_client.async_llm_request.assert_not_called()
+        collection, documents, images = svc._insert_to_collection.call_args[0]
+        assert collection == "col" and len(documents) == 2 and images is None
+        incremented = [c.args[0] for c in svc.cache_client.incr.await_args_list]
+        assert incremented == ["rag:gen:collection:col", "rag:gen:service:회원"]
+
+    def test_schema_rejects_missing_required_sections(self):
+        from pydantic import ValidationError
+        from app.api.model.request.rag_request import RAGAnalysisIngestRequest
+        with pytest.raises(ValidationError) as exc:
+            RAGAnalysisIngestRequest.model_validate({
+                "collection_name": "col",
+                "analyses": [{"input_metadata": {"service_name": "s", "screen_name": "a"},
+                              "extracted_elements": {"button_texts": "확인"}}],
+            })
+        locations = {tuple(err["loc"]) for err in exc.value.errors()}
+        assert ("analyses", 0, "screen_analysis") in locations
+        assert ("analyses", 0, "extracted_elements", "button_texts") in locations
+
+
+# ──────────────────────────────────────────────
+# 12. 다중 화면 묶음 Vision 요청
+# ──────────────────────────────────────────────
+class TestVisionPacking:
+
+    def _make_service(self, responses, cached=None):
+        from unittest.mock import AsyncMock
+        from app.core.service.rag_generation_service import RagGenerationService
+        svc = object.__new__(RagGenerationService)
+        cached = cached or {}
+        svc.analysis_cache = MagicMock()
+        svc.analysis_cache.get = AsyncMock(side_effect=lambda key: cached.get(key.split(":")[1]))
+        svc.analysis_cache.set = AsyncMock()
+        svc.llm_client = MagicMock()
+        svc.llm_client.async_llm_request = AsyncMock(side_effect=responses)
+        return svc
+
+    def _items(self, n):
+        import base64
+        return [{"service_name": "svc", "screen_name": f"s{i}", "version": "1.0.0", "access_level": "user",
+                 "filename": f"{i}.png", "image": base64.b64encode(f"img{i}".encode()).decode()}
+                for i in range(n)]
+
+    def _analysis(self, index=None, screen_name="x"):
+        analysis = {"input_metadata": {"service_name": "?", "screen_name": screen_name},
+                    "screen_analysis": {"screen_type": "기타"}}
+        if index is not None:
+            analysis["screen_index"] = index
+        return analysis
+
+    @pytest.mark.asyncio
+    async def test_one_request_per_pack_mapped_by_screen_index(self, monkeypatch):
+        import json
+        import app.core.service.rag_generation_service as mod
+        monkeypatch.setattr(mod, "_VISION_PACK_SIZE", 3)
+        pack = [self._analysis(3), self._analysis(1), self._analysis(2)]
+        svc = self._make_service([json.dumps(pack)])
+        results = await svc._analyze_packed(self._items(3))
+        svc.llm_client.async_llm_request.assert_awaited_once()
+        assert [r["input_metadata"]["screen_name"] for r in results] == ["s0", "s1", "s2"]
+        assert all("screen_index" not in r and r["input_metadata"]["service_name"] == "svc" for r in results)
+        assert svc.analysis_cache.set.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_missing_items_fall_back_to_single_calls(self, monkeypatch):
+        import json
+        import app.core.service.rag_generation_service as mod
+        monkeypatch.setattr(mod, "_VISION_PACK_SIZE", 3)
+        pack = [self._analysis(1), {"screen_index": 2, "oops": True}]
+        single = json.dumps(self._analysis(screen_name="single"))
+        svc = self._make_service([json.dumps(pack), single, single])
+        results = await svc._analyze_packed(self._items(3))
+        assert svc.llm_client.async_llm_request.await_count == 3
+        assert results[0]["input_metadata"]["screen_name"] == "s0"
+        assert results[1]["input_metadata"]["screen_name"] == "single"
+
+    @pytest.mark.asyncio
+    async def test_unparsable_pack_and_cache_hits(self, monkeypatch):
+        import json
+        import app.core.service.rag_generation_service as mod
+        monkeypatch.setattr(mod, "_VISION_PACK_SIZE", 2)
+        import hashlib
+        hit = {"cached": True}
+        cached = {hashlib.sha256(b"img0").hexdigest(): hit}
+        single = json.dumps(self._analysis())
+        svc = self._make_service(["not json", single, single], cached=cached)
+        results = await svc._analyze_packed(self._items(3))
+        assert results[0] is hit
+        # 캐시 미스 2건 → 묶음 1회(파싱 실패) + 단일 호출 2회
+        assert svc.llm_client.async_llm_request.await_count == 3
+        assert all(not isinstance(r, Exception) for r in results)
+
+
+# ──────────────────────────────────────────────
+# 13. 단계별 체크포인트 + 잡 재개
+# ──────────────────────────────────────────────
+class _MemoryCheckpoint:
+    """테스트용 인메모리 IngestCheckpoint"""
+
+    def __init__(self):
+        self.rows, self.cleared = {}, []
+
+    async def load(self, job_id):
+        return {i: dict(row) for (j, i), row in self.rows.items() if j == job_id}
+
+    async def save_analyses(self, job_id, analyses):
+        for i, analysis in analyses.items():
+            self.rows[(job_id, i)] = {"stage": "analyzed", "analysis": analysis,
+                                      "embedding": None, "image_embedding": None}
+
+    async def save_embeddings(self, job_id, embeddings):
+        for i, emb in embeddings.items():
+            self.rows[(job_id, i)].update(stage="embedded", **emb)
+
+    async def mark_stored(self, job_id, item_indices):
+        for i in item_indices:
+            self.rows[(job_id, i)].update(stage="stored", embedding=None, image_embedding=None)
+
+    async def clear(self, job_id):
+        self.cleared.append(job_id)
+        self.rows = {k: v for k, v in self.rows.items() if k[0] != job_id}
+
+
+class _FakeAsyncRedis:
+    """테스트용 redis.asyncio 대체 — RedisJobStore가 쓰는 명령과 키 TTL만 흉내냅니다."""
+
+    def __init__(self):
+        self.values, self.sets, self.ttls = {}, {}, {}
+
+    def pipeline(self):
+        redis = self
+
+        class _Pipeline:
+            def __init__(self):
+                self.calls = []
+
+            def __getattr__(self, name):
+                return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+            async def execute(self):
+                return [await getattr(redis, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+        return _Pipeline()
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        self.ttls.pop(key, None)
+        if ex:
+            self.ttls[key] = ex
+        return True
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def exists(self, key):
+        return int(key in self.values)
+
+    async def delete(self, key):
+        self.ttls.pop(key, None)
+        return int(self.values.pop(key, None) is not None)
+
+    async def expire(self, key, seconds):
+        if key not in self.values:
+            return False
+        self.ttls[key] = seconds
+        return True
+
+    async def persist(self, key):
+        return self.ttls.pop(key, None) is not None
+
+    async def sadd(self, key, member):
+        self.sets.setdefault(key, set()).add(member)
+
+    async def srem(self, key, member):
+        self.sets.get(key, set()).discard(member)
+
+    async def sismember(self, key, member):
+        return member in self.sets.get(key, set())
+
+    async def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+
+class TestCheckpointedIngestion:
+
+    def _make_rag_service(self):
+        from unittest.mock import AsyncMock
+        from app.core.service.rag_generation_service import RagGenerationService
+        svc = object.__new__(RagGenerationService)
+        svc.imageExtractor = MagicMock()
+        svc.imageExtractor.create_column_document.side_effect = lambda results: [
+            MagicMock(page_content=r["screen_analysis"]["primary_purpose"], metadata={}) for r in results]
+        svc._response_llm_text_data = AsyncMock(
+            side_effect=lambda item: {"input_metadata": {}, "screen_analysis": {"primary_purpose": "p"}})
+        svc.cache_client = MagicMock()
+        svc.cache_client.incr = AsyncMock(return_value=1)
+        svc.clip_client = None
+        svc.vector_repository = MagicMock()
+        svc.vector_repository.find_changed_documents.side_effect = lambda c, docs: list(range(len(docs)))
+        svc.vector_repository.collection_exists.return_value = True
+        svc._embed_in_batches = MagicMock(side_effect=lambda texts: [[0.5, 0.5] for _ in texts])
+        return svc
+
+    def _make_job_service(self, rag_service):
+        from app.core.service.ingestion_job_service import IngestionJobService
+        store, checkpoint = _MemoryJobStore(), _MemoryCheckpoint()
+        return IngestionJobService(rag_service, store, checkpoint), store, checkpoint
+
+    @pytest.mark.asyncio
+    async def test_resume_after_store_failure_reuses_analysis_and_embeddings(self):
+        svc = self._make_rag_service()
+        svc.vector_repository.save_documents.side_effect = [RuntimeError("db down"), None]
+        jobs, store, checkpoint = self._make_job_service(svc)
+
+        items = [{"service_name": "s", "screen_name": f"s{i}", "version": "1", "access_level": "",
+                  "text_content": "t"} for i in range(3)]
+        job_id = await jobs.submit("text", "col", items)
+        await jobs._run(job_id)
+        job = await jobs.get_status(job_id)
+        assert job["status"] == "failed"
+        assert {row["stage"] for row in checkpoint.rows.values()} == {"embedded"}
+        assert svc._response_llm_text_data.await_count == 3
+
+        assert (await jobs.resume(job_id))["status"] == "queued"
+        await jobs._run(job_id)
+        job = await jobs.get_status(job_id)
+        assert job["status"] == "succeeded"
+        assert svc._response_llm_text_data.await_count == 3  # LLM 재호출 없음
+        svc._embed_in_batches.assert_called_once()  # 임베딩 재계산 없음
+        saved = svc.vector_repository.save_documents.call_args[0][1]
+        assert [doc["embedding"] for doc in saved] == [[0.5, 0.5]] * 3
+        assert checkpoint.cleared == [job_id]
+
+    @pytest.mark.asyncio
+    async def test_resumed_job_is_reclaimable_in_redis_store(self):
+        from app.core.service.ingestion_job_service import IngestionJobService
+        from app.infra.external.cache.redis_job_store import RedisJobStore, _ACTIVE_SET
+        svc = self._make_rag_service()
+        svc.vector_repository.save_documents.side_effect = [RuntimeError("db down"), None]
+        redis = _FakeAsyncRedis()
+        store = object.__new__(RedisJobStore)
+        store._redis, store._stale_seconds = redis, 300
+        jobs = IngestionJobService(svc, store, _MemoryCheckpoint())
+
+        job_id = await jobs.submit("text", "col", [{"service_name": "s", "screen_name": "a", "version": "1",
+                                                    "access_level": "", "text_content": "t"}])
+        await jobs._run(job_id)
+        assert (await jobs.get_status(job_id))["status"] == "failed"
+        assert job_id not in redis.sets[_ACTIVE_SET]
+        assert f"rag:job:{job_id}:payload" in redis.ttls
+
+        # 재개 시 활성 집합 재등록 + 보관 TTL 해제 → 복구 대상이 되고 실행권 획득 가능
+        await jobs.resume(job_id)
+        assert job_id in redis.sets[_ACTIVE_SET]
+        assert f"rag:job:{job_id}" not in redis.ttls
+        assert f"rag:job:{job_id}:payload" not in redis.ttls
+        assert await store.list_recoverable(300) == [job_id]
+        await jobs._run(job_id)
+        assert (await jobs.get_status(job_id))["status"] == "succeeded"
+        assert svc.vector_repository.save_documents.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_only_unfinished_items_are_reanalyzed(self):
+        svc = self._make_rag_service()
+        jobs, store, checkpoint = self._make_job_service(svc)
+        job_id = await jobs.submit("text", "col", [{"screen_name": "a", "service_name": "s", "version": "1",
+                                                    "access_level": "", "text_content": "t"}] * 3)
+        job = store.jobs[job_id]
+        job["status"] = "partial"
+        job["items"][0]["status"] = "stored"
+        job["items"][1]["status"] = "failed"
+        await checkpoint.save_analyses(job_id, {2: {"input_metadata": {}, "screen_analysis": {"primary_purpose": "x"}}})
+
+        await jobs.resume(job_id)
+        await jobs._run(job_id)
+        # 항목 1만 LLM 분석, 항목 2는 체크포인트 분석 재사용, 항목 0은 제외
+        assert svc._response_llm_text_data.await_count == 1
+        texts = svc._embed_in_batches.call_args[0][0]
+        assert sorted(texts) == ["p", "x"]
+        assert (await jobs.get_status(job_id))["status"] == "succeeded"
+
+    @pytest.mark.asyncio
+    async def test_resume_rejects_running_or_succeeded_jobs(self):
+        jobs, store, _ = self._make_job_service(MagicMock())
+        job_id = await jobs.submit("text", "col", [{}])
+        store.jobs[job_id]["status"] = "succeeded"
+        assert (await jobs.resume(job_id))["status"] == "succeeded"
+        assert jobs._queue.qsize() == 1  # submit 시 등록분만
+        assert await jobs.resume("missing") is None
@@ -29,6 +29,8 @@ for _m in _MOCKS:
 # PIL.Image.open mock
 pil_mock = sys.modules["PIL.Image"]
 pil_mock.open.return_value = MagicMock()
+pil_mock.open.return_value.convert.return_value.size = (1080, 2400)
+sys.modules["PIL"].Image = pil_mock  # `from PIL import Image`가 같은 mock을 보도록 연결
 
 
 # ──────────────────────────────────────────────
@@ -87,6 +89,41 @@ class TestClipEmbeddingClientInterface:
         assert result == fake_vector
         ClipEmbeddingClient._model = None  # 초기화
 
+    def test_embed_images_base64_single_encode_call(self):
+        import base64
+        from app.infra.external.embedding.clip_embedding_client import ClipEmbeddingClient
+        client = ClipEmbeddingClient()
+
+        arrays = []
+        for i in range(3):
+            arr = MagicMock()
+            arr.tolist.return_value = [float(i)] * 512
+            arrays.append(arr)
+        mock_model = MagicMock()
+        mock_model.encode.return_value = arrays
+        ClipEmbeddingClient._model = mock_model
+
+        b64s = [base64.b64encode(f"img{i}".encode()).decode() for i in range(3)]
+        result = client.embed_images_base64(b64s)
+        assert result == [[0.0] * 512, [1.0] * 512, [2.0] * 512]
+        mock_model.encode.assert_called_once()
+        images, = mock_model.encode.call_args[0]
+        assert len(images) == 3
+        assert "batch_size" in mock_model.encode.call_args[1]
+        ClipEmbeddingClient._model = None  # 초기화
+
+    def test_interface_default_batch_loops_single(self):
+        from app.core.interface.multimodal_embedding_client import MultimodalEmbeddingClient
+
+        class _Single(MultimodalEmbeddingClient):
+            def embed_text(self, text):
+                return [0.0]
+
+            def embed_image_base64(self, base64_str):
+                return [float(len(base64_str))]
+
+        assert _Single().embed_images_base64(["a", "bbb"]) == [[1.0], [3.0]]
+
 
 # ──────────────────────────────────────────────
 # 2. pgvectorDB _visual_search / search_similar 분기
@@ -107,7 +144,7 @@ class TestPGVectorVisualSearch:
                 "col", None, k=3, search_mode="visual",
                 image_embedding=[0.1] * 512
             )
-        mock_vs.assert_called_once_with("col", [0.1] * 512, 3, None)
+        mock_vs.assert_called_once_with("col", [0.1] * 512, 3, None, None)
         assert result == fake_result
 
     def test_search_similar_visual_without_embedding_falls_back_to_vector(self):
@@ -175,6 +212,7 @@ class TestRagGenerationServiceVisual:
         svc.vector_repository.similarity_search.return_value = [
             ({"page_content": "로그인 화면", "metadata": {}}, 0.88)
         ]
+        svc.vector_repository.find_changed_documents.side_effect = lambda c, docs: list(range(len(docs)))
         return svc
 
     @pytest.mark.asyncio
@@ -200,18 +238,18 @@ class TestRagGenerationServiceVisual:
     @pytest.mark.asyncio
     async def test_search_by_image(self):
         svc = self._make_service()
-        svc.clip_client.embed_image_base64.return_value = [0.5] * 512
+        svc.clip_client.embed_images_base64.return_value = [[0.5] * 512]
         import base64
         dummy_b64 = base64.b64encode(b"fake_image").decode()
         results = await svc.search_by_image("col", dummy_b64, k=2)
-        svc.clip_client.embed_image_base64.assert_called_once_with(dummy_b64)
+        svc.clip_client.embed_images_base64.assert_called_once_with([dummy_b64])
         svc.vector_repository.similarity_search.assert_called_once()
         assert len(results) == 1
 
     def test_insert_to_collection_calls_clip_for_images(self):
         svc = self._make_service()
         svc.embedding_client.embeddings.embed_documents.return_value = [[0.1] * 3072]
-        svc.clip_client.embed_image_base64.return_value = [0.2] * 512
+        svc.clip_client.embed_images_base64.return_value = [[0.2] * 512]
         svc.vector_repository.collection_exists.return_value = False
         svc.vector_repository.save_documents.return_value = None
 
@@ -223,7 +261,7 @@ class TestRagGenerationServiceVisual:
         b64 = base64.b64encode(b"image_data").decode()
         svc._insert_to_collection("col", [doc], base64_images=[b64])
 
-        svc.clip_client.embed_image_base64.assert_called_once_with(b64)
+        svc.clip_client.embed_images_base64.assert_called_once_with([b64])
         saved = svc.vector_repository.save_documents.call_args[0][1]
         assert saved[0]["image_embedding"] == [0.2] * 512
 
@@ -0,0 +1,458 @@
+"""검색 경로 단위 테스트 — 정확도 프로파일 등 검색 SQL 튜닝, DB 연결 없이 mock 커서로 검증"""
+import sys
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+# --- CI 환경에서 미설치 패키지 사전 Mock ---
+_MOCKS = [
+    "langchain", "langchain.prompts",
+    "langchain_core", "langchain_core.documents",
+    "langchain_google_genai",
+    "sqlalchemy",
+    "sqlalchemy.orm",
+    "sqlalchemy.pool",
+]
+for _m in _MOCKS:
+    sys.modules.setdefault(_m, MagicMock())
+
+
+def _make_manager(rows=None, extversion="0.8.0"):
+    """실제 DB 연결 없이 PGVectorManager + mock 커서 생성"""
+    from app.infra.database.pgvectorDB import PGVectorManager
+    mgr = object.__new__(PGVectorManager)
+    cursor = MagicMock()
+    cursor.fetchone.return_value = (extversion,)
+    cursor.fetchall.return_value = rows or []
+    cm = MagicMock()
+    cm.__enter__ = MagicMock(return_value=cursor)
+    cm.__exit__ = MagicMock(return_value=False)
+    mgr.get_cursor = MagicMock(return_value=cm)
+    return mgr, cursor
+
+
+def _executed(cursor):
+    return [(c[0][0], c[0][1] if len(c[0]) > 1 else None) for c in cursor.execute.call_args_list]
+
+
+# ──────────────────────────────────────────────
+# 1. 검색 정확도 프로파일 (hnsw.ef_search / iterative_scan)
+# ──────────────────────────────────────────────
+class TestSearchAccuracyProfile:
+
+    @pytest.fixture(autouse=True)
+    def _reset_version_probe(self):
+        from app.infra.database.pgvectorDB import PGVectorManager
+        PGVectorManager._iterative_scan_supported = None
+        yield
+        PGVectorManager._iterative_scan_supported = None
+
+    def test_balanced_sets_ef_search_and_iterative_scan_before_query(self):
+        mgr, cursor = _make_manager()
+        mgr._vector_search("col", [0.1], 20, {"service_name": "s"}, "balanced")
+        executed = _executed(cursor)
+        assert ("SELECT set_config('hnsw.ef_search', %s, true)", ("100",)) in executed
+        assert ("SELECT set_config('hnsw.iterative_scan', %s, true)", ("strict_order",)) in executed
+        assert "FROM rag_embeddings" in executed[-1][0]  # 설정은 같은 트랜잭션의 검색 전에 적용
+
+    def test_ef_search_never_below_k(self):
+        mgr, cursor = _make_manager()
+        mgr._vector_search("col", [0.1], 300, None, "fast")
+        assert ("SELECT set_config('hnsw.ef_search', %s, true)", ("300",)) in _executed(cursor)
+
+    def test_iterative_scan_skipped_before_pgvector_08(self):
+        mgr, cursor = _make_manager(extversion="0.7.4")
+        mgr._visual_search("col", [0.1], 5, None, "balanced")
+        assert not any("iterative_scan" in sql for sql, _ in _executed(cursor))
+
+    def test_exact_disables_index_scan(self):
+        mgr, cursor = _make_manager()
+        mgr._hybrid_search("col", [0.1], "로그인", 5, None, "exact")
+        executed = [sql for sql, _ in _executed(cursor)]
+        assert "SELECT set_config('enable_indexscan', 'off', true)" in executed
+        assert not any("hnsw." in sql for sql in executed)
+
+    def test_no_profile_keeps_database_defaults(self):
+        mgr, cursor = _make_manager()
+        mgr.search_similar("col", [0.1], k=5)
+        assert cursor.execute.call_count == 1
+
+    def test_invalid_accuracy_settings_fall_back_at_load(self, monkeypatch):
+        import app.core.service.rag_generation_service as mod
+        monkeypatch.setenv("SEARCH_ACCURACY_DEFAULT", "balance")
+        monkeypatch.setenv("SEARCH_ACCURACY_OVERRIDES", '{"a": "exact", "b": "precise"}')
+        assert mod._load_accuracy_settings() == ("balanced", {"a": "exact"})
+
+    @pytest.mark.asyncio
+    async def test_service_resolves_collection_default_and_separates_cache(self, monkeypatch):
+        import app.core.service.rag_generation_service as mod
+        from app.core.service.rag_generation_service import RagGenerationService
+        monkeypatch.setattr(mod, "_SEARCH_ACCURACY_OVERRIDES", {"small": "exact"})
+        svc = object.__new__(RagGenerationService)
+        svc.cache_client = MagicMock()
+        svc.cache_client.get = AsyncMock(return_value=None)
+        svc.cache_client.set = AsyncMock()
+        svc.rerank_client = None
+        svc.embedding_client = MagicMock()
+        svc.embedding_client.embeddings.embed_query.return_value = [0.1]
+        svc.vector_repository = MagicMock()
+        svc.vector_repository.similarity_search.return_value = []
+
+        await svc.search_rag("small", "q")
+        await svc.search_rag("large", "q")
+        await svc.search_rag("large", "q", accuracy="fast")
+        profiles = [c.kwargs["accuracy"] for c in svc.vector_repository.similarity_search.call_args_list]
+        assert profiles == ["exact", "balanced", "fast"]
+        keys = [c[0][0] for c in svc.cache_client.set.call_args_list]
+        assert keys[1] != keys[2]
+
+
+# ──────────────────────────────────────────────
+# 2. 컬렉션별 LIST 파티셔닝
+# ──────────────────────────────────────────────
+class TestCollectionPartitioning:
+
+    @pytest.fixture(autouse=True)
+    def _partitioned(self):
+        from app.infra.database.pgvectorDB import PGVectorManager
+        PGVectorManager._partitioned = True
+        yield
+        PGVectorManager._partitioned = None
+
+    def test_partition_created_once_with_quoted_literal(self):
+        mgr, cursor = _make_manager()
+        cursor.fetchone.side_effect = [(None,), (None, "'sys01:screens'")]
+        mgr.ensure_partition("sys01:screens", cursor)
+        executed = [sql for sql, _ in _executed(cursor)]
+        assert any("pg_advisory_xact_lock" in sql for sql in executed)
+        name = mgr.partition_table("sys01:screens")
+        assert name.startswith("public.")  # AGE search_path(ag_catalog 우선)와 무관하게 public에 생성
+        assert ("SELECT to_regclass(%s)", (name,)) in _executed(cursor)
+        assert executed[-1] == (f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF public.rag_embeddings "
+                                f"FOR VALUES IN ('sys01:screens')")
+
+        cursor.reset_mock()
+        cursor.fetchone.side_effect = [(name,)]
+        mgr.ensure_partition("sys01:screens", cursor)
+        assert cursor.execute.call_count == 1  # 이미 있으면 카탈로그 조회만
+
+    def test_insert_creates_partition_before_insert(self):
+        mgr, cursor = _make_manager()
+        cursor.fetchone.side_effect = [("exists",)]
+        mgr.insert_embeddings("col", [{"page_content": "c", "metadata": {}, "embedding": [0.1]}])
+        executed = [sql for sql, _ in _executed(cursor)]
+        assert "to_regclass" in executed[0]
+        assert "INSERT INTO rag_embeddings" in executed[-1]
+
+    def test_drop_collection_drops_partition(self):
+        from app.infra.database.pgvectorDB import PGVectorManager
+        mgr, cursor = _make_manager()
+        mgr.drop_collection("col")
+        assert _executed(cursor) == [(f"DROP TABLE IF EXISTS public.{mgr.partition_name('col')}", None)]
+
+        PGVectorManager._partitioned = False
+        cursor.reset_mock()
+        mgr.drop_collection("col")
+        assert "DELETE FROM rag_embeddings" in _executed(cursor)[0][0]
+
+    def test_partition_mode_detected_lazily_without_startup(self):
+        from app.infra.database.pgvectorDB import PGVectorManager
+        PGVectorManager._partitioned = None
+        mgr, cursor = _make_manager()
+        cursor.fetchone.side_effect = [("p",), ("exists",)]
+        mgr.ensure_partition("col", cursor)
+        mgr.drop_collection("col", cursor)
+        executed = [sql for sql, _ in _executed(cursor)]
+        assert "relkind" in executed[0]
+        assert sum("relkind" in sql for sql in executed) == 1  # 매니저별 1회 조회 후 캐시
+        assert executed[-1] == f"DROP TABLE IF EXISTS {mgr.partition_table('col')}"
+
+    def test_partition_names_are_safe_identifiers(self):
+        from app.infra.database.pgvectorDB import PGVectorManager
+        name = PGVectorManager.partition_name("system01:화면; DROP TABLE x")
+        assert name.startswith("rag_embeddings_c_") and name.replace("_", "").isalnum()
+        assert name != PGVectorManager.partition_name("system02:화면")
+
+    @pytest.mark.asyncio
+    async def test_delete_collection_invalidates_collection_and_services(self):
+        from app.core.service.rag_generation_service import RagGenerationService
+        svc = object.__new__(RagGenerationService)
+        svc.vector_repository = MagicMock()
+        svc.vector_repository.delete_collection.return_value = ["회원"]
+        svc.cache_client = MagicMock()
+        svc.cache_client.incr = AsyncMock(return_value=1)
+        await svc.delete_collection("sys01:screens")
+        keys = [c[0][0] for c in svc.cache_client.incr.call_args_list]
+        assert keys == ["rag:gen:collection:sys01:screens", "rag:gen:service:회원"]
+
+
+# ──────────────────────────────────────────────
+# 3. 이진 양자화 1단계 + halfvec 재정렬 (quantized)
+# ──────────────────────────────────────────────
+class TestQuantizedSearch:
+
+    @pytest.fixture(autouse=True)
+    def _reset_version_probe(self):
+        from app.infra.database.pgvectorDB import PGVectorManager
+        PGVectorManager._iterative_scan_supported = None
+        yield
+        PGVectorManager._iterative_scan_supported = None
+
+    def test_single_statement_with_oversampled_candidates(self):
+        mgr, cursor = _make_manager(rows=[("a", {}, 0.91)])
+        rows = mgr._quantized_search("col", [0.1], 10, {"service_name": "s"}, "balanced", 8)
+        assert rows == [{"content": "a", "metadata": {}, "score": 0.91}]
+        sql, params = _executed(cursor)[-1]
+        assert "binary_quantize(embedding)::bit(3072) <~> binary_quantize(%s::halfvec)" in sql
+        assert "ORDER BY embedding <=> %s::halfvec" in sql
+        assert params[-4] == 80 and params[-1] == 10  # 후보 k×8, 최종 k
+        # ef_search는 후보 수 기준
+        assert ("SELECT set_config('hnsw.ef_search', %s, true)", ("100",)) in _executed(cursor)
+
+    def test_search_similar_routes_quantized_with_default_oversample(self):
+        from unittest.mock import patch
+        mgr, _ = _make_manager()
+        with patch.object(mgr, "_quantized_search", return_value=[]) as mock_q:
+            mgr.search_similar("col", [0.1], k=5, search_mode="quantized")
+        mock_q.assert_called_once_with("col", [0.1], 5, None, None, mgr.BQ_DEFAULT_OVERSAMPLE)
+
+    def test_bq_index_created_on_startup_only_when_enabled(self, monkeypatch):
+        from app.infra.database.pgvectorDB import PGVectorManager
+        mgr, cursor = _make_manager()
+        cursor.fetchone.return_value = ("r",)
+        mgr.ensure_vector_table()
+        assert PGVectorManager.BQ_HNSW_INDEX_SQL not in [sql for sql, _ in _executed(cursor)]
+
+        monkeypatch.setattr(PGVectorManager, "BQ_INDEX_ENABLED", True)
+        cursor.reset_mock()
+        mgr.ensure_vector_table()
+        assert PGVectorManager.BQ_HNSW_INDEX_SQL in [sql for sql, _ in _executed(cursor)]
+        assert "bit_hamming_ops" in PGVectorManager.BQ_HNSW_INDEX_SQL
+
+    def _make_builder(self, *fetchone, rows=None):
+        from app.infra.batch.concurrent_index import ConcurrentIndexBuilder
+        mgr, cursor = _make_manager(rows=rows)
+        cursor.fetchone.side_effect = list(fetchone)
+        mgr.autocommit_cursor = mgr.get_cursor
+        return ConcurrentIndexBuilder(mgr), cursor
+
+    def test_concurrent_build_drops_invalid_leftover_first(self):
+        builder, cursor = self._make_builder(("r",), (True,))  # relkind, INVALID 잔여 인덱스
+        builder.run("bq")
+        executed = [sql for sql, _ in _executed(cursor)]
+        assert executed[-2] == "DROP INDEX CONCURRENTLY IF EXISTS public.rag_embeddings_embedding_bq_hnsw_idx"
+        assert executed[-1].startswith("CREATE INDEX CONCURRENTLY IF NOT EXISTS rag_embeddings_embedding_bq_hnsw_idx "
+                                       "ON public.rag_embeddings USING hnsw ((binary_quantize(embedding)")
+
+    def test_concurrent_build_attaches_partition_indexes(self):
+        builder, cursor = self._make_builder(("p",), None, rows=[("rag_embeddings_c_abc",)])
+        stats = builder.run("bq")
+        executed = [sql for sql, _ in _executed(cursor)]
+        assert any(sql.startswith("CREATE INDEX IF NOT EXISTS rag_embeddings_embedding_bq_hnsw_idx ON ONLY")
+                   for sql in executed)
+        assert executed[-2].startswith("CREATE INDEX CONCURRENTLY IF NOT EXISTS rag_embeddings_c_abc_bq_idx "
+                                       "ON public.rag_embeddings_c_abc")
+        assert executed[-1] == ("ALTER INDEX public.rag_embeddings_embedding_bq_hnsw_idx "
+                                "ATTACH PARTITION public.rag_embeddings_c_abc_bq_idx")
+        assert stats["partitions"] == 1
+
+    @pytest.mark.asyncio
+    async def test_service_forwards_oversample_and_keys_cache(self):
+        from app.core.service.rag_generation_service import RagGenerationService
+        svc = object.__new__(RagGenerationService)
+        svc.cache_client = MagicMock()
+        svc.cache_client.get = AsyncMock(return_value=None)
+        svc.cache_client.set = AsyncMock()
+        svc.rerank_client = None
+        svc.embedding_client = MagicMock()
+        svc.embedding_client.embeddings.embed_query.return_value = [0.1]
+        svc.vector_repository = MagicMock()
+        svc.vector_repository.similarity_search.return_value = []
+
+        await svc.search_rag("col", "q", search_mode="quantized", oversample=2)
+        await svc.search_rag("col", "q", search_mode="quantized", oversample=8)
+        call = svc.vector_repository.similarity_search.call_args
+        assert call[0][4] == "quantized" and call.kwargs["oversample"] == 8
+        keys = {c[0][0] for c in svc.cache_client.set.call_args_list}
+        assert len(keys) == 2
+
+
+# ──────────────────────────────────────────────
+# 4. Matryoshka 축소 임베딩 1단계 + 전체 벡터 재정렬 (matryoshka)
+# ──────────────────────────────────────────────
+class TestMatryoshkaSearch:
+
+    @pytest.fixture(autouse=True)
+    def _enabled(self, monkeypatch):
+        from app.infra.database.pgvectorDB import PGVectorManager
+        monkeypatch.setattr(PGVectorManager, "SHORT_EMBEDDING_ENABLED", True)
+        monkeypatch.setattr(PGVectorManager, "_iterative_scan_supported", None)
+
+    def test_truncate_embedding_renormalizes(self):
+        from app.infra.database.pgvectorDB import PGVectorManager
+        assert PGVectorManager.truncate_embedding([3.0, 4.0, 12.0], 2) == pytest.approx([0.6, 0.8])
+        assert PGVectorManager.truncate_embedding([0.0, 0.0, 1.0], 2) == [0.0, 0.0]
+
+    def test_single_statement_with_short_query_vector(self):
+        from app.infra.database.pgvectorDB import PGVectorManager
+        mgr, cursor = _make_manager(rows=[("a", {}, 0.9)])
+        query = [1.0] * PGVectorManager.EMBEDDING_DIM
+        rows = mgr._matryoshka_search("col", query, 10, None, "balanced", 3)
+        assert rows == [{"content": "a", "metadata": {}, "score": 0.9}]
+        sql, params = _executed(cursor)[-1]
+        assert "ORDER BY embedding_short <=> %s::halfvec" in sql
+        assert "ORDER BY embedding <=> %s::halfvec" in sql
+        short_query, candidate_k = params[1], params[2]
+        assert len(short_query) == PGVectorManager.SHORT_EMBEDDING_DIM
+        assert sum(v * v for v in short_query) == pytest.approx(1.0)
+        assert candidate_k == 30 and params[-1] == 10 and params[-2] == query
+
+    def test_search_similar_falls_back_to_vector_when_disabled(self, monkeypatch):
+        from unittest.mock import patch
+        from app.infra.database.pgvectorDB import PGVectorManager
+        mgr, _ = _make_manager()
+        with patch.object(mgr, "_matryoshka_search", return_value=[]) as mock_m:
+            mgr.search_similar("col", [0.1], k=5, search_mode="matryoshka")
+        mock_m.assert_called_once_with("col", [0.1], 5, None, None, mgr.SHORT_DEFAULT_OVERSAMPLE)
+
+        monkeypatch.setattr(PGVectorManager, "SHORT_EMBEDDING_ENABLED", False)
+        with patch.object(mgr, "_vector_search", return_value=[]) as mock_v:
+            mgr.search_similar("col", [0.1], k=5, search_mode="matryoshka")
+        mock_v.assert_called_once()
+
+    def test_ingest_fills_short_embedding_only_when_enabled(self, monkeypatch):
+        from app.infra.database.pgvectorDB import PGVectorManager
+        mgr, cursor = _make_manager()
+        doc = {"page_content": "c", "metadata": {}, "embedding": [3.0, 4.0]}
+        mgr.insert_embeddings("col", [doc])
+        sql, params = _executed(cursor)[-1]
+        assert "embedding_short" in sql and "embedding_short = EXCLUDED.embedding_short" in sql
+        assert params[-2] == pytest.approx([0.6, 0.8])
+
+        monkeypatch.setattr(PGVectorManager, "SHORT_EMBEDDING_ENABLED", False)
+        cursor.reset_mock()
+        mgr.insert_embeddings("col", [doc])
+        assert _executed(cursor)[-1][1][-2] is None
+
+    def test_backfill_pages_by_id_and_rebuilds_index(self):
+        from unittest.mock import patch
+        from app.infra.batch.short_embedding_backfill import ShortEmbeddingBackfill
+        mgr, cursor = _make_manager()
+        cursor.fetchall.side_effect = [[(1,), (2,)], [(5,)], []]
+        with patch.object(mgr, "ensure_vector_table"):
+            stats = ShortEmbeddingBackfill(mgr).run(batch_size=2)
+        assert stats["rows"] == 3 and stats["batches"] == 2
+        executed = _executed(cursor)
+        assert executed[0][0] == f"DROP INDEX IF EXISTS {mgr.SHORT_HNSW_INDEX};"
+        assert [params for sql, params in executed if "UPDATE rag_embeddings" in sql] == [(0, 2), (2, 2), (5, 2)]
+        assert executed[-1][0] == mgr.SHORT_HNSW_INDEX_SQL
+
+    def test_backfill_pages_per_partition_on_partitioned_table(self, monkeypatch):
+        from unittest.mock import patch
+        from app.infra.batch.short_embedding_backfill import ShortEmbeddingBackfill
+        mgr, cursor = _make_manager()
+        monkeypatch.setattr(mgr, "_partitioned", True, raising=False)
+        cursor.fetchall.side_effect = [[("rag_embeddings_c_a",), ("rag_embeddings_c_b",)],  # 파티션 목록
+                                       [(4,)], [], [(2,)], []]
+        cursor.fetchone.side_effect = [("a",), ("b",)]
+        with patch.object(mgr, "ensure_vector_table"):
+            stats = ShortEmbeddingBackfill(mgr).run(batch_size=2, rebuild_index=False)
+        assert stats["rows"] == 2
+        updates = [(sql, params) for sql, params in _executed(cursor) if "UPDATE rag_embeddings" in sql]
+        # PK (collection_name, id) 순서로 컬렉션별 페이지 — 파티션 전체 스캔·정렬 없음
+        assert all("WHERE collection_name = %s AND id > %s" in sql and "r.collection_name = %s" in sql
+                   for sql, _ in updates)
+        assert [params for _, params in updates] == [("a", 0, 2, "a"), ("a", 4, 2, "a"),
+                                                     ("b", 0, 2, "b"), ("b", 2, 2, "b")]
+
+
+# ──────────────────────────────────────────────
+# 5. 한국어 bigram 어휘 색인 + 단일 패스 RRF (hybrid)
+# ──────────────────────────────────────────────
+class TestKoreanLexicalIndex:
+
+    @pytest.fixture(autouse=True)
+    def _bigram(self, monkeypatch):
+        from app.infra.database.pgvectorDB import PGVectorManager
+        monkeypatch.setattr(PGVectorManager, "LEXICAL_MODE", "bigram")
+
+    def test_tokenize_splits_hangul_into_bigrams(self):
+        from app.infra.database.korean_lexical import tokenize
+        assert tokenize("비밀번호재설정을 API키 앱") == ["비밀", "밀번", "번호", "호재", "재설", "설정", "정을",
+                                                     "api", "키", "앱"]
+
+    def test_query_or_combines_unique_tokens(self):
+        from app.infra.database.korean_lexical import lexical_query
+        assert lexical_query("설정 설정") == "'설정'"
+        assert lexical_query("로그인 it's") == "'로그' | '그인' | 'it' | 's'"
+        assert lexical_query("?!") is None
+
+    def test_hybrid_builds_tsquery_once_and_fuses_in_one_statement(self):
+        mgr, cursor = _make_manager(rows=[(7, "c", {"screen_name": "s"}, 0.03)])
+        rows = mgr._hybrid_search("col", [0.1], "비밀번호 재설정", 5, {"service_name": "s"})
+        assert rows == [{"content": "c", "metadata": {"screen_name": "s"}, "score": 0.03}]
+        sql, params = _executed(cursor)[-1]
+        assert sql.count("to_tsquery('simple', %s)") == 1 and sql.count("ts_rank(") == 1
+        assert "content_lex @@ query.tsq" in sql and "content_tsv" not in sql
+        assert params[0] == "'비밀' | '밀번' | '번호' | '재설' | '설정'"
+        assert params[-2:] == [5, "col"]  # 결합 후 최종 k개만 본문 조회
+
+    def test_simple_mode_keeps_whitespace_tsvector(self, monkeypatch):
+        from app.infra.database.pgvectorDB import PGVectorManager
+        monkeypatch.setattr(PGVectorManager, "LEXICAL_MODE", "simple")
+        mgr, cursor = _make_manager()
+        mgr._hybrid_search("col", [0.1], "로그인 화면", 5, None)
+        sql, params = _executed(cursor)[-1]
+        assert sql.count("plainto_tsquery('simple', %s)") == 1 and "content_tsv @@ query.tsq" in sql
+        assert params[0] == "로그인 화면"
+
+    def test_explicit_lexical_mode_overrides_class_setting(self):
+        mgr, cursor = _make_manager()
+        mgr._hybrid_search("col", [0.1], "로그인 화면", 5, None, lexical_mode="simple")
+        assert "content_tsv @@ query.tsq" in _executed(cursor)[-1][0]
+        assert mgr.LEXICAL_MODE == "bigram"  # 클래스 설정은 그대로
+
+    def test_ingest_fills_lexical_column_only_in_bigram_mode(self, monkeypatch):
+        from app.infra.database.pgvectorDB import PGVectorManager
+        mgr, cursor = _make_manager()
+        doc = {"page_content": "로그인화면", "metadata": {}, "embedding": [0.1]}
+        mgr.insert_embeddings("col", [doc])
+        sql, params = _executed(cursor)[-1]
+        assert "content_lex = EXCLUDED.content_lex" in sql
+        assert params[-1] == "로그 그인 인화 화면"
+
+        monkeypatch.setattr(PGVectorManager, "LEXICAL_MODE", "simple")
+        cursor.reset_mock()
+        mgr.insert_embeddings("col", [doc])
+        assert _executed(cursor)[-1][1][-1] is None
+
+    def test_backfill_tokenizes_in_python_and_updates_by_id(self):
+        from unittest.mock import patch
+        from app.infra.batch.lexical_backfill import LexicalBackfill
+        mgr, cursor = _make_manager()
+        cursor.fetchall.side_effect = [[(3, "로그인"), (9, "")], []]
+        with patch.object(mgr, "ensure_vector_table"):
+            stats = LexicalBackfill(mgr).run(batch_size=2)
+        assert stats["rows"] == 2 and stats["batches"] == 1
+        updates = [params for sql, params in _executed(cursor) if "UPDATE rag_embeddings" in sql]
+        assert updates == [([3, 9], ["로그 그인", ""])]
+        selects = [params for sql, params in _executed(cursor) if "SELECT id, content" in sql]
+        assert selects == [(0, 2), (9, 2)]
+        assert _executed(cursor)[-1][0] == mgr.LEXICAL_INDEX_SQL
+
+    def test_backfill_pages_per_partition_on_partitioned_table(self, monkeypatch):
+        from unittest.mock import patch
+        from app.infra.batch.lexical_backfill import LexicalBackfill
+        mgr, cursor = _make_manager()
+        monkeypatch.setattr(mgr, "_partitioned", True, raising=False)
+        cursor.fetchall.side_effect = [[("rag_embeddings_c_a",)], [(3, "로그인")], []]
+        cursor.fetchone.side_effect = [("a",)]
+        with patch.object(mgr, "ensure_vector_table"):
+            stats = LexicalBackfill(mgr).run(batch_size=2, rebuild_index=False)
+        assert stats["rows"] == 1
+        selects = [(sql, params) for sql, params in _executed(cursor) if "SELECT id, content" in sql]
+        assert all("WHERE collection_name = %s AND id > %s" in sql for sql, _ in selects)
+        assert [params for _, params in selects] == [("a", 0, 2), ("a", 3, 2)]
+        update_sql, update_params = next((sql, params) for sql, params in _executed(cursor)
+                                         if "UPDATE rag_embeddings" in sql)
+        assert "r.collection_name = %s AND r.id = b.id" in update_sql and update_params[-1] == "a"